@@ -1,7 +1,16 @@
+import time
+
+# Reference point for the startup-time measurement reported by /ready.
+PROCESS_STARTED = time.perf_counter()
+
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, HTTPException
+from typing import Dict, List, Literal, Optional, Sequence
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 from pydantic import BaseModel
+import asyncio
+import json
 import logging
 import sys
 import os
@@ -9,7 +18,15 @@ import os
 # Ensure src is in python path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
 
-from src.retrieval.graph_retriever import get_query_engine
+# Only lightweight modules are imported here; LlamaIndex, the embedding model and the
+# Neo4j/Qdrant connections are loaded by the background warm-up (see build_engines).
+from src.ingestion.jobs import JOBS_DB, Job, JobRequest, JobRunner, JobStore
+from src.retrieval.answer_cache import AnswerCache, CacheOutcome, normalize_query
+from src.retrieval.sessions import (
+    RetrievalPlan, Session, SessionStore, Turn, condense_query, llm_condenser, mentioned_entities,
+    plan_retrieval, run_plan,
+)
+from src.telemetry import CACHE_REQUESTS, QUERY_ROUTES, metrics_payload, span, trace
 
 import nest_asyncio
 nest_asyncio.apply()
@@ -18,27 +35,129 @@ nest_asyncio.apply()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger("api")
 
+ANSWER_CACHE_TTL = float(os.getenv("ANSWER_CACHE_TTL", "3600"))
+ANSWER_CACHE_SIZE = int(os.getenv("ANSWER_CACHE_SIZE", "1024"))
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.95"))
+BATCH_MAX_QUERIES = int(os.getenv("BATCH_MAX_QUERIES", "200"))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
+# Upper bound on a client's max_concurrency: each slot runs a retrieval and an LLM call.
+BATCH_CONCURRENCY_MAX = int(os.getenv("BATCH_CONCURRENCY_MAX", "16"))
+# Seconds from process start until /health must answer; exceeding it is logged.
+STARTUP_TARGET_SECONDS = float(os.getenv("STARTUP_TARGET_SECONDS", "1.0"))
+SESSION_TTL = float(os.getenv("SESSION_TTL", "1800"))
+SESSION_MAX = int(os.getenv("SESSION_MAX", "1000"))
+SESSION_MAX_MB = float(os.getenv("SESSION_MAX_MB", "64"))
+SESSION_TURNS = int(os.getenv("SESSION_TURNS", "6"))
+SESSION_NODES = int(os.getenv("SESSION_NODES", "20"))
+# Ask the LLM to rewrite follow-ups the rule-based condenser leaves unchanged (one extra call).
+SESSION_LLM_CONDENSE = os.getenv("SESSION_LLM_CONDENSE", "0") == "1"
+# Rerank, deduplicate and trim retrieved chunks before synthesis (see ContextCompressor).
+CONTEXT_COMPRESSION = os.getenv("CONTEXT_COMPRESSION", "1") == "1"
+# Run crawl-and-ingest jobs in this process (and resume interrupted ones at startup).
+JOB_RUNNER = os.getenv("JOB_RUNNER", "1") == "1"
+
 # Global variables
 query_engine = None
+streaming_engine = None
+answer_cache: Optional[AnswerCache] = None
+fact_engine = None
+context_compressor = None
+job_runner: Optional[JobRunner] = None
+sessions = SessionStore(ttl=SESSION_TTL, max_sessions=SESSION_MAX, max_bytes=int(SESSION_MAX_MB * 1024 * 1024))
+session_condenser = None
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
+class StartupState(BaseModel):
     """
-    Load the query engine on startup.
+    Progress of the background warm-up, reported by ``/ready``.
     """
-    global query_engine
-    logger.info("Startup: Loading Query Engine...")
-    try:mm
-        query_engine = get_query_engine()
-        logger.info("Startup: Query Engine loaded successfully.")
+    status: Literal["starting", "loading", "ready", "failed"] = "starting"
+    error: Optional[str] = None
+    serving_after_s: Optional[float] = None
+    ready_after_s: Optional[float] = None
+    warm_up_s: Optional[float] = None
+
+startup = StartupState()
+
+def build_engines():
+    """
+    Builds the query engines, the answer cache, the fact-table engine and the context
+    compressor. Slow (imports LlamaIndex, loads the embedding and reranking models,
+    connects to Neo4j and Qdrant), so it runs in a worker thread.
+
+    Returns:
+        Tuple: (query engine, streaming query engine, answer cache, fact engine, context compressor).
+    """
+    from src.ingestion.facts import FACTS_DB, FactStore
+    from src.ingestion.manifest import graph_version
+    from src.models import get_embed_model, get_reranker
+    from src.retrieval.context_compressor import ContextCompressor
+    from src.retrieval.fact_retriever import FactQueryEngine
+    from src.retrieval.graph_retriever import get_query_engine, get_streaming_query_engine
+
+    engine = get_query_engine()
+    # Answers are reused for repeated (or near-identical) questions until the graph
+    # is re-ingested, which changes the ingestion manifest. Near-identical questions
+    # must name the same universities.
+    cache = AnswerCache(
+        embed_fn=get_embed_model().get_query_embedding,
+        ttl=ANSWER_CACHE_TTL,
+        max_entries=ANSWER_CACHE_SIZE,
+        threshold=ANSWER_CACHE_THRESHOLD,
+        version_fn=graph_version,
+        entities_fn=catalog_universities,
+    )
+    compressor = None
+    if CONTEXT_COMPRESSION:
+        compressor = ContextCompressor()
+        try:
+            get_reranker()
+        except Exception as e:
+            logger.warning(f"Reranker unavailable, compressing without it: {e}")
+    return engine, get_streaming_query_engine(engine), cache, FactQueryEngine(FactStore(FACTS_DB)), compressor
+
+async def warm_up():
+    """Loads the query engines in the background and records the outcome in ``startup``."""
+    global query_engine, streaming_engine, answer_cache, fact_engine, context_compressor, session_condenser
+    startup.status = "loading"
+    started = time.perf_counter()
+    try:
+        query_engine, streaming_engine, answer_cache, fact_engine, context_compressor = await asyncio.to_thread(build_engines)
+        if SESSION_LLM_CONDENSE:
+            from src.models import get_llm
+            session_condenser = llm_condenser(get_llm("lookup"))
+        startup.status = "ready"
+        logger.info(f"Startup: Query Engine loaded successfully in {time.perf_counter() - started:.2f}s.")
     except Exception as e:
+        startup.status = "failed"
+        startup.error = str(e)
         logger.error(f"Startup: Failed to load Query Engine: {e}")
-        # We might want to raise here or handle it gracefully depending on requirements
-        # For now, we'll let it fail on first request if it's None.
+    startup.warm_up_s = round(time.perf_counter() - started, 3)
+    startup.ready_after_s = round(time.perf_counter() - PROCESS_STARTED, 3)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Starts serving immediately and loads the query engine in a background task;
+    ``/ready`` reports when it is available.
+    """
+    startup.serving_after_s = round(time.perf_counter() - PROCESS_STARTED, 3)
+    level = logging.INFO if startup.serving_after_s <= STARTUP_TARGET_SECONDS else logging.WARNING
+    logger.log(level, f"Startup: serving after {startup.serving_after_s:.2f}s (target {STARTUP_TARGET_SECONDS:.2f}s); "
+                      "loading Query Engine in the background...")
+    task = asyncio.create_task(warm_up())
+    # Crawl-and-ingest jobs run in the background; interrupted ones resume here.
+    global job_runner
+    runner = JobRunner(JobStore(JOBS_DB)) if JOB_RUNNER else None
+    if runner is not None:
+        job_runner = runner
+        await runner.start()
     
     yield
     
     logger.info("Shutdown: Cleaning up...")
+    task.cancel()
+    if runner is not None:
+        await runner.stop()
 
 app = FastAPI(title="Offer-Pilot API", lifespan=lifespan)
 
@@ -51,18 +170,231 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Which path answered a query: per-chunk graph retrieval, the precomputed graph summaries
+# (global questions), the budgeted multi-hop traversal (reasoning questions) or the fact table.
+QueryRoute = Literal["graph", "summaries", "multihop", "facts"]
+
 class QueryRequest(BaseModel):
     query: str
+    # Conversation to continue (see POST /sessions); follow-ups are resolved against it.
+    session_id: Optional[str] = None
 
 class QueryResponse(BaseModel):
     answer: str
+    cache: CacheOutcome = "miss"
+    route: QueryRoute = "graph"
+    session_id: Optional[str] = None
+    standalone_query: Optional[str] = None
+
+class BatchQueryRequest(BaseModel):
+    queries: List[str]
+    max_concurrency: Optional[int] = None
+
+class BatchQueryResult(BaseModel):
+    query: str
+    answer: Optional[str] = None
+    cache: CacheOutcome = "miss"
+    route: QueryRoute = "graph"
+    latency_ms: float
+    deduplicated: bool = False
+    error: Optional[str] = None
+
+class BatchQueryResponse(BaseModel):
+    results: List[BatchQueryResult]
+    unique_queries: int
+    elapsed_ms: float
 
 @app.get("/health")
 def health_check():
     return {"status": "ok"}
 
+@app.get("/ready")
+def readiness_check():
+    """Returns 200 once the query engine is loaded, 503 (with the warm-up state) before."""
+    return JSONResponse(startup.model_dump(), status_code=200 if startup.status == "ready" else 503)
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus metrics: per-stage latencies, LLM tokens, cache hit rates and query routes."""
+    payload, content_type = metrics_payload()
+    return Response(content=payload, media_type=content_type)
+
+@app.get("/llm/stats")
+def llm_stats():
+    """Calls, errors, fallbacks, latency and estimated cost of each LLM route and backend."""
+    from src.models import get_router
+    return get_router().stats()
+
+@app.post("/jobs", response_model=Job, status_code=202)
+def submit_job(request: JobRequest):
+    """
+    Queues a crawl → clean → ingest job for explicit universities and/or a rank range of
+    the university catalog. Poll ``/jobs/{id}`` for its progress.
+    """
+    if job_runner is None:
+        raise HTTPException(status_code=503, detail="The job runner is not running.")
+    try:
+        return job_runner.submit(request)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@app.get("/jobs", response_model=List[Job])
+def list_jobs(limit: int = 20):
+    """Returns the most recent jobs, newest first."""
+    if job_runner is None:
+        raise HTTPException(status_code=503, detail="The job runner is not running.")
+    return job_runner.store.list(limit)
+
+@app.get("/jobs/{job_id}", response_model=Job)
+def job_status(job_id: str):
+    """Returns a job's status and the stage each of its universities has reached."""
+    job = job_runner.store.get(job_id) if job_runner is not None else None
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown job.")
+    return job
+
+class SessionResponse(BaseModel):
+    session_id: str
+
+@app.post("/sessions", response_model=SessionResponse, status_code=201)
+def create_session():
+    """
+    Starts a conversation. Pass its ``session_id`` with each query so follow-ups
+    ("and its tuition?") are resolved against earlier turns. Sessions expire after
+    ``SESSION_TTL`` idle seconds.
+    """
+    return SessionResponse(session_id=sessions.create().id)
+
+@app.delete("/sessions/{session_id}", status_code=204)
+def end_session(session_id: str):
+    """Ends a conversation and frees its cached context."""
+    if not sessions.delete(session_id):
+        raise HTTPException(status_code=404, detail="Unknown session.")
+    return Response(status_code=204)
+
+def graph_route(query: str) -> str:
+    """Returns the retrieval route the query engine's router picks for ``query``."""
+    route = getattr(getattr(query_engine, "retriever", None), "route", None)
+    return route(query) if callable(route) else "graph"
+
+def catalog_universities() -> List[str]:
+    """Universities with facts or summaries."""
+    names = set()
+    if fact_engine is not None:
+        names.update(fact_engine.store.universities())
+    summaries = getattr(getattr(query_engine, "retriever", None), "summaries", None)
+    if summaries is not None:
+        try:
+            names.update(summaries.universities)
+        except Exception as e:
+            logger.warning(f"Summary universities unavailable: {e}")
+    return sorted(names)
+
+def known_universities(session: Session) -> List[str]:
+    """Universities follow-ups can refer to: those with facts or summaries, and those in context."""
+    return sorted(set(session.entities) | set(catalog_universities()))
+
+async def standalone_query(query: str, session: Session, known: List[str]) -> str:
+    """Rewrites a follow-up in ``session`` as a standalone question (global questions are left as they are)."""
+    if not session.turns or await asyncio.to_thread(graph_route, query) == "summaries":
+        return query
+    with span("condense"):
+        standalone = condense_query(session, query, known)
+        if standalone == query and session_condenser is not None:
+            standalone = await session_condenser(session, query, known)
+    return standalone
+
+async def run_engine(engine, query: str, session: Optional[Session] = None, route: str = "graph", known: Sequence[str] = ()):
+    """
+    Runs ``engine`` on ``query`` as two spans, ``retrieve`` and ``synthesize``. In a
+    session, the previous turn's nodes are reused and only universities new to the
+    conversation are looked up (see ``plan_retrieval``). The retrieved chunks are
+    reranked and trimmed to a token budget (``compress`` span; graph summaries are kept
+    whole), and the answer is written
+    by the local or the cloud model depending on the kind of question (see ``classify_query``).
+
+    Returns:
+        Tuple: (response, retrieved nodes before compression).
+    """
+    from llama_index.core import QueryBundle
+    from src.llm_router import classify_query, use_llm_route
+
+    bundle = QueryBundle(query)
+    with span("retrieve"):
+        if session is None:
+            nodes = await engine.aretrieve(bundle)
+        else:
+            plan = RetrievalPlan(lookup=True) if route == "summaries" else plan_retrieval(session, query, known)
+            if not plan.lookup:
+                logger.info(f"Session {session.id}: reusing {len(plan.reuse)} nodes, looking up {plan.new_entities}.")
+            nodes = await run_plan(engine.retriever, plan, query)
+    context = nodes
+    if context_compressor is not None:
+        with span("compress"):
+            context = await asyncio.to_thread(context_compressor.postprocess_nodes, nodes, query_bundle=bundle)
+    with span("synthesize"), use_llm_route(classify_query(query, route)):
+        return await engine.asynthesize(bundle, context), nodes
+
+def record_turn(session: Optional[Session], query: str, result: QueryResponse, known: List[str], nodes=None) -> QueryResponse:
+    """Adds an answered turn to ``session`` (keeping its cached nodes unless new ones were retrieved)."""
+    if session is None:
+        return result
+    turn = Turn(query=query, standalone=result.standalone_query or query, answer=result.answer,
+                entities=mentioned_entities(result.standalone_query or query, known))
+    session.record(turn, session.nodes if nodes is None else nodes, SESSION_TURNS, SESSION_NODES)
+    sessions.save(session)
+    result.session_id = session.id
+    return result
+
+async def lookup_answer(query: str):
+    """Looks ``query`` up in the answer cache and counts the outcome."""
+    with span("answer_cache"):
+        lookup = await asyncio.to_thread(answer_cache.lookup, query)
+    CACHE_REQUESTS.labels("answer", lookup.outcome).inc()
+    return lookup
+
+async def answer_query(query: str, session: Optional[Session] = None) -> QueryResponse:
+    """
+    Answers one query: filter/sort/aggregate questions straight from the fact table,
+    others through the answer cache and, on a miss, the query engine.
+
+    Args:
+        query (str): User query.
+        session (Optional[Session]): Conversation the query continues; follow-ups are
+            rewritten as standalone questions and reuse the previous turn's retrieval.
+
+    Returns:
+        QueryResponse: The answer, whether it came from the cache and which route served it.
+    """
+    raw, known = query, []
+    if session is not None:
+        known = await asyncio.to_thread(known_universities, session)
+        query = await standalone_query(raw, session, known)
+    standalone = query if query != raw else None
+    fact = None
+    if fact_engine is not None:
+        with span("facts"):
+            fact = await asyncio.to_thread(fact_engine.answer, query)
+    if fact is not None:
+        QUERY_ROUTES.labels("facts").inc()
+        return record_turn(session, raw, QueryResponse(answer=fact.answer, route="facts", standalone_query=standalone), known)
+    route = await asyncio.to_thread(graph_route, query)
+    QUERY_ROUTES.labels(route).inc()
+    lookup = None
+    if answer_cache is not None:
+        lookup = await lookup_answer(query)
+        if lookup.answer is not None:
+            logger.info(f"Answer cache {lookup.outcome} hit (similarity {lookup.similarity:.3f}).")
+            result = QueryResponse(answer=lookup.answer, cache=lookup.outcome, route=route, standalone_query=standalone)
+            return record_turn(session, raw, result, known)
+    response, nodes = await run_engine(query_engine, query, session, route, known)
+    if answer_cache is not None:
+        await asyncio.to_thread(answer_cache.put, query, str(response), embedding=lookup.embedding)
+    return record_turn(session, raw, QueryResponse(answer=str(response), route=route, standalone_query=standalone), known, nodes)
+
 @app.post("/query", response_model=QueryResponse)
-async def query_knowledge_graph(request: QueryRequest):
+async def query_knowledge_graph(request: QueryRequest, response: Response):
+    """Answers one query; the ``Server-Timing`` header breaks its latency down by stage."""
     global query_engine
     
     if not query_engine:
@@ -72,13 +404,129 @@ async def query_knowledge_graph(request: QueryRequest):
         raise HTTPException(status_code=400, detail="Query text is required.")
 
     try:
-        logger.info(f"Processing query: {request.query}")
-        response = await query_engine.aquery(request.query)
-        return QueryResponse(answer=str(response))
+        session = sessions.get(request.session_id) if request.session_id else None
+        with trace("query") as query_trace:
+            result = await answer_query(request.query, session)
+        response.headers["Server-Timing"] = query_trace.server_timing()
+        logger.info(f"Processed query {request.query!r} ({result.route}): {query_trace.summary()}")
+        return result
     except Exception as e:
         logger.error(f"Error processing query: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@app.post("/query/batch", response_model=BatchQueryResponse)
+async def batch_query(request: BatchQueryRequest):
+    """
+    Answers many queries concurrently (at most ``max_concurrency`` at a time, capped at
+    ``BATCH_CONCURRENCY_MAX``) and returns the results in request order. Queries that are identical after normalization are
+    retrieved and answered once and share the result.
+    """
+    if not query_engine:
+        raise HTTPException(status_code=503, detail="Query Engine is not ready.")
+
+    if not request.queries or len(request.queries) > BATCH_MAX_QUERIES:
+        raise HTTPException(status_code=400, detail=f"Send between 1 and {BATCH_MAX_QUERIES} queries.")
+
+    started = time.perf_counter()
+    semaphore = asyncio.Semaphore(max(1, min(request.max_concurrency or BATCH_CONCURRENCY, BATCH_CONCURRENCY_MAX)))
+
+    async def run(query: str) -> BatchQueryResult:
+        async with semaphore:
+            query_started = time.perf_counter()
+            try:
+                response = await answer_query(query)
+                return BatchQueryResult(query=query, answer=response.answer, cache=response.cache,
+                                        route=response.route, latency_ms=(time.perf_counter() - query_started) * 1000)
+            except Exception as e:
+                logger.error(f"Error processing batch query {query!r}: {e}")
+                return BatchQueryResult(query=query, error=str(e),
+                                        latency_ms=(time.perf_counter() - query_started) * 1000)
+
+    unique: Dict[str, str] = {}
+    for query in request.queries:
+        unique.setdefault(normalize_query(query), query)
+    keys = list(unique)
+    answered = dict(zip(keys, await asyncio.gather(*(run(unique[key]) for key in keys))))
+
+    results, seen = [], set()
+    for query in request.queries:
+        key = normalize_query(query)
+        results.append(answered[key].model_copy(update={"query": query, "deduplicated": key in seen}))
+        seen.add(key)
+    elapsed = (time.perf_counter() - started) * 1000
+    logger.info(f"Batch of {len(results)} queries ({len(keys)} unique) answered in {elapsed:.0f} ms")
+    return BatchQueryResponse(results=results, unique_queries=len(keys), elapsed_ms=elapsed)
+
+def _sse(event: str, data: dict) -> str:
+    """Formats one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.post("/query/stream")
+async def stream_query(request: QueryRequest):
+    """
+    Streams the answer as Server-Sent Events: ``token`` events carrying text deltas,
+    then a ``done`` event with the cache outcome, or an ``error`` event.
+    """
+    if not streaming_engine:
+        raise HTTPException(status_code=503, detail="Query Engine is not ready.")
+
+    if not request.query:
+        raise HTTPException(status_code=400, detail="Query text is required.")
+
+    session = sessions.get(request.session_id) if request.session_id else None
+
+    async def events():
+        from src.llm_router import classify_query, route_stream
+
+        started = time.perf_counter()
+        try:
+            logger.info(f"Streaming query: {request.query}")
+            query, known = request.query, []
+            if session is not None:
+                known = await asyncio.to_thread(known_universities, session)
+                query = await standalone_query(request.query, session, known)
+            standalone = query if query != request.query else None
+            done = {"session_id": session.id, "standalone_query": standalone} if session else {}
+            fact = None
+            if fact_engine is not None:
+                with span("facts"):
+                    fact = await asyncio.to_thread(fact_engine.answer, query)
+            if fact is not None:
+                QUERY_ROUTES.labels("facts").inc()
+                record_turn(session, request.query, QueryResponse(answer=fact.answer, route="facts", standalone_query=standalone), known)
+                yield _sse("token", {"text": fact.answer})
+                yield _sse("done", {"cache": "miss", "route": "facts", **done})
+                return
+            route = await asyncio.to_thread(graph_route, query)
+            QUERY_ROUTES.labels(route).inc()
+            lookup = None
+            if answer_cache is not None:
+                lookup = await lookup_answer(query)
+                if lookup.answer is not None:
+                    result = QueryResponse(answer=lookup.answer, cache=lookup.outcome, route=route, standalone_query=standalone)
+                    record_turn(session, request.query, result, known)
+                    yield _sse("token", {"text": lookup.answer})
+                    yield _sse("done", {"cache": lookup.outcome, "route": route, **done})
+                    return
+            response, nodes = await run_engine(streaming_engine, query, session, route, known)
+            answer, first_token = "", None
+            with span("stream_tokens"):
+                async for text in route_stream(response.async_response_gen(), classify_query(query, route)):
+                    if first_token is None:
+                        first_token = time.perf_counter() - started
+                        logger.info(f"Time to first token: {first_token * 1000:.0f} ms")
+                    answer += text
+                    yield _sse("token", {"text": text})
+            if answer_cache is not None:
+                await asyncio.to_thread(answer_cache.put, query, answer, embedding=lookup.embedding)
+            record_turn(session, request.query, QueryResponse(answer=answer, route=route, standalone_query=standalone), known, nodes)
+            yield _sse("done", {"cache": "miss", "route": route, **done})
+        except Exception as e:
+            logger.error(f"Error streaming query: {e}")
+            yield _sse("error", {"detail": str(e)})
+
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
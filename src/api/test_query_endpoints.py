@@ -0,0 +1,208 @@
+import sys
+import os
+import asyncio
+import json
+import time
+
+# Ensure the src directory is in the python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from fastapi.testclient import TestClient
+from llama_index.core.llms import MockLLM
+from llama_index.core.query_engine import RetrieverQueryEngine
+from llama_index.core.retrievers import BaseRetriever
+from llama_index.core.schema import NodeWithScore, TextNode
+import src.api.main as api
+from src.ingestion.jobs import JobRunner, JobStore
+from src.retrieval.answer_cache import AnswerCache
+from src.retrieval.context_compressor import ContextCompressor
+from src.retrieval.multihop_retriever import MultiHopRetriever, TraversalBudget
+from src.retrieval.summary_retriever import RoutingRetriever, SummaryRetriever
+from src.retrieval.test_hybrid_retriever import KeywordEmbedding
+from src.retrieval.test_multihop_retriever import TraversalGraphStore
+from src.retrieval.test_summary_retriever import SummaryGraphStore
+
+
+class StaticRetriever(BaseRetriever):
+    """Returns one fixed chunk; stands in for the Neo4j/Qdrant retriever."""
+
+    delay: float = 0.0
+
+    def _retrieve(self, query_bundle):
+        return [NodeWithScore(node=TextNode(text="Stanford is in California."), score=1.0)]
+
+    async def _aretrieve(self, query_bundle):
+        await asyncio.sleep(self.delay)
+        return self._retrieve(query_bundle)
+
+
+class ConcurrencyRetriever(BaseRetriever):
+    """Records the most retrievals that were in flight at once."""
+
+    active: int = 0
+    peak: int = 0
+
+    def _retrieve(self, query_bundle):
+        return [NodeWithScore(node=TextNode(text="Stanford is in California."), score=1.0)]
+
+    async def _aretrieve(self, query_bundle):
+        self.active += 1
+        self.peak = max(self.peak, self.active)
+        await asyncio.sleep(0.05)
+        self.active -= 1
+        return self._retrieve(query_bundle)
+
+
+class CountingRetriever(BaseRetriever):
+    """Returns one Stanford chunk and counts lookups."""
+
+    calls: int = 0
+
+    def _retrieve(self, query_bundle):
+        self.calls += 1
+        text = "Stanford tuition fees are $62,000 per year."
+        return [NodeWithScore(node=TextNode(text=text, metadata={"university": "Stanford"}), score=1.0)]
+
+
+def _client(retriever=None):
+    # No lifespan: the engines are the offline stand-ins set below.
+    retriever = retriever or StaticRetriever()
+    api.query_engine = RetrieverQueryEngine.from_args(retriever, llm=MockLLM(max_tokens=4))
+    api.streaming_engine = RetrieverQueryEngine.from_args(retriever, llm=MockLLM(max_tokens=4), streaming=True)
+    api.answer_cache = AnswerCache()
+    api.fact_engine = None
+    api.context_compressor = None
+    return TestClient(api.app)
+
+
+def _events(body):
+    events = []
+    for block in body.strip().split("\n\n"):
+        event, data = block.split("\n")
+        events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+def test_stream_query():
+    client = _client()
+    response = client.post("/query/stream", json={"query": "Where is Stanford?"})
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _events(response.text)
+    tokens = [data["text"] for event, data in events if event == "token"]
+    assert len(tokens) == 4 and events[-1] == ("done", {"cache": "miss", "route": "graph"})
+
+    # The streamed answer was cached and is replayed in one event.
+    events = _events(client.post("/query/stream", json={"query": "where is stanford"}).text)
+    assert events == [("token", {"text": "".join(tokens)}), ("done", {"cache": "exact", "route": "graph"})]
+
+
+def test_batch_query():
+    retriever = StaticRetriever()
+    retriever.delay = 0.2
+    client = _client(retriever)
+    queries = ["Where is Stanford?", "Fees at Oxford?", "where is stanford", "Deadlines?"]
+
+    started = time.perf_counter()
+    body = client.post("/query/batch", json={"queries": queries, "max_concurrency": 3}).json()
+    # Three unique retrievals run concurrently rather than four sequential ones.
+    assert time.perf_counter() - started < 0.6
+    assert body["unique_queries"] == 3
+    assert [r["query"] for r in body["results"]] == queries
+    assert [r["deduplicated"] for r in body["results"]] == [False, False, True, False]
+    assert all(r["answer"] and r["latency_ms"] > 0 for r in body["results"])
+
+    assert client.post("/query/batch", json={"queries": []}).status_code == 400
+    too_many = [f"Question {i}?" for i in range(api.BATCH_MAX_QUERIES + 1)]
+    assert client.post("/query/batch", json={"queries": too_many}).status_code == 400
+
+
+def test_batch_concurrency_is_capped(monkeypatch):
+    retriever = ConcurrencyRetriever()
+    client = _client(retriever)
+    monkeypatch.setattr(api, "BATCH_CONCURRENCY_MAX", 2)
+    queries = [f"Where is campus {i}?" for i in range(6)]
+    body = client.post("/query/batch", json={"queries": queries, "max_concurrency": 500}).json()
+    assert len(body["results"]) == 6 and retriever.peak == 2
+
+
+def test_metrics():
+    client = _client()
+    response = client.post("/query", json={"query": "Where is Stanford?"})
+    stages = [entry.split(";")[0] for entry in response.headers["server-timing"].split(", ")]
+    assert stages == ["answer_cache", "retrieve", "synthesize"]
+
+    metrics = client.get("/metrics")
+    assert metrics.headers["content-type"].startswith("text/plain")
+    assert 'unigraph_stage_seconds_count{stage="synthesize"}' in metrics.text
+    assert 'unigraph_query_routes_total{route="graph"}' in metrics.text
+    assert 'unigraph_cache_requests_total{cache="answer",outcome="miss"}' in metrics.text
+
+
+def test_jobs():
+    client = _client()
+    # Not started, so submitted jobs stay queued.
+    api.job_runner = JobRunner(JobStore())
+    job = client.post("/jobs", json={"rank_from": 1, "rank_to": 2}).json()
+    assert job["status"] == "queued" and [i["university"] for i in job["items"]] == ["MIT", "Cambridge"]
+    assert client.get(f"/jobs/{job['id']}").json()["progress"] == 0.0
+    assert [j["id"] for j in client.get("/jobs").json()] == [job["id"]]
+    assert client.post("/jobs", json={"rank_from": 90, "rank_to": 99}).status_code == 400
+    assert client.get("/jobs/unknown").status_code == 404
+
+
+def test_sessions():
+    retriever = CountingRetriever()
+    client = _client(retriever)
+    session_id = client.post("/sessions").json()["session_id"]
+    first = client.post("/query", json={"query": "How much is tuition at Stanford?", "session_id": session_id}).json()
+    assert first["session_id"] == session_id and first["standalone_query"] is None
+
+    # The follow-up is condensed and answered from the previous turn's nodes.
+    follow_up = client.post("/query", json={"query": "and its fees?", "session_id": session_id}).json()
+    assert follow_up["standalone_query"] == "Stanford's fees?"
+    assert retriever.calls == 1
+
+    assert client.delete(f"/sessions/{session_id}").status_code == 204
+    assert client.delete(f"/sessions/{session_id}").status_code == 404
+
+
+def test_list_question_sees_every_university():
+    names = ["MIT", "Stanford", "Oxford", "Cambridge", "Harvard", "Caltech", "Imperial", "ETH Zurich"]
+    embed = KeywordEmbedding()
+    rows = [{"id": f"university:{name}", "level": "university", "name": name, "universities": [name],
+             "text": f"{name} offers engineering.", "embedding": embed.get_text_embedding(name)} for name in names]
+    retriever = RoutingRetriever(StaticRetriever(), SummaryRetriever(SummaryGraphStore(rows), embed))
+    client = _client(retriever)
+    # An echoing model answers with its prompt, i.e. the context it was given.
+    api.query_engine = RetrieverQueryEngine.from_args(retriever, llm=MockLLM())
+    api.context_compressor = ContextCompressor(score_fn=lambda query, texts: [1.0] * len(texts), top_n=2)
+    try:
+        body = client.post("/query", json={"query": "Which universities are in the database?"}).json()
+    finally:
+        api.context_compressor = None
+    assert body["route"] == "summaries"
+    assert all(f"{name} offers engineering." in body["answer"] for name in names)
+
+
+def test_reasoning_question_takes_multihop_route():
+    store = TraversalGraphStore()
+    multihop = MultiHopRetriever(store, TraversalBudget(max_hops=2, fan_out=3))
+    retriever = RoutingRetriever(StaticRetriever(), SummaryRetriever(SummaryGraphStore([]), KeywordEmbedding()), multihop)
+    client = _client(retriever)
+    api.query_engine = RetrieverQueryEngine.from_args(retriever, llm=MockLLM())
+    body = client.post("/query", json={"query": "Why does Stanford require a TOEFL score?"}).json()
+    # Answered from the chunks behind the traversed paths, within the hop budget.
+    assert body["route"] == "multihop" and "Text of c1." in body["answer"]
+    assert store.hops == 2
+
+    assert client.post("/query", json={"query": "Where is Stanford?"}).json()["route"] == "graph"
+
+
+if __name__ == "__main__":
+    test_stream_query()
+    test_batch_query()
+    test_metrics()
+    test_jobs()
+    test_sessions()
+    test_list_question_sees_every_university()
+    test_reasoning_question_takes_multihop_route()
@@ -0,0 +1,55 @@
+import sys
+import os
+import subprocess
+import time
+
+# Ensure the src directory is in the python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from fastapi.testclient import TestClient
+import src.api.main as api
+
+ROOT = os.path.join(os.path.dirname(__file__), '..', '..')
+
+
+def test_import_is_lightweight():
+    # A fresh interpreter must not pull in LlamaIndex or the model integrations.
+    code = (
+        "import sys, time; t = time.perf_counter(); import src.api.main; "
+        "print(time.perf_counter() - t, any(m.startswith('llama_index') for m in sys.modules))"
+    )
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    seconds, loaded = out.stdout.split()
+    assert loaded == "False"
+    assert float(seconds) < api.STARTUP_TARGET_SECONDS * 2
+
+
+def test_health_before_ready(monkeypatch):
+    def slow_build():
+        time.sleep(0.5)
+        return "engine", "streaming-engine", None, None, None
+
+    monkeypatch.setattr(api, "build_engines", slow_build)
+    monkeypatch.setattr(api, "startup", api.StartupState())
+    for name in ("query_engine", "streaming_engine", "answer_cache", "fact_engine", "context_compressor", "job_runner"):
+        monkeypatch.setattr(api, name, None)
+    # Jobs of a real deployment must not be resumed by the test app.
+    monkeypatch.setattr(api, "JOBS_DB", ":memory:")
+    with TestClient(api.app) as client:
+        assert client.get("/health").status_code == 200
+        assert client.get("/jobs").json() == []
+        response = client.get("/ready")
+        assert response.status_code == 503 and response.json()["status"] == "loading"
+        assert client.post("/query", json={"query": "Tell me about Stanford."}).status_code == 503
+
+        for _ in range(50):
+            if client.get("/ready").status_code == 200:
+                break
+            time.sleep(0.05)
+        state = client.get("/ready").json()
+        assert state["status"] == "ready" and state["warm_up_s"] >= 0.5
+        assert api.query_engine == "engine"
+
+
+if __name__ == "__main__":
+    test_import_is_lightweight()
@@ -0,0 +1,431 @@
+import asyncio
+import contextlib
+import io
+import json
+import logging
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Literal, Optional, Sequence
+
+# Ensure src is in python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import httpx
+import numpy as np
+from llama_index.core import PropertyGraphIndex, Settings
+from llama_index.core.indices.property_graph import ImplicitPathExtractor, SimpleLLMPathExtractor
+from llama_index.core.ingestion import run_transformations
+from llama_index.core.query_engine import RetrieverQueryEngine
+from pydantic import BaseModel
+from qdrant_client import QdrantClient
+from src.benchmarks.standins import (
+    FakeLLM,
+    FixtureCrawler,
+    FixtureSite,
+    HashEmbedding,
+    LocalGraphStore,
+    benchmark_queries,
+)
+from src.ingestion.cleaner import BoilerplateCleaner
+from src.ingestion.crawler import CrawlConfig, University, UniversityCrawler
+from src.ingestion.embedding import CachedEmbedding, VectorCache
+from src.ingestion.extraction_cache import CachedExtractor, ExtractionCache
+from src.ingestion.extraction_scheduler import ExtractionScheduler, ExtractionSchedulerConfig
+from src.ingestion.facts import FactStore
+from src.ingestion.graph_builder import iter_documents, refresh_facts
+from src.ingestion.page_store import PageStore
+from src.ingestion.vector_index import get_vector_store, index_chunks
+from src.retrieval.answer_cache import AnswerCache
+from src.retrieval.fact_retriever import FactQueryEngine
+from src.retrieval.graph_retriever import HybridGraphRetriever
+
+logger = logging.getLogger(__name__)
+
+BENCHMARK_DIR = os.getenv("BENCHMARK_DIR", os.path.join("data", "benchmarks"))
+StageName = Literal["crawl", "ingest", "retrieve", "api"]
+STAGES: List[StageName] = ["crawl", "ingest", "retrieve", "api"]
+
+
+class BenchmarkConfig(BaseModel):
+    """
+    Workload of a benchmark run.
+
+    Attributes:
+        data_dir (str): Crawled university JSON files the fixture site is built from.
+        universities (Optional[int]): Use only the first N universities.
+        stages (List[StageName]): Stages to run; later stages depend on earlier ones.
+        site_latency (float): Seconds the fixture site delays each response.
+        llm_latency (float): Seconds the fake LLM adds to each call.
+        queries (int): Queries sent in the retrieval and API stages.
+        concurrency (int): Concurrent fetches (crawl) and in-flight requests (API).
+        answer_cache (bool): Serve repeated API queries from the answer cache.
+    """
+    data_dir: str = os.path.join("data", "raw")
+    universities: Optional[int] = None
+    stages: List[StageName] = STAGES
+    site_latency: float = 0.0
+    llm_latency: float = 0.0
+    queries: int = 100
+    concurrency: int = 8
+    answer_cache: bool = False
+
+
+class StageResult(BaseModel):
+    """
+    Measurements of one stage. Latency percentiles are per item (page fetch, query,
+    request) and omitted for stages that process one batch; ``peak_memory_mb`` is the
+    process's peak resident set size while the stage ran.
+    """
+    stage: StageName
+    items: int
+    unit: str
+    elapsed_s: float
+    throughput: float
+    p50_ms: Optional[float] = None
+    p95_ms: Optional[float] = None
+    p99_ms: Optional[float] = None
+    peak_memory_mb: float
+    details: Dict[str, Any] = {}
+
+
+class BenchmarkReport(BaseModel):
+    """
+    One benchmark run, saved as JSON for comparison between commits.
+    """
+    commit: str
+    created_at: str
+    config: BenchmarkConfig
+    stages: List[StageResult] = []
+    max_rss_mb: float = 0.0
+
+
+def percentiles(latencies: Sequence[float]) -> Dict[str, Optional[float]]:
+    """Returns p50/p95/p99 of ``latencies`` (seconds) in milliseconds."""
+    if not latencies:
+        return {"p50_ms": None, "p95_ms": None, "p99_ms": None}
+    values = np.percentile(np.asarray(latencies) * 1000, [50, 95, 99])
+    return {"p50_ms": float(values[0]), "p95_ms": float(values[1]), "p99_ms": float(values[2])}
+
+
+def rss_bytes() -> int:
+    """Current resident set size of this process (its peak so far where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        # ru_maxrss is in kilobytes on Linux.
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+@contextlib.contextmanager
+def peak_rss(interval: float = 0.01):
+    """
+    Samples the resident set size every ``interval`` seconds from a background thread;
+    yields a one-item list holding the peak seen so far. Unlike ``tracemalloc``, it does
+    not slow down the code being measured.
+    """
+    peak = [rss_bytes()]
+    done = threading.Event()
+
+    def sample() -> None:
+        while not done.wait(interval):
+            peak[0] = max(peak[0], rss_bytes())
+
+    sampler = threading.Thread(target=sample, daemon=True)
+    sampler.start()
+    try:
+        yield peak
+    finally:
+        done.set()
+        sampler.join()
+        peak[0] = max(peak[0], rss_bytes())
+
+
+def measure(stage: StageName, unit: str, run: Callable[[], Dict[str, Any]]) -> StageResult:
+    """
+    Runs one stage, timing it and sampling its peak memory. ``run`` returns ``items``,
+    optional per-item ``latencies`` (seconds) and any further details to report.
+    """
+    with peak_rss() as peak:
+        started = time.perf_counter()
+        outcome = run()
+        elapsed = time.perf_counter() - started
+    items = outcome.pop("items")
+    latencies = outcome.pop("latencies", [])
+    result = StageResult(
+        stage=stage,
+        items=items,
+        unit=unit,
+        elapsed_s=elapsed,
+        throughput=items / elapsed if elapsed > 0 else 0.0,
+        peak_memory_mb=peak[0] / 1024 / 1024,
+        details=outcome,
+        **percentiles(latencies),
+    )
+    logger.info(
+        f"Benchmark {stage}: {items} {unit} in {elapsed:.2f}s ({result.throughput:.1f}/s), "
+        f"p50 {result.p50_ms or 0:.1f} ms, p95 {result.p95_ms or 0:.1f} ms, p99 {result.p99_ms or 0:.1f} ms, "
+        f"peak {result.peak_memory_mb:.1f} MB"
+    )
+    return result
+
+
+class BenchmarkRun:
+    """
+    Runs the pipeline end to end against local stand-ins: the crawler against a fixture
+    HTTP server, ingestion into an in-memory graph and Qdrant with a fake LLM and
+    embedding model, retrieval, and the FastAPI app under concurrent load.
+    """
+
+    def __init__(self, config: BenchmarkConfig, workdir: str):
+        """
+        Initializes the BenchmarkRun.
+
+        Args:
+            config (BenchmarkConfig): Workload.
+            workdir (str): Scratch directory for crawl output and caches.
+        """
+        self.config = config
+        self.workdir = workdir
+        self.page_dir = os.path.join(workdir, "pages")
+        self.llm = FakeLLM(latency=config.llm_latency)
+        self.embed_model: Any = None
+        self.graph_store: Any = None
+        self.vector_store: Any = None
+        self.fact_store: Optional[FactStore] = None
+        self.universities: List[str] = []
+
+    def crawl(self) -> Dict[str, Any]:
+        site = FixtureSite(self.config.data_dir, self.config.universities, latency=self.config.site_latency)
+        fetcher = FixtureCrawler()
+        config = CrawlConfig(
+            max_concurrency=self.config.concurrency,
+            per_domain_concurrency=self.config.concurrency,
+            per_domain_delay=0.0,
+            max_pages=10_000,
+            retry_backoff=0.0,
+            page_store=self.page_dir,
+        )
+        crawler = UniversityCrawler(config, crawler_factory=lambda: fetcher)
+        with site, contextlib.redirect_stdout(io.StringIO()):
+            universities = [
+                University(name=name, url=f"{site.base_url}/{slug}", rank=rank)
+                for rank, (name, slug) in enumerate(site.sites, 1)
+            ]
+            asyncio.run(crawler.crawl_universities(universities))
+        return {"items": crawler.stats.pages_fetched, "latencies": fetcher.latencies,
+                "failed": crawler.stats.pages_failed, "universities": len(universities)}
+
+    def ingest(self) -> Dict[str, Any]:
+        self.embed_model = CachedEmbedding(HashEmbedding(), VectorCache(os.path.join(self.workdir, "embeddings")))
+        Settings.embed_model, Settings.llm = self.embed_model, self.llm
+        store = PageStore(self.page_dir)
+        # Without a crawl stage, ingest the fixture files directly.
+        crawled = len(store) > 0
+        if not crawled:
+            store.import_json(self.config.data_dir)
+        documents = list(iter_documents(store, cleaner=BoilerplateCleaner()))
+        store.close()
+        if self.config.universities and not crawled:
+            names = sorted({d.metadata["university"] for d in documents})[:self.config.universities]
+            documents = [d for d in documents if d.metadata["university"] in names]
+        self.universities = sorted({d.metadata["university"] for d in documents})
+
+        self.fact_store = FactStore()
+        facts = refresh_facts(documents, self.fact_store)
+        scheduler = ExtractionScheduler(ExtractionSchedulerConfig(
+            num_workers=self.config.concurrency, requests_per_minute=1e9,
+        ))
+        extractors = [
+            CachedExtractor(extractor=SimpleLLMPathExtractor(llm=self.llm, num_workers=1),
+                            cache=ExtractionCache(), scheduler=scheduler),
+            ImplicitPathExtractor(),
+        ]
+        nodes = run_transformations(documents, Settings.transformations)
+        self.graph_store = LocalGraphStore()
+        PropertyGraphIndex(nodes=nodes, llm=self.llm, property_graph_store=self.graph_store,
+                           kg_extractors=extractors, embed_model=self.embed_model)
+        self.vector_store = get_vector_store(QdrantClient(location=":memory:"), collection_name="benchmark_chunks")
+        index_chunks(self.vector_store, nodes, self.embed_model)
+        return {
+            "items": len(nodes),
+            "documents": len(documents),
+            "facts": facts,
+            "entities": len(self.graph_store.graph.nodes) - len(nodes),
+            "relations": len(self.graph_store.graph.relations),
+        }
+
+    def _queries(self) -> List[str]:
+        questions = benchmark_queries(self.universities)
+        return [questions[i % len(questions)] for i in range(self.config.queries)]
+
+    def retrieve(self) -> Dict[str, Any]:
+        retriever = HybridGraphRetriever(self.vector_store, self.graph_store, self.embed_model, similarity_top_k=5)
+        latencies, hits = [], 0
+
+        async def run() -> None:
+            nonlocal hits
+            for query in self._queries():
+                started = time.perf_counter()
+                hits += len(await retriever.aretrieve_filtered(query))
+                latencies.append(time.perf_counter() - started)
+
+        asyncio.run(run())
+        return {"items": len(latencies), "latencies": latencies, "results_per_query": hits / max(1, len(latencies))}
+
+    def api(self) -> Dict[str, Any]:
+        import src.api.main as api
+
+        retriever = HybridGraphRetriever(self.vector_store, self.graph_store, self.embed_model, similarity_top_k=5)
+        engines = {
+            "query_engine": RetrieverQueryEngine.from_args(retriever, llm=self.llm),
+            "streaming_engine": RetrieverQueryEngine.from_args(retriever, llm=self.llm, streaming=True),
+            "answer_cache": AnswerCache() if self.config.answer_cache else None,
+            "fact_engine": FactQueryEngine(self.fact_store),
+        }
+        latencies, statuses, routes = [], {}, {}
+
+        async def run() -> None:
+            semaphore = asyncio.Semaphore(self.config.concurrency)
+            transport = httpx.ASGITransport(app=api.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://benchmark", timeout=60) as client:
+                async def send(query: str) -> None:
+                    async with semaphore:
+                        started = time.perf_counter()
+                        response = await client.post("/query", json={"query": query})
+                        latencies.append(time.perf_counter() - started)
+                    statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+                    if response.status_code == 200:
+                        route = response.json()["route"]
+                        routes[route] = routes.get(route, 0) + 1
+
+                await asyncio.gather(*(send(query) for query in self._queries()))
+
+        # The app's engines are module globals: swap in the stand-ins for this stage only.
+        saved = {name: getattr(api, name) for name in engines}
+        try:
+            for name, value in engines.items():
+                setattr(api, name, value)
+            asyncio.run(run())
+        finally:
+            for name, value in saved.items():
+                setattr(api, name, value)
+        return {"items": len(latencies), "latencies": latencies,
+                "statuses": {str(k): v for k, v in statuses.items()}, "routes": routes}
+
+    def run(self) -> List[StageResult]:
+        """Runs the configured stages in pipeline order."""
+        units = {"crawl": "pages", "ingest": "chunks", "retrieve": "queries", "api": "requests"}
+        results = []
+        for stage in STAGES:
+            if stage in self.config.stages:
+                results.append(measure(stage, units[stage], getattr(self, stage)))
+            elif stage == "ingest" and any(s in self.config.stages for s in ("retrieve", "api")):
+                # Retrieval needs an index; build it unmeasured.
+                self.ingest()
+        if self.fact_store is not None:
+            self.fact_store.close()
+        return results
+
+
+def git_commit() -> str:
+    """Returns the short hash of HEAD, or "unknown" outside a git checkout."""
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_benchmark(config: BenchmarkConfig) -> BenchmarkReport:
+    """Runs a benchmark in a scratch directory and returns its report."""
+    report = BenchmarkReport(commit=git_commit(), created_at=datetime.now(timezone.utc).isoformat(), config=config)
+    with tempfile.TemporaryDirectory(prefix="unigraph-bench-") as workdir:
+        report.stages = BenchmarkRun(config, workdir).run()
+    # ru_maxrss is in kilobytes on Linux.
+    report.max_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return report
+
+
+def save_report(report: BenchmarkReport, directory: str = BENCHMARK_DIR) -> str:
+    """Writes ``report`` to ``<directory>/<timestamp>-<commit>.json`` and returns the path."""
+    os.makedirs(directory, exist_ok=True)
+    stamp = report.created_at[:19].replace(":", "").replace("-", "")
+    path = os.path.join(directory, f"{stamp}-{report.commit}.json")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(report.model_dump_json(indent=2))
+    return path
+
+
+def latest_report(directory: str = BENCHMARK_DIR, exclude: Optional[str] = None) -> Optional[BenchmarkReport]:
+    """Loads the most recent saved report in ``directory`` other than ``exclude``."""
+    if not os.path.isdir(directory):
+        return None
+    paths = sorted(
+        os.path.join(directory, f) for f in os.listdir(directory)
+        if f.endswith(".json") and os.path.join(directory, f) != exclude
+    )
+    if not paths:
+        return None
+    with open(paths[-1], "r", encoding="utf-8") as f:
+        return BenchmarkReport.model_validate(json.load(f))
+
+
+def compare(previous: BenchmarkReport, current: BenchmarkReport) -> str:
+    """Formats a table of each stage's metrics with the relative change from ``previous``."""
+    before = {stage.stage: stage for stage in previous.stages}
+    lines = [f"{'stage':<9} {'metric':<15} {previous.commit:>12} {current.commit:>12} {'change':>8}"]
+    for stage in current.stages:
+        old = before.get(stage.stage)
+        for metric in ("throughput", "p50_ms", "p95_ms", "p99_ms", "peak_memory_mb"):
+            new_value = getattr(stage, metric)
+            old_value = getattr(old, metric) if old else None
+            if new_value is None:
+                continue
+            change = f"{(new_value - old_value) / old_value:+.1%}" if old_value else "n/a"
+            old_text = f"{old_value:.2f}" if old_value is not None else "-"
+            lines.append(f"{stage.stage:<9} {metric:<15} {old_text:>12} {new_value:>12.2f} {change:>8}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+    # Per-query INFO logs of the pipeline would dominate the output (and the timings).
+    logging.getLogger().setLevel(logging.WARNING)
+    logger.setLevel(logging.INFO)
+    parser = argparse.ArgumentParser(description="End-to-end benchmark against local stand-ins.")
+    parser.add_argument("--stages", default=",".join(STAGES), help="Comma-separated subset of crawl,ingest,retrieve,api.")
+    parser.add_argument("--universities", type=int, default=None, help="Use only the first N universities.")
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--site-latency", type=float, default=0.0, help="Seconds added to each fixture page.")
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Seconds added to each fake LLM call.")
+    parser.add_argument("--answer-cache", action="store_true", help="Enable the answer cache in the API stage.")
+    parser.add_argument("--output", default=BENCHMARK_DIR, help="Directory reports are saved to.")
+    parser.add_argument("--compare", default=None, help="Report to compare against (default: the latest saved).")
+    args = parser.parse_args()
+
+    report = run_benchmark(BenchmarkConfig(
+        stages=[s.strip() for s in args.stages.split(",") if s.strip()],
+        universities=args.universities,
+        queries=args.queries,
+        concurrency=args.concurrency,
+        site_latency=args.site_latency,
+        llm_latency=args.llm_latency,
+        answer_cache=args.answer_cache,
+    ))
+    path = save_report(report, args.output)
+    print(f"Saved {path} (max RSS {report.max_rss_mb:.0f} MB)")
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            previous = BenchmarkReport.model_validate(json.load(f))
+    else:
+        previous = latest_report(args.output, exclude=path)
+    baseline = previous or report.model_copy(update={"commit": "-", "stages": []})
+    print(compare(baseline, report))
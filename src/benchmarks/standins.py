@@ -0,0 +1,270 @@
+import re
+import asyncio
+import json
+import os
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import aiohttp
+import numpy as np
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.core.graph_stores import SimplePropertyGraphStore
+from llama_index.core.llms import CompletionResponse, CompletionResponseGen, CustomLLM, LLMMetadata
+from llama_index.core.llms.callbacks import llm_completion_callback
+from src.retrieval.graph_retriever import GRAPH_EXPANSION_QUERY
+
+# Local, deterministic stand-ins for the web, Gemini, FastEmbed and Neo4j, so the
+# benchmark measures this repository's code and nothing else.
+
+CAPITALIZED = re.compile(r"\b[A-Z][\w&'-]*(?:\s+(?:of\s+)?[A-Z][\w&'-]*)*")
+RELATIONS = [
+    ("HAS_DEADLINE", re.compile(r"\b(deadline|due|apply by)\b", re.I)),
+    ("HAS_FEE", re.compile(r"\b(tuition|fees?|cost)\b", re.I)),
+    ("REQUIRES", re.compile(r"\b(require[sd]?|requirements?|minimum)\b", re.I)),
+    ("OFFERS", re.compile(r"\b(offers?|programs?|degrees?|majors?)\b", re.I)),
+]
+
+
+class FakeLLM(CustomLLM):
+    """
+    Deterministic LLM stand-in. Knowledge-graph extraction prompts get triplets linking
+    the capitalized phrases of each sentence; any other prompt gets an answer built from
+    the start of its context, streamed word by word.
+
+    Attributes:
+        latency (float): Seconds added to every call, to emulate a remote model.
+        answer_words (int): Length of generated answers.
+    """
+    latency: float = 0.0
+    answer_words: int = 40
+
+    @property
+    def metadata(self) -> LLMMetadata:
+        return LLMMetadata(model_name="fake-llm", context_window=32768, num_output=256)
+
+    @staticmethod
+    def triplets(text: str, limit: int = 10) -> List[Tuple[str, str, str]]:
+        """Extracts up to ``limit`` (subject, relation, object) triplets from ``text``."""
+        found = []
+        for sentence in re.split(r"[.!?\n]+", text):
+            phrases = list(dict.fromkeys(m.group(0).strip() for m in CAPITALIZED.finditer(sentence)))
+            if len(phrases) < 2:
+                continue
+            relation = next((name for name, pattern in RELATIONS if pattern.search(sentence)), "RELATED_TO")
+            found.append((phrases[0], relation, phrases[1]))
+            if len(found) >= limit:
+                break
+        return found
+
+    def _text(self, prompt: str) -> str:
+        if "Triplets:" in prompt and "Text:" in prompt:
+            text = prompt.rsplit("Text:", 1)[1].rsplit("Triplets:", 1)[0]
+            return "\n".join(f"({s}, {r}, {o})" for s, r, o in self.triplets(text))
+        context = prompt.split("---------------------")[1] if "---------------------" in prompt else prompt
+        return " ".join(context.split()[:self.answer_words])
+
+    @llm_completion_callback()
+    def complete(self, prompt: str, formatted: bool = False, **kwargs: Any) -> CompletionResponse:
+        time.sleep(self.latency)
+        return CompletionResponse(text=self._text(prompt))
+
+    @llm_completion_callback()
+    async def acomplete(self, prompt: str, formatted: bool = False, **kwargs: Any) -> CompletionResponse:
+        await asyncio.sleep(self.latency)
+        return CompletionResponse(text=self._text(prompt))
+
+    @llm_completion_callback()
+    def stream_complete(self, prompt: str, formatted: bool = False, **kwargs: Any) -> CompletionResponseGen:
+        time.sleep(self.latency)
+        text = ""
+        for word in self._text(prompt).split(" "):
+            delta = word if not text else " " + word
+            text += delta
+            yield CompletionResponse(text=text, delta=delta)
+
+
+class HashEmbedding(BaseEmbedding):
+    """Deterministic bag-of-words embedding: each lowercased word hashed into one of ``dim`` buckets."""
+
+    dim: int = 128
+
+    def _vector(self, text: str) -> List[float]:
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for word in re.findall(r"\w+", text.lower()):
+            vector[zlib.crc32(word.encode("utf-8")) % self.dim] += 1.0
+        norm = float(np.linalg.norm(vector))
+        return (vector / norm if norm else vector).tolist()
+
+    def _get_text_embedding(self, text: str) -> List[float]:
+        return self._vector(text)
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        return [self._vector(text) for text in texts]
+
+    def _get_query_embedding(self, query: str) -> List[float]:
+        return self._vector(query)
+
+    async def _aget_query_embedding(self, query: str) -> List[float]:
+        return self._vector(query)
+
+
+class LocalGraphStore(SimplePropertyGraphStore):
+    """
+    In-memory property graph that also answers the hybrid retriever's graph expansion
+    query (entity name match, then the chunks mentioning those entities), standing in
+    for Neo4j. Other Cypher queries raise, like an unavailable server would.
+    """
+
+    def structured_query(self, query: str, param_map: Optional[Dict[str, Any]] = None) -> Any:
+        if query != GRAPH_EXPANSION_QUERY:
+            raise NotImplementedError("LocalGraphStore only answers GRAPH_EXPANSION_QUERY.")
+        params = param_map or {}
+        terms = [t for t in params["search"].lower().split(" or ") if t]
+        nodes = self.graph.nodes
+        scores: Dict[str, float] = {}
+        entities: Dict[str, List[str]] = {}
+        for node in nodes.values():
+            chunk_id = node.properties.get("triplet_source_id")
+            name = getattr(node, "name", "").lower()
+            score = sum(term in name for term in terms)
+            if not score or chunk_id not in nodes:
+                continue
+            chunk = nodes[chunk_id].properties
+            if params.get("university") not in (None, chunk.get("university")):
+                continue
+            if params.get("type") not in (None, chunk.get("type")):
+                continue
+            scores[chunk_id] = scores.get(chunk_id, 0.0) + score
+            entities.setdefault(chunk_id, []).append(node.id)
+        rows = []
+        for chunk_id in sorted(scores, key=scores.get, reverse=True)[:params["top_k"]]:
+            chunk = nodes[chunk_id]
+            names = set(entities[chunk_id])
+            triplets = [
+                f"{r.source_id} {r.label} {r.target_id}"
+                for r in self.graph.relations.values()
+                if r.source_id in names and r.properties.get("triplet_source_id") == chunk_id
+            ][:params["triplet_limit"]]
+            rows.append({
+                "id": chunk_id, "text": chunk.text, "score": scores[chunk_id], "triplets": triplets,
+                **{k: chunk.properties.get(k) for k in ("url", "title", "university", "type")},
+            })
+        return rows
+
+
+class FixtureSite:
+    """
+    Serves the crawled pages in ``data/raw/*.json`` from a local HTTP server: one site
+    per university at ``/<slug>``, whose root page links to its sub-pages at
+    ``/<slug>/admission/<n>``.
+    """
+
+    def __init__(self, data_dir: str, universities: Optional[int] = None, latency: float = 0.0):
+        """
+        Initializes the FixtureSite.
+
+        Args:
+            data_dir (str): Directory of crawled university JSON files.
+            universities (Optional[int]): Serve only the first N universities (by file name).
+            latency (float): Seconds each response is delayed, to emulate remote servers.
+        """
+        self.latency = latency
+        self.pages: Dict[str, str] = {}
+        self.sites: List[Tuple[str, str]] = []
+        files = sorted(f for f in os.listdir(data_dir) if f.endswith(".json"))[:universities]
+        for filename in files:
+            with open(os.path.join(data_dir, filename), "r", encoding="utf-8") as f:
+                data = json.load(f)
+            slug = filename[:-len(".json")]
+            subs = [sub.get("content") or "" for sub in data.get("sub_pages", [])]
+            links = "\n".join(f"* [Admission page {i}](/{slug}/admission/{i})" for i in range(len(subs)))
+            self.pages[f"/{slug}"] = f"{data.get('content') or ''}\n\n{links}"
+            for i, content in enumerate(subs):
+                self.pages[f"/{slug}/admission/{i}"] = content
+            self.sites.append((data.get("name", slug), slug))
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def start(self) -> "FixtureSite":
+        """Starts serving on a free local port."""
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body = site.pages.get(self.path.split("?")[0])
+                if body is None:
+                    self.send_error(404)
+                    return
+                time.sleep(site.latency)
+                data = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/markdown; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def __enter__(self) -> "FixtureSite":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+
+class FixtureCrawler:
+    """
+    Stand-in for Crawl4AI's ``AsyncWebCrawler``: fetches markdown over plain HTTP and
+    records the latency of every fetch.
+    """
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def __aenter__(self) -> "FixtureCrawler":
+        self._session = aiohttp.ClientSession()
+        return self
+
+    async def __aexit__(self, *exc: Any) -> bool:
+        await self._session.close()
+        return False
+
+    async def arun(self, url: str) -> Any:
+        started = time.perf_counter()
+        async with self._session.get(url) as response:
+            body = await response.text()
+        self.latencies.append(time.perf_counter() - started)
+        return SimpleNamespace(
+            success=response.status == 200, markdown=body, links={}, status_code=response.status,
+            error_message="" if response.status == 200 else response.reason,
+            response_headers=dict(response.headers),
+        )
+
+
+def benchmark_queries(universities: Sequence[str]) -> List[str]:
+    """Question mix used by the retrieval and API stages."""
+    templates = [
+        "What are the admission requirements at {u}?",
+        "When is the application deadline for {u}?",
+        "How much is tuition at {u}?",
+        "Does {u} offer financial aid for international students?",
+        "Tell me about {u}.",
+    ]
+    return [t.format(u=u) for u in universities for t in templates]
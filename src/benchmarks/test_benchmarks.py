@@ -0,0 +1,45 @@
+import sys
+import os
+import tempfile
+
+# Ensure the src directory is in the python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.benchmarks.run import BenchmarkConfig, compare, latest_report, run_benchmark, save_report
+from src.benchmarks.standins import FakeLLM
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'raw')
+
+
+def test_fake_llm_triplets():
+    triplets = FakeLLM.triplets("Stanford University offers Computer Science. no capitals here.\nApply to MIT by January.")
+    assert triplets == [("Stanford University", "OFFERS", "Computer Science"), ("Apply", "RELATED_TO", "MIT")]
+
+
+def test_end_to_end_benchmark():
+    import src.api.main as api
+
+    config = BenchmarkConfig(data_dir=DATA_DIR, universities=1, queries=6, concurrency=3)
+    engines = (api.query_engine, api.answer_cache, api.fact_engine)
+    report = run_benchmark(config)
+    # The API stage's stand-ins do not leak into the app.
+    assert (api.query_engine, api.answer_cache, api.fact_engine) == engines
+    stages = {stage.stage: stage for stage in report.stages}
+    assert list(stages) == ["crawl", "ingest", "retrieve", "api"]
+    assert stages["crawl"].items > 1 and stages["crawl"].details["failed"] == 0
+    assert stages["ingest"].details["documents"] > 0 and stages["ingest"].details["relations"] > 0
+    assert stages["retrieve"].items == 6 and stages["retrieve"].p99_ms >= stages["retrieve"].p50_ms
+    assert stages["api"].details["statuses"] == {"200": 6}
+    assert all(stage.throughput > 0 and stage.peak_memory_mb > 0 for stage in report.stages)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = save_report(report, directory)
+        previous = latest_report(directory)
+        assert previous == report and latest_report(directory, exclude=path) is None
+    table = compare(previous, report)
+    assert "api       p95_ms" in table and "+0.0%" in table
+
+
+if __name__ == "__main__":
+    test_fake_llm_triplets()
+    test_end_to_end_benchmark()
@@ -1,9 +1,36 @@
 import streamlit as st
 import requests
 import json
+import uuid
 
 # Configuration
-API_URL = "http://localhost:8000/query"
+STREAM_URL = "http://localhost:8000/query/stream"
+JOBS_URL = "http://localhost:8000/jobs"
+
+
+def stream_answer(prompt, session_id=None):
+    """
+    Yields answer text deltas from the streaming endpoint as they arrive.
+
+    Args:
+        prompt (str): User question.
+        session_id (str): Conversation the question continues, so follow-ups resolve.
+
+    Raises:
+        RuntimeError: If the API reports an error during generation.
+    """
+    with requests.post(STREAM_URL, json={"query": prompt, "session_id": session_id}, stream=True, timeout=(5, 300)) as response:
+        response.raise_for_status()
+        event = None
+        for line in response.iter_lines(decode_unicode=True):
+            if line.startswith("event:"):
+                event = line[len("event:"):].strip()
+            elif line.startswith("data:"):
+                data = json.loads(line[len("data:"):])
+                if event == "token":
+                    yield data["text"]
+                elif event == "error":
+                    raise RuntimeError(data.get("detail", "unknown error"))
 
 st.set_page_config(
     page_title="Offer-Pilot Graph Chat",
@@ -20,6 +47,9 @@ This system retrieves answers directly from the Neo4j Knowledge Graph.
 # Initialize chat history
 if "messages" not in st.session_state:
     st.session_state.messages = []
+# The API keeps the conversation's context under this id
+if "session_id" not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex
 
 # Display chat messages from history
 for message in st.session_state.messages:
@@ -40,16 +70,16 @@ if prompt := st.chat_input("Ask a question (e.g., 'Tell me about Stanford's loca
         full_response = ""
         
         try:
-            with st.spinner("Searching Knowledge Graph..."):
-                response = requests.post(API_URL, json={"query": prompt})
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    answer = data.get("answer", "No answer received.")
-                    full_response = answer
-                else:
-                    full_response = f"Error: {response.status_code} - {response.text}"
+            # Render tokens as they arrive instead of waiting for the whole answer.
+            message_placeholder.markdown("_Searching Knowledge Graph..._")
+            for text in stream_answer(prompt, st.session_state.session_id):
+                full_response += text
+                message_placeholder.markdown(full_response + "▌")
+            if not full_response:
+                full_response = "No answer received."
                     
+        except requests.exceptions.HTTPError as e:
+            full_response = f"Error: {e.response.status_code} - {e.response.text}"
         except requests.exceptions.ConnectionError:
             full_response = "Error: Could not connect to the Backend API. Is it running?"
         except Exception as e:
@@ -65,14 +95,40 @@ with st.sidebar:
     st.header("Status")
     if st.button("Check API Connection"):
         try:
-            r = requests.get("http://localhost:8000/health")
+            r = requests.get("http://localhost:8000/ready")
+            state = r.json()
             if r.status_code == 200:
                 st.success("API is Online")
+            elif state.get("status") in ("starting", "loading"):
+                st.warning("API is Online; the Query Engine is still loading.")
             else:
-                st.error(f"API Returned {r.status_code}")
+                st.error(f"API Returned {r.status_code}: {state.get('error')}")
         except:
             st.error("API is Offline")
     
+    st.markdown("---")
+    st.header("Crawl Universities")
+    rank_from, rank_to = st.slider("QS rank range", min_value=1, max_value=200, value=(1, 5))
+    if st.button("Crawl & Ingest"):
+        try:
+            r = requests.post(JOBS_URL, json={"rank_from": rank_from, "rank_to": rank_to}, timeout=10)
+            r.raise_for_status()
+            st.session_state.job_id = r.json()["id"]
+        except requests.exceptions.RequestException as e:
+            st.error(f"Could not submit the crawl job: {e}")
+    if st.session_state.get("job_id"):
+        # Job status is a single cheap lookup; refresh it whenever the page reruns.
+        try:
+            job = requests.get(f"{JOBS_URL}/{st.session_state.job_id}", timeout=5).json()
+            st.progress(job["progress"], text=f"Job {job['id']}: {job['status']}")
+            for item in job["items"]:
+                detail = f" ({item['error']})" if item["error"] else ""
+                st.caption(f"{item['university']}: {item['stage']}, {item['pages']} pages{detail}")
+            if job["status"] in ("queued", "running"):
+                st.button("Refresh progress")
+        except requests.exceptions.RequestException:
+            st.warning("Could not load the crawl job's progress.")
+
     st.markdown("---")
     st.markdown("### Sample Questions")
     st.markdown("- Which universities are in the database?")
@@ -0,0 +1,176 @@
+import hashlib
+import re
+from collections import Counter
+from typing import List, Set, Tuple
+from pydantic import BaseModel
+
+# [text](url) and ![alt](src) markdown links
+MARKDOWN_LINK = re.compile(r'!?\[[^\]]*\]\([^)]*\)')
+# Characters left over on a line that held nothing but links (bullets, separators, ...)
+LINK_LINE_RESIDUE = re.compile(r'^[\s*\-+|•·>#\d.]*$')
+# In-page anchors such as "#main-content" that vary per page but not per block
+URL_FRAGMENT = re.compile(r'#[^)\s"]*(?=[)\s"])')
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough LLM token estimate (~4 characters per token) used for reporting savings."""
+    return (len(text) + 3) // 4
+
+
+class CleaningReport(BaseModel):
+    """
+    Size of one university's pages before and after boilerplate stripping.
+    """
+    university: str
+    pages: int
+    duplicate_pages: int = 0
+    boilerplate_lines: int = 0
+    link_lines: int = 0
+    bytes_before: int = 0
+    bytes_after: int = 0
+    tokens_before: int = 0
+    tokens_after: int = 0
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.bytes_before - self.bytes_after
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_before - self.tokens_after
+
+
+class BoilerplateCleaner:
+    """
+    Strips navigation menus, footers and other site chrome from crawled markdown.
+
+    Works per site: blocks of lines (shingles) that occur on a large share of the same
+    university's pages are treated as boilerplate, as are runs of lines that contain
+    nothing but links. Blocks repeated on only a few pages (a deadline sentence on a
+    program page and its overview page) are real content and stay on every page that has
+    them; extraction and chunking deduplicate them. Pages that are (near-)duplicates of an
+    earlier page, typically the same page reached through another URL, are emptied entirely.
+    """
+
+    def __init__(self, shingle_size: int = 3, min_pages: int = 3, min_fraction: float = 0.5,
+                 min_link_run: int = 3, near_duplicate: float = 0.9):
+        """
+        Initializes the BoilerplateCleaner.
+
+        Args:
+            shingle_size (int): Number of consecutive lines hashed together as one shingle.
+            min_pages (int): A shingle must be seen on at least this many pages to be boilerplate.
+            min_fraction (float): ...and on at least this fraction of the site's distinct pages.
+            min_link_run (int): Minimum run of consecutive link-only lines that is dropped.
+            near_duplicate (float): Shingle Jaccard similarity above which a page counts as
+                a duplicate of an earlier one.
+        """
+        self.shingle_size = shingle_size
+        self.min_pages = min_pages
+        self.min_fraction = min_fraction
+        self.min_link_run = min_link_run
+        self.near_duplicate = near_duplicate
+        self.reports: List[CleaningReport] = []
+
+    @staticmethod
+    def _normalize(line: str) -> str:
+        return " ".join(URL_FRAGMENT.sub("", line).split()).lower()
+
+    @staticmethod
+    def _is_link_only(line: str) -> bool:
+        return bool(MARKDOWN_LINK.search(line)) and bool(LINK_LINE_RESIDUE.match(MARKDOWN_LINK.sub("", line)))
+
+    def _shingles(self, lines: List[str]) -> List[Tuple[int, str]]:
+        """Returns (start index, hash) for every window of ``shingle_size`` non-empty lines."""
+        keyed = [(i, self._normalize(l)) for i, l in enumerate(lines) if l.strip()]
+        size = min(self.shingle_size, len(keyed))
+        shingles = []
+        for start in range(len(keyed) - size + 1):
+            window = "\n".join(text for _, text in keyed[start:start + size])
+            shingles.append((start, hashlib.md5(window.encode("utf-8")).hexdigest()))
+        return shingles
+
+    def _link_runs(self, lines: List[str]) -> Set[int]:
+        """Indices of lines inside runs of at least ``min_link_run`` link-only lines."""
+        dropped: Set[int] = set()
+        run: List[int] = []
+        for i, line in enumerate(lines + [""]):
+            if line.strip() and self._is_link_only(line):
+                run.append(i)
+                continue
+            if not line.strip() and run and i < len(lines):
+                # Blank lines inside a link list do not break the run.
+                continue
+            if len(run) >= self.min_link_run:
+                dropped.update(run)
+            run = []
+        return dropped
+
+    def clean_site(self, university: str, pages: List[str]) -> List[str]:
+        """
+        Cleans all pages of one university and records a ``CleaningReport``.
+
+        Args:
+            university (str): University name, used in the report.
+            pages (List[str]): Markdown of every page of the site (main page first).
+
+        Returns:
+            List[str]: Cleaned markdown aligned with ``pages``; duplicates become "".
+        """
+        report = CleaningReport(university=university, pages=len(pages))
+        report.bytes_before = sum(len(p.encode("utf-8")) for p in pages)
+        report.tokens_before = sum(estimate_tokens(p) for p in pages)
+
+        split = [page.splitlines() for page in pages]
+        page_shingles = [self._shingles(lines) for lines in split]
+
+        # 1. Duplicate pages (same content under another URL) are dropped outright;
+        #    otherwise every line they share with the original would look like boilerplate.
+        kept_sets: List[Set[str]] = []
+        unique: List[bool] = []
+        for shingles in page_shingles:
+            digests = {digest for _, digest in shingles}
+            duplicate = any(
+                len(digests & other) >= self.near_duplicate * len(digests | other)
+                for other in kept_sets
+            )
+            unique.append(not duplicate)
+            if not duplicate:
+                kept_sets.append(digests)
+        report.duplicate_pages = unique.count(False)
+
+        # 2. Count on how many distinct pages each shingle occurs.
+        frequency: Counter = Counter()
+        for digests in kept_sets:
+            frequency.update(digests)
+        threshold = max(self.min_pages, self.min_fraction * len(kept_sets))
+
+        cleaned = []
+        for lines, keep, shingles in zip(split, unique, page_shingles):
+            if not keep:
+                cleaned.append("")
+                continue
+
+            # 3. Drop every line covered by a shingle on a large share of the pages. Each
+            #    page keeps its other blocks, so its cleaned text depends only on its own
+            #    raw content and the site's boilerplate.
+            content_idx = [i for i, l in enumerate(lines) if l.strip()]
+            size = min(self.shingle_size, len(content_idx))
+            boilerplate: Set[int] = set()
+            for start, digest in shingles:
+                if frequency[digest] >= threshold:
+                    boilerplate.update(content_idx[start:start + size])
+
+            # 4. Drop runs of link-only lines (menus, footer link lists).
+            links = self._link_runs(lines) - boilerplate
+            report.boilerplate_lines += len(boilerplate)
+            report.link_lines += len(links)
+
+            kept = [l for i, l in enumerate(lines) if i not in boilerplate and i not in links]
+            text = re.sub(r'\n{3,}', '\n\n', "\n".join(kept)).strip()
+            cleaned.append(text)
+
+        report.bytes_after = sum(len(p.encode("utf-8")) for p in cleaned)
+        report.tokens_after = sum(estimate_tokens(p) for p in cleaned)
+        self.reports.append(report)
+        return cleaned
@@ -0,0 +1,124 @@
+import hashlib
+import os
+import sqlite3
+import time
+from typing import Dict, Literal, Mapping, Optional
+from pydantic import BaseModel
+
+PageStatus = Literal["new", "changed", "unchanged"]
+
+
+def content_hash(content: str) -> str:
+    """Returns the SHA-256 hex digest of a page's markdown."""
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+class CacheEntry(BaseModel):
+    """
+    Last known state of a page: HTTP validators, content hash and the content itself.
+    """
+    url: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_hash: str
+    content: str
+    status: PageStatus
+    fetched_at: float
+
+
+class CrawlCache:
+    """
+    Conditional re-crawl cache keyed by canonical URL and backed by SQLite.
+
+    Stores ETag/Last-Modified validators and a content hash per page, so a re-crawl can
+    skip pages the server reports as not modified (304) and flag pages whose markdown is
+    byte-identical as unchanged.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        """
+        Initializes the CrawlCache.
+
+        Args:
+            path (str): SQLite file path, or ``:memory:`` for a throwaway cache.
+        """
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                content_hash TEXT NOT NULL,
+                content TEXT NOT NULL,
+                status TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        """Closes the underlying SQLite connection."""
+        self._conn.close()
+
+    def get(self, url: str) -> Optional[CacheEntry]:
+        """Returns the cached entry for a canonical URL, if any."""
+        row = self._conn.execute(
+            "SELECT url, etag, last_modified, content_hash, content, status, fetched_at "
+            "FROM pages WHERE url = ?",
+            (url,),
+        ).fetchone()
+        if row is None:
+            return None
+        keys = ("url", "etag", "last_modified", "content_hash", "content", "status", "fetched_at")
+        return CacheEntry(**dict(zip(keys, row)))
+
+    @staticmethod
+    def conditional_headers(entry: CacheEntry) -> Dict[str, str]:
+        """Builds ``If-None-Match`` / ``If-Modified-Since`` headers from a cached entry."""
+        headers = {}
+        if entry.etag:
+            headers["If-None-Match"] = entry.etag
+        if entry.last_modified:
+            headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def put(self, url: str, content: str, headers: Optional[Mapping[str, str]] = None) -> PageStatus:
+        """
+        Stores a freshly fetched page and classifies it against the previous version.
+
+        Args:
+            url (str): Canonical URL.
+            content (str): Page markdown.
+            headers (Optional[Mapping[str, str]]): Response headers carrying the validators.
+
+        Returns:
+            PageStatus: ``new`` if never seen, ``unchanged`` if the hash matches, else ``changed``.
+        """
+        headers = {k.lower(): v for k, v in (headers or {}).items()}
+        digest = content_hash(content)
+        previous = self.get(url)
+        if previous is None:
+            status: PageStatus = "new"
+        elif previous.content_hash == digest:
+            status = "unchanged"
+        else:
+            status = "changed"
+
+        self._conn.execute(
+            "INSERT OR REPLACE INTO pages (url, etag, last_modified, content_hash, content, status, fetched_at) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (url, headers.get("etag"), headers.get("last-modified"), digest, content, status, time.time()),
+        )
+        self._conn.commit()
+        return status
+
+    def touch(self, url: str) -> None:
+        """Records a 304 revalidation: the cached copy is current and unchanged."""
+        self._conn.execute(
+            "UPDATE pages SET status = 'unchanged', fetched_at = ? WHERE url = ?", (time.time(), url)
+        )
+        self._conn.commit()
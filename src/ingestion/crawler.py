@@ -1,12 +1,28 @@
 import asyncio
+import os
 import re
-from typing import List, Optional, Set
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlparse
+import aiohttp
 from pydantic import BaseModel, HttpUrl
-from crawl4ai import AsyncWebCrawler
+from crawl4ai import AsyncWebCrawler, CrawlerRunConfig
+from src.ingestion.crawl_cache import CrawlCache, PageStatus
+from src.ingestion.frontier import Frontier, FrontierEntry, VisitedIndex
+from src.ingestion.page_store import PAGE_STORE_DIR, PageStore
+from src.telemetry import CRAWL_PAGES, record_cache, span
+
+# Pages that only render client-side (an empty app root or an "enable JavaScript" notice):
+# their revalidation body is not worth converting, the browser has to fetch them.
+JS_SHELL = re.compile(
+    r'<(div|main)[^>]*\bid="(root|app|__next|__nuxt)"[^>]*>\s*</\1>|<noscript>[^<]*javascript', re.I
+)
 
 class Page(BaseModel):
     url: str
     content: str
+    status: PageStatus = "new"
 
 class University(BaseModel):
     """
@@ -16,36 +32,386 @@ class University(BaseModel):
     url: HttpUrl
     rank: int
     content: Optional[str] = None
+    content_status: PageStatus = "new"
     sub_pages: List[Page] = []
+    max_depth: Optional[int] = None
+    max_pages: Optional[int] = None
+    # Sub-pages of the last crawl that could not be fetched: still there but unreachable
+    # (timeouts, 5xx), or gone (404/410).
+    failed_urls: List[str] = []
+    gone_urls: List[str] = []
+
+class CrawlConfig(BaseModel):
+    """
+    Concurrency and politeness settings for a crawl session.
+
+    Attributes:
+        max_concurrency (int): Global limit on in-flight page fetches.
+        per_domain_concurrency (int): Limit on in-flight fetches per domain.
+        per_domain_delay (float): Minimum seconds between request starts on one domain.
+        page_timeout (float): Seconds before a single fetch attempt is abandoned.
+        max_retries (int): Extra attempts after a failed or timed-out fetch.
+        retry_backoff (float): Base delay in seconds, doubled on every retry.
+        max_depth (int): Default link depth per university; the root page is depth 0.
+        max_pages (int): Default page budget per university, including the root page.
+        frontier_db (str): SQLite path of the visited-set index (``:memory:`` disables resume).
+        cache_db (Optional[str]): SQLite path of the conditional re-crawl cache; None disables it.
+        revalidate (bool): Send an ``If-None-Match``/``If-Modified-Since`` probe for cached pages
+            before spending a browser fetch on them.
+        page_store (Optional[str]): Directory of the raw page store every fetched page is
+            appended to as soon as it arrives; None leaves saving to ``save_results``.
+    """
+    max_concurrency: int = 8
+    per_domain_concurrency: int = 2
+    per_domain_delay: float = 1.0
+    page_timeout: float = 60.0
+    max_retries: int = 2
+    retry_backoff: float = 1.0
+    max_depth: int = 1
+    max_pages: int = 6
+    frontier_db: str = ":memory:"
+    cache_db: Optional[str] = None
+    revalidate: bool = True
+    page_store: Optional[str] = None
+
+class CrawlStats(BaseModel):
+    """
+    Throughput counters for the most recent crawl session.
+    """
+    pages_fetched: int = 0
+    pages_failed: int = 0
+    retries: int = 0
+    not_modified: int = 0
+    pages_new: int = 0
+    pages_changed: int = 0
+    pages_unchanged: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def pages_per_sec(self) -> float:
+        """Successfully fetched pages per second of wall-clock time."""
+        return self.pages_fetched / self.elapsed if self.elapsed > 0 else 0.0
+
+class DomainThrottle:
+    """
+    Per-domain politeness gate: bounds concurrent requests and spaces out their start times.
+    """
+
+    def __init__(self, concurrency: int, delay: float):
+        """
+        Initializes the DomainThrottle.
+
+        Args:
+            concurrency (int): Maximum concurrent requests against the domain.
+            delay (float): Minimum seconds between two request starts.
+        """
+        self._semaphore = asyncio.Semaphore(max(1, concurrency))
+        self._lock = asyncio.Lock()
+        self._delay = delay
+        self._next_start = 0.0
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Waits for a free slot on the domain, honouring the configured delay."""
+        async with self._semaphore:
+            async with self._lock:
+                now = time.monotonic()
+                start = max(now, self._next_start)
+                self._next_start = start + self._delay
+            if start > now:
+                await asyncio.sleep(start - now)
+            yield
 
 class UniversityCrawler:
     """
     Async crawler for university admission pages using Crawl4AI.
     """
 
-    def __init__(self):
-        """Initializes the UniversityCrawler."""
+    def __init__(
+        self,
+        config: Optional[CrawlConfig] = None,
+        crawler_factory: Optional[Callable[[], Any]] = None,
+    ):
+        """
+        Initializes the UniversityCrawler.
+
+        Args:
+            config (Optional[CrawlConfig]): Concurrency and politeness settings.
+            crawler_factory (Optional[Callable[[], Any]]): Builds the async crawler session.
+                Defaults to a Crawl4AI ``AsyncWebCrawler``; tests can pass any async context
+                manager exposing ``arun(url=...)``.
+        """
         self.keywords = [
-            "admission", "apply", "requirement", "tuition", "deadline", 
+            "admission", "apply", "requirement", "tuition", "deadline",
             "undergraduate", "international", "fee", "cost", "scholarship"
         ]
+        self.config = config or CrawlConfig()
+        self.crawler_factory = crawler_factory or (lambda: AsyncWebCrawler(verbose=True))
+        self.stats = CrawlStats()
+        self._global_limit: Optional[asyncio.Semaphore] = None
+        self._throttles: Dict[str, DomainThrottle] = {}
+        self.visited: Optional[VisitedIndex] = None
+        self.cache: Optional[CrawlCache] = None
+        self.pages: Optional[PageStore] = None
+        self._gone: Set[str] = set()
+
+    def _throttle_for(self, url: str) -> DomainThrottle:
+        """Returns the shared throttle for the URL's domain, creating it on first use."""
+        domain = urlparse(url).netloc.lower()
+        if domain not in self._throttles:
+            self._throttles[domain] = DomainThrottle(
+                self.config.per_domain_concurrency, self.config.per_domain_delay
+            )
+        return self._throttles[domain]
+
+    async def _fetch(self, crawler: Any, url: str) -> Optional[Any]:
+        """
+        Fetches a single URL under the global and per-domain limits, with timeout and retries.
 
-    def _is_relevant_url(self, url: str, base_url: str) -> bool:
-        """Checks if a URL is relevant for admissions."""
-        # Ensure it belongs to the same domain (rough check) or is a relative link
-        if not url.startswith(base_url) and not url.startswith("/"):
-             # Handle subdomains or different paths if strictly matching base is too restrictive
-             # For now, simplistic check: contain base domain or be relative
-             pass
-        
-        # Check against keywords
-        lower_url = url.lower()
-        return any(k in lower_url for k in self.keywords)
+        Args:
+            crawler (Any): The shared crawler session.
+            url (str): URL to fetch.
+
+        Returns:
+            Optional[Any]: The successful crawl result, or None once all attempts failed.
+        """
+        throttle = self._throttle_for(url)
+        error = ""
+        for attempt in range(self.config.max_retries + 1):
+            if attempt:
+                self.stats.retries += 1
+                await asyncio.sleep(self.config.retry_backoff * 2 ** (attempt - 1))
+            # Take the domain slot first so a politeness delay never holds a global slot.
+            async with throttle.slot():
+                async with self._global_limit:
+                    try:
+                        with span("crawl_fetch"):
+                            result = await asyncio.wait_for(
+                                crawler.arun(url=url), timeout=self.config.page_timeout
+                            )
+                    except asyncio.TimeoutError:
+                        error = f"timed out after {self.config.page_timeout}s"
+                        continue
+                    except Exception as e:
+                        error = str(e)
+                        continue
+            if result.success:
+                self.stats.pages_fetched += 1
+                return result
+            error = result.error_message
+            status = getattr(result, "status_code", None)
+            if status is not None and 400 <= status < 500 and status != 429:
+                # Client errors will not fix themselves on retry.
+                if status in (404, 410):
+                    self._gone.add(url)
+                break
+
+        self.stats.pages_failed += 1
+        print(f"       Failed: {url} ({error})")
+        return None
+
+    async def _revalidate(
+        self, crawler: Any, http: aiohttp.ClientSession, url: str, cached: Any
+    ) -> Tuple[bool, Optional[Any]]:
+        """
+        Sends a conditional GET for a cached page.
+
+        Any error simply falls back to a full browser fetch.
+
+        Returns:
+            Tuple[bool, Optional[Any]]: Whether the server answered 304 and, for a 200 with
+                static HTML, the page converted from the probe's body so it is not downloaded
+                a second time through the browser.
+        """
+        async with self._throttle_for(url).slot():
+            async with self._global_limit:
+                try:
+                    with span("crawl_revalidate"):
+                        async with http.get(url, headers=CrawlCache.conditional_headers(cached)) as resp:
+                            if resp.status == 304:
+                                return True, None
+                            if resp.status != 200 or resp.content_type != "text/html":
+                                return False, None
+                            html = await resp.text()
+                            headers = dict(resp.headers)
+                except Exception:
+                    return False, None
+        if JS_SHELL.search(html):
+            return False, None
+        # The body is already here: crawl4ai renders raw HTML without another request.
+        try:
+            result = await asyncio.wait_for(
+                crawler.arun(url="raw:" + html, config=CrawlerRunConfig(base_url=url)),
+                timeout=self.config.page_timeout,
+            )
+        except Exception:
+            return False, None
+        if not result.success:
+            return False, None
+        result.response_headers = headers
+        return False, result
+
+    async def _fetch_page(
+        self, crawler: Any, http: Optional[aiohttp.ClientSession], url: str
+    ) -> Optional[Tuple[str, PageStatus, Optional[Any]]]:
+        """
+        Fetches a page through the re-crawl cache.
+
+        Args:
+            crawler (Any): The shared crawler session.
+            http (Optional[aiohttp.ClientSession]): Session for conditional probes, if enabled.
+            url (str): Canonical URL to fetch.
+
+        Returns:
+            Optional[Tuple[str, PageStatus, Optional[Any]]]: Markdown, delta status and the raw
+                crawl result (None when served from cache), or None if the fetch failed.
+        """
+        cached = self.cache.get(url) if self.cache else None
+        result = None
+        if cached and http is not None and (cached.etag or cached.last_modified):
+            not_modified, result = await self._revalidate(crawler, http, url, cached)
+            if not_modified:
+                self.cache.touch(url)
+                self.stats.not_modified += 1
+                self._count_status("unchanged")
+                return cached.content, "unchanged", None
+            if result is not None:
+                self.stats.pages_fetched += 1
+
+        if result is None:
+            result = await self._fetch(crawler, url)
+        if result is None:
+            return None
+        content = str(result.markdown)
+        status: PageStatus = "new"
+        if self.cache:
+            status = self.cache.put(url, content, getattr(result, "response_headers", None))
+        self._count_status(status)
+        return content, status, result
+
+    def _count_status(self, status: PageStatus) -> None:
+        """Tallies a page's delta status in the crawl stats."""
+        if status == "new":
+            self.stats.pages_new += 1
+        elif status == "changed":
+            self.stats.pages_changed += 1
+        else:
+            self.stats.pages_unchanged += 1
+
+    def _extract_links(self, markdown: str, result: Optional[Any] = None) -> Set[str]:
+        """Collects candidate links from a page's markdown and, if available, the crawl result's link table."""
+        extracted_urls = set()
+
+        # 1. Try result.links (Crawl4AI groups them as {"internal": [...], "external": [...]})
+        if result is not None and hasattr(result, 'links') and result.links:
+            links = result.links
+            if isinstance(links, dict):
+                 links = [item for group in links.values() if isinstance(group, list) for item in group]
+            for item in links:
+                 if isinstance(item, dict):
+                     href = item.get('href')
+                     if href:
+                         extracted_urls.add(href)
+                 elif isinstance(item, str):
+                     extracted_urls.add(item)
+
+        # 2. Always try Regex on Markdown (for safety and relative links)
+        # Catches [text](url) where url can be anything not containing )
+        markdown_links = re.findall(r'\[.*?\]\(([^)]+)\)', markdown)
+        extracted_urls.update(markdown_links)
+        return extracted_urls
+
+    def _store_page(self, uni: University, entry: FrontierEntry, content: str, status: PageStatus) -> None:
+        """
+        Attaches fetched content to the university: the root page as content, the rest as
+        sub-pages. Also appends it to the page store, if one is configured.
+        """
+        if entry.depth == 0:
+            uni.content = content
+            uni.content_status = status
+            if self.pages is not None:
+                self.pages.put(uni.name, str(uni.url), content, "main_page")
+        else:
+            uni.sub_pages.append(Page(url=entry.url, content=content, status=status))
+            if self.pages is not None:
+                self.pages.put(uni.name, entry.url, content, "sub_page")
+
+    async def _crawl_university(self, crawler: Any, http: Optional[aiohttp.ClientSession], uni: University) -> None:
+        """
+        Crawls one university by draining its frontier in priority-ordered waves, each wave
+        fetched concurrently, until the depth and page budgets are spent.
+
+        Args:
+            crawler (Any): The shared crawler session.
+            http (Optional[aiohttp.ClientSession]): Session for conditional re-crawl probes.
+            uni (University): University to crawl; updated in place.
+        """
+        print(f"Starting crawl for {uni.name} at {uni.url}...")
+        frontier = Frontier(
+            self.visited, uni.name, str(uni.url), self.keywords,
+            max_depth=uni.max_depth if uni.max_depth is not None else self.config.max_depth,
+            max_pages=uni.max_pages if uni.max_pages is not None else self.config.max_pages,
+        )
+        try:
+            if frontier.resume():
+                restored = self.visited.finished(uni.name)
+                for entry, content in restored:
+                    cached = self.cache.get(entry.url) if self.cache else None
+                    self._store_page(uni, entry, content, cached.status if cached else "new")
+                print(f"  - Resuming: {len(restored)} pages restored, {len(frontier)} URLs still queued.")
+            else:
+                frontier.add(str(uni.url), depth=0, force=True)
+
+            while batch := frontier.pop_batch(self.config.max_concurrency):
+                fetched = await asyncio.gather(*(self._fetch_page(crawler, http, e.url) for e in batch))
+                for entry, page in zip(batch, fetched):
+                    if page is None:
+                        frontier.done(entry, None)
+                        if entry.depth == 0:
+                            print(f"Failed to crawl main page for {uni.name}")
+                        else:
+                            (uni.gone_urls if entry.url in self._gone else uni.failed_urls).append(entry.url)
+                        continue
+
+                    content, status, result = page
+                    frontier.done(entry, content)
+                    self._store_page(uni, entry, content, status)
+                    print(f"  - Fetched {entry.url} (depth {entry.depth}, {len(content)} bytes, {status})")
+
+                    if entry.depth < frontier.max_depth:
+                        extracted_urls = self._extract_links(content, result)
+                        added = sum(
+                            frontier.add(link, entry.depth + 1, source_url=entry.url)
+                            for link in extracted_urls
+                        )
+                        print(f"  - Found {len(extracted_urls)} links, {added} new relevant URLs queued.")
+
+            frontier.finish()
+            if self.pages is not None and uni.content:
+                self._retain(self.pages, uni)
+
+        except Exception as e:
+            # The frontier keeps its queued URLs, so the next run resumes from here.
+            print(f"Error crawling {uni.name}: {e}")
+
+    @staticmethod
+    def _retain(store: PageStore, uni: University) -> int:
+        """
+        Drops the university's stored pages the crawl found gone. Pages it did not reach
+        are dropped too (no longer linked), unless some fetch failed: those pages may only
+        be linked from the failed one, so a transient error must not delete them downstream.
+        """
+        return store.retain(
+            uni.name, [str(uni.url)] + [p.url for p in uni.sub_pages],
+            gone=uni.gone_urls, complete=not uni.failed_urls,
+        )
 
     async def crawl_universities(self, universities: List[University]) -> List[University]:
         """
-        Crawls a list of universities sequentially using a single browser session.
-        Performs a depth=2 crawl for relevant admission pages.
+        Crawls a list of universities concurrently using a single browser session.
+        Follows relevant admission links up to each university's depth and page budget,
+        bounded by the global and per-domain limits in ``self.config``. Progress is kept
+        in the visited index, so an interrupted crawl resumes where it stopped.
 
         Args:
             universities (List[University]): List of universities to crawl.
@@ -53,102 +419,69 @@ class UniversityCrawler:
         Returns:
             List[University]: The updated list with content.
         """
-        async with AsyncWebCrawler(verbose=True) as crawler:
-            for uni in universities:
-                print(f"Starting crawl for {uni.name} at {uni.url}...")
-                try:
-                    # 1. Crawl Main Page
-                    result = await crawler.arun(url=str(uni.url))
-                    if not result.success:
-                        print(f"Failed to crawl main page for {uni.name}: {result.error_message}")
-                        continue
-                    
-                    uni.content = result.markdown
-                    print(f"  - Main page fetched ({len(result.markdown)} bytes)")
-
-                    # 2. Extract Links (Depth=1 candidates)
-                    # Crawl4AI might provide links, or we parse from markdown/html.
-                    # For simplicity, let's assume we can regex specific links or if Crawl4AI has a links property.
-                    # Looking at Crawl4AI docs (simulated), result usually has .links
-                    # If not, we rely on a simple regex on the markdown or using a helper if available.
-                    # Let's try to infer links from the markdown for now as a fallback or use result.links if standard
-                    
-                    # NOTE: Assuming result.links exists as list of dicts or strings. 
-                    # If not, we will need to implement a parser.
-                    # Let's rely on 'result.links' (common in crawlers). 
-                    # If it fails, I'll add a beautifulsoup fallback in next step.
-                    
-                    extracted_urls = set()
-                    
-                    # 1. Try result.links
-                    if hasattr(result, 'links') and result.links:
-                        links = result.links
-                        if isinstance(links, dict):
-                             extracted_urls.update(links.keys())
-                        elif isinstance(links, list):
-                             for item in links:
-                                 if isinstance(item, dict):
-                                     href = item.get('href')
-                                     if href:
-                                         extracted_urls.add(href)
-                                 elif isinstance(item, str):
-                                     extracted_urls.add(item)
-                    
-                    # 2. Always try Regex on Markdown (for safety and relative links)
-                    # Catches [text](url) where url can be anything not containing )
-                    markdown_links = re.findall(r'\[.*?\]\(([^)]+)\)', result.markdown)
-                    extracted_urls.update(markdown_links)
-                    
-                    print(f"  - Found {len(extracted_urls)} unique links on main page (combined sources).")
-                    
-                    print(f"  - Found {len(extracted_urls)} links on main page.")
-
-                    # 3. Filter Relevant Links
-                    relevant_urls = []
-                    base_domain = str(uni.url).split("://")[-1].split("/")[0] # naive domain extraction
-                    
-                    for link in extracted_urls:
-                        # Normalize relative links (rudimentary)
-                        if link.startswith("/"):
-                            link = f"{str(uni.url).rstrip('/')}{link}"
-                        
-                        if base_domain in link and self._is_relevant_url(link, str(uni.url)):
-                            relevant_urls.append(link)
-
-                    # Deduplicate
-                    relevant_urls = list(set(relevant_urls))
-                    print(f"  - Identifying {len(relevant_urls)} relevant sub-pages to crawl.")
-
-                    # 4. Crawl Sub-pages (Depth=2)
-                    # Limit to avoid taking forever (e.g., max 10 sub-pages)
-                    max_sub_pages = 5
-                    for sub_url in relevant_urls[:max_sub_pages]:
-                         print(f"    -> Crawling sub-page: {sub_url}")
-                         sub_result = await crawler.arun(url=sub_url)
-                         if sub_result.success:
-                             uni.sub_pages.append(Page(url=sub_url, content=sub_result.markdown))
-                         else:
-                             print(f"       Failed: {sub_result.error_message}")
-                    
-                except Exception as e:
-                    print(f"Error crawling {uni.name}: {e}")
-        
+        self.stats = CrawlStats()
+        self._global_limit = asyncio.Semaphore(max(1, self.config.max_concurrency))
+        self._throttles = {}
+        self.visited = VisitedIndex(self.config.frontier_db)
+        self.cache = CrawlCache(self.config.cache_db) if self.config.cache_db else None
+        self.pages = PageStore(self.config.page_store) if self.config.page_store else None
+        self._gone = set()
+        http = None
+        if self.cache and self.config.revalidate:
+            http = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.config.page_timeout))
+        started = time.perf_counter()
+
+        try:
+            async with self.crawler_factory() as crawler:
+                await asyncio.gather(*(self._crawl_university(crawler, http, uni) for uni in universities))
+        finally:
+            self.visited.close()
+            if self.cache:
+                self.cache.close()
+            if self.pages is not None:
+                self.pages.close()
+                self.pages = None
+            if http is not None:
+                await http.close()
+
+        self.stats.elapsed = time.perf_counter() - started
+        CRAWL_PAGES.labels("fetched").inc(self.stats.pages_fetched)
+        CRAWL_PAGES.labels("failed").inc(self.stats.pages_failed)
+        CRAWL_PAGES.labels("not_modified").inc(self.stats.not_modified)
+        # A 304 answers from the crawl cache; every browser fetch is a miss.
+        record_cache("crawl", self.stats.not_modified, self.stats.pages_fetched + self.stats.pages_failed)
+        print(
+            f"Crawled {self.stats.pages_fetched} pages ({self.stats.pages_failed} failed, "
+            f"{self.stats.retries} retries) in {self.stats.elapsed:.1f}s "
+            f"-> {self.stats.pages_per_sec:.2f} pages/sec"
+        )
+        print(
+            f"Deltas: {self.stats.pages_new} new, {self.stats.pages_changed} changed, "
+            f"{self.stats.pages_unchanged} unchanged ({self.stats.not_modified} via 304)"
+        )
         return universities
 
-    async def save_results(self, universities: List[University], output_dir: str = "data/raw"):
+    async def save_results(self, universities: List[University], output_dir: str = PAGE_STORE_DIR):
         """
-        Saves the crawled data to JSON files.
+        Saves the crawled pages to the raw page store. Unchanged pages are not rewritten,
+        and pages a university no longer links to are dropped, so downstream stages only
+        see real deltas.
 
         Args:
             universities (List[University]): List of crawled university objects.
-            output_dir (str): Directory to save the files.
-        """
-        import os
-        os.makedirs(output_dir, exist_ok=True)
-        
-        for uni in universities:
-            if uni.content:
-                filename = f"{output_dir}/{uni.name.replace(' ', '_').lower()}.json"
-                with open(filename, 'w', encoding='utf-8') as f:
-                    f.write(uni.model_dump_json(indent=2))
-                print(f"Saved data for {uni.name} to {filename}")
+            output_dir (str): Directory of the page store.
+        """
+        store = PageStore(output_dir)
+        try:
+            for uni in universities:
+                if not uni.content:
+                    continue
+                written = store.put(uni.name, str(uni.url), uni.content, "main_page")
+                written += sum(store.put(uni.name, p.url, p.content, "sub_page") for p in uni.sub_pages)
+                dropped = self._retain(store, uni)
+                if written or dropped:
+                    print(f"Saved {written} pages for {uni.name} to {output_dir} ({dropped} dropped)")
+                else:
+                    print(f"No changes for {uni.name} in {output_dir}")
+        finally:
+            store.close()
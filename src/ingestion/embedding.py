@@ -0,0 +1,236 @@
+import asyncio
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence
+import numpy as np
+from pydantic import BaseModel, ConfigDict
+from llama_index.core.base.embeddings.base import BaseEmbedding, Embedding
+from src.ingestion.crawl_cache import content_hash
+from src.telemetry import span
+
+logger = logging.getLogger(__name__)
+
+# SQLite's default limit on bound parameters per statement is 999.
+SQLITE_MAX_PARAMS = 900
+
+
+class EmbeddingStats(BaseModel):
+    """
+    Counters of a ``CachedEmbedding`` since it was created.
+    """
+    hits: int = 0
+    misses: int = 0
+    batches: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    @property
+    def texts_per_sec(self) -> float:
+        return self.misses / self.elapsed if self.elapsed else 0.0
+
+
+class VectorCache:
+    """
+    Persistent embedding cache: vectors are appended to a flat float32 file that is read
+    back through ``np.memmap``, and a SQLite index maps each text key to its row.
+
+    Vectors are written before their index rows, so an interrupted write at worst leaves
+    unreferenced rows at the end of the file. Reads and writes hold a lock: the async
+    embedding path calls the cache from several worker threads at once.
+    """
+
+    def __init__(self, directory: str):
+        """
+        Initializes the VectorCache.
+
+        Args:
+            directory (str): Directory holding ``vectors.f32`` and ``index.db``.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self._vectors_path = os.path.join(directory, "vectors.f32")
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(directory, "index.db"), check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS vectors (key TEXT PRIMARY KEY, row INTEGER NOT NULL)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._conn.commit()
+        row = self._conn.execute("SELECT value FROM meta WHERE name = 'dim'").fetchone()
+        self.dim: Optional[int] = int(row[0]) if row else None
+        self._mmap: Optional[np.memmap] = None
+
+    @staticmethod
+    def key(text: str, model_name: str) -> str:
+        """Builds the cache key of a text embedded by ``model_name``."""
+        return content_hash(f"{model_name}\n{text}")
+
+    @property
+    def rows(self) -> int:
+        """Number of complete vectors in the data file."""
+        if self.dim is None or not os.path.exists(self._vectors_path):
+            return 0
+        return os.path.getsize(self._vectors_path) // (4 * self.dim)
+
+    def _matrix(self) -> Optional[np.memmap]:
+        rows = self.rows
+        if rows == 0:
+            return None
+        if self._mmap is None or self._mmap.shape[0] != rows:
+            self._mmap = np.memmap(self._vectors_path, dtype=np.float32, mode="r", shape=(rows, self.dim))
+        return self._mmap
+
+    def get_many(self, keys: Sequence[str]) -> Dict[str, np.ndarray]:
+        """Returns the cached vectors of those ``keys`` that are present."""
+        unique = list(dict.fromkeys(keys))
+        found: Dict[str, np.ndarray] = {}
+        with self._lock:
+            matrix = self._matrix()
+            if matrix is None:
+                return {}
+            for i in range(0, len(unique), SQLITE_MAX_PARAMS):
+                chunk = unique[i:i + SQLITE_MAX_PARAMS]
+                placeholders = ",".join("?" * len(chunk))
+                for key, row in self._conn.execute(
+                    f"SELECT key, row FROM vectors WHERE key IN ({placeholders})", chunk
+                ):
+                    if row < matrix.shape[0]:
+                        found[key] = np.array(matrix[row])
+        return found
+
+    def put_many(self, keys: Sequence[str], vectors: np.ndarray) -> None:
+        """
+        Appends vectors to the data file and indexes them under ``keys``.
+
+        Raises:
+            ValueError: If the vectors' dimension differs from the cached ones.
+        """
+        if not len(keys):
+            return
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        with self._lock:
+            if self.dim is None:
+                self.dim = int(vectors.shape[1])
+                self._conn.execute("INSERT OR REPLACE INTO meta (name, value) VALUES ('dim', ?)", (str(self.dim),))
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"Cannot cache {vectors.shape[1]}-d vectors in a {self.dim}-d vector cache.")
+            start = self.rows
+            with open(self._vectors_path, "ab") as f:
+                # Drop the partial row an interrupted write may have left, so rows stay aligned.
+                f.truncate(start * self.dim * 4)
+                f.write(vectors.tobytes())
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO vectors (key, row) VALUES (?, ?)",
+                [(key, start + i) for i, key in enumerate(keys)],
+            )
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM vectors").fetchone()[0]
+
+    def close(self) -> None:
+        """Closes the SQLite index and drops the memory map."""
+        with self._lock:
+            self._mmap = None
+            self._conn.close()
+
+
+class CachedEmbedding(BaseEmbedding):
+    """
+    Wraps an embedding model so document texts are embedded in large batches and looked
+    up in a ``VectorCache`` first: unchanged chunks and entity names are never re-embedded.
+
+    Misses are encoded as one NumPy matrix. For a ``FastEmbedEmbedding`` the underlying
+    ONNX model is called directly with ``encode_batch_size`` and, for large inputs,
+    ``parallel`` worker processes; other models go through their regular batch call.
+    Query embeddings are passed through uncached.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    inner: BaseEmbedding
+    cache: Any
+    encode_batch_size: int = 256
+    parallel: Optional[int] = None
+    parallel_threshold: int = 1024
+    stats: EmbeddingStats = EmbeddingStats()
+
+    def __init__(self, inner: BaseEmbedding, cache: VectorCache, **kwargs: Any):
+        """
+        Initializes the CachedEmbedding.
+
+        Args:
+            inner (BaseEmbedding): Model that computes the vectors.
+            cache (VectorCache): Where vectors are stored, keyed by model name and text hash.
+            **kwargs: ``encode_batch_size`` (texts per ONNX call), ``parallel`` (FastEmbed
+                worker processes; 0 uses every core, None disables multiprocessing) and
+                ``parallel_threshold`` (fewest misses worth starting the worker pool for).
+        """
+        kwargs.setdefault("embed_batch_size", 2048)
+        super().__init__(
+            inner=inner,
+            cache=cache,
+            model_name=inner.model_name,
+            stats=EmbeddingStats(),
+            **kwargs,
+        )
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "CachedEmbedding"
+
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """Embeds ``texts`` without the cache and returns an (n, dim) float32 matrix."""
+        model = getattr(self.inner, "_model", None)
+        if self.inner.class_name() == "FastEmbedEmbedding" and model is not None:
+            parallel = self.parallel if len(texts) >= self.parallel_threshold else None
+            embed = model.passage_embed if getattr(self.inner, "doc_embed_type", None) == "passage" else model.embed
+            vectors = list(embed(texts, batch_size=self.encode_batch_size, parallel=parallel))
+        else:
+            vectors = self.inner.get_text_embedding_batch(texts)
+        return np.asarray(vectors, dtype=np.float32)
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[Embedding]:
+        keys = [VectorCache.key(text, self.model_name) for text in texts]
+        found = self.cache.get_many(keys)
+        misses: Dict[str, str] = {}
+        for key, text in zip(keys, texts):
+            if key not in found:
+                misses.setdefault(key, text)
+        self.stats.hits += sum(1 for key in keys if key in found)
+        self.stats.misses += len(misses)
+
+        if misses:
+            started = time.perf_counter()
+            with span("embed_chunks"):
+                matrix = self._encode(list(misses.values()))
+            elapsed = time.perf_counter() - started
+            self.stats.batches += 1
+            self.stats.elapsed += elapsed
+            self.cache.put_many(list(misses), matrix)
+            found.update(zip(misses, matrix))
+            logger.info(
+                f"Embedded {len(misses)} texts in {elapsed:.2f}s ({len(misses) / max(elapsed, 1e-9):.0f}/s); "
+                f"{len(texts) - len(misses)} served from the vector cache."
+            )
+        return [found[key].tolist() for key in keys]
+
+    def _get_text_embedding(self, text: str) -> Embedding:
+        return self._get_text_embeddings([text])[0]
+
+    async def _aget_text_embedding(self, text: str) -> Embedding:
+        return (await self._aget_text_embeddings([text]))[0]
+
+    async def _aget_text_embeddings(self, texts: List[str]) -> List[Embedding]:
+        return await asyncio.to_thread(self._get_text_embeddings, texts)
+
+    def _get_query_embedding(self, query: str) -> Embedding:
+        return self.inner.get_query_embedding(query)
+
+    async def _aget_query_embedding(self, query: str) -> Embedding:
+        return await self.inner.aget_query_embedding(query)
@@ -0,0 +1,275 @@
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+from pydantic import BaseModel
+from llama_index.core.graph_stores.types import (
+    ChunkNode,
+    EntityNode,
+    KG_NODES_KEY,
+    KG_RELATIONS_KEY,
+    Relation,
+)
+from llama_index.core.schema import BaseNode, MetadataMode, TransformComponent
+from src.ingestion.cleaner import estimate_tokens
+from src.llm_router import record_llm_models
+from src.telemetry import span
+
+KG_TYPES = {cls.__name__: cls for cls in (EntityNode, ChunkNode, Relation)}
+
+
+def extractor_model(extractor: TransformComponent) -> str:
+    """Returns the name of the LLM an extractor calls, or "" if it does not use one."""
+    llm = getattr(extractor, "llm", None)
+    return str(getattr(llm, "model", None) or getattr(getattr(llm, "metadata", None), "model_name", ""))
+
+
+def extractor_fingerprint(extractor: TransformComponent) -> str:
+    """
+    Identifies what an extractor would produce for a given text: its class, prompt,
+    model name and path limit. Changing any of them invalidates cached extractions.
+    For a routed LLM the model is the one its route is configured for, whichever
+    backend is up; each entry records the models that actually served it.
+    """
+    model = extractor_model(extractor)
+    prompt = getattr(extractor, "extract_prompt", None)
+    prompt_text = prompt.get_template() if hasattr(prompt, "get_template") else str(prompt or "")
+    parts = [
+        extractor.class_name(),
+        str(model),
+        prompt_text,
+        str(getattr(extractor, "max_paths_per_chunk", "")),
+    ]
+    return hashlib.sha256("\n".join(parts).encode("utf-8")).hexdigest()
+
+
+class ExtractionCacheStats(BaseModel):
+    """
+    Hit/miss counters of an ``ExtractionCache`` since it was opened.
+    """
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    entries: int = 0
+    size_bytes: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+
+class ExtractionCache:
+    """
+    On-disk (SQLite) cache of KG extraction results, keyed by chunk hash + extractor
+    fingerprint, with least-recently-used eviction once ``max_bytes`` is exceeded.
+    """
+
+    def __init__(self, path: str = ":memory:", max_bytes: int = 512 * 1024 * 1024):
+        """
+        Initializes the ExtractionCache.
+
+        Args:
+            path (str): SQLite file path, or ``:memory:`` for a throwaway cache.
+            max_bytes (int): Total payload size above which the oldest entries are evicted.
+        """
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.max_bytes = max_bytes
+        self._stats = ExtractionCacheStats()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS extractions (
+                key TEXT PRIMARY KEY,
+                payload TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_extractions_access ON extractions (last_access)")
+        self._conn.commit()
+
+    @staticmethod
+    def key(text: str, fingerprint: str) -> str:
+        """Builds the cache key of a chunk text for a given extractor fingerprint."""
+        return hashlib.sha256(f"{fingerprint}\n{text}".encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Returns the cached payload for ``key`` and refreshes its LRU position."""
+        row = self._conn.execute("SELECT payload FROM extractions WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            self._stats.misses += 1
+            return None
+        self._stats.hits += 1
+        self._conn.execute("UPDATE extractions SET last_access = ? WHERE key = ?", (time.time(), key))
+        self._conn.commit()
+        return json.loads(row[0])
+
+    def put(self, key: str, payload: Dict[str, Any]) -> None:
+        """Stores a payload, evicting least recently used entries beyond ``max_bytes``."""
+        data = json.dumps(payload)
+        self._conn.execute(
+            "INSERT OR REPLACE INTO extractions (key, payload, size, last_access) VALUES (?, ?, ?, ?)",
+            (key, data, len(data), time.time()),
+        )
+        self._evict()
+        self._conn.commit()
+
+    def _evict(self) -> None:
+        (total,) = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM extractions").fetchone()
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute("SELECT key, size FROM extractions ORDER BY last_access").fetchall()
+        evicted = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        self._conn.executemany("DELETE FROM extractions WHERE key = ?", evicted)
+        self._stats.evictions += len(evicted)
+
+    def stats(self) -> ExtractionCacheStats:
+        """Returns hit/miss counters together with the current entry count and size."""
+        entries, size = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM extractions"
+        ).fetchone()
+        return self._stats.model_copy(update={"entries": entries, "size_bytes": size})
+
+    def close(self) -> None:
+        """Closes the underlying SQLite connection."""
+        self._conn.close()
+
+
+class CachedExtractor(TransformComponent):
+    """
+    Wraps a KG extractor (e.g. ``SimpleLLMPathExtractor``) so chunks whose text was already
+    extracted with the same prompt and model are served from an ``ExtractionCache`` instead
+    of calling the LLM again.
+
+    Properties the extractor copied from the chunk's metadata (url, university, ...) are not
+    cached; they are re-applied from the current chunk on a hit, so a shared footer cached
+    from one page is attributed to the page it now appears on.
+
+    With a ``scheduler`` (see ``ExtractionScheduler``), misses are extracted one chunk at a
+    time on its rate-limited worker pool and each result is cached as soon as it is done,
+    which doubles as a checkpoint: a failed run resumes from the finished chunks.
+
+    Each entry records the models that served its extraction (``served_by``), which differ
+    from the fingerprint's when a routed LLM fell back to another backend.
+    """
+
+    extractor: TransformComponent
+    cache: Any
+    scheduler: Optional[Any] = None
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "CachedExtractor"
+
+    def __call__(self, nodes: Sequence[BaseNode], show_progress: bool = False, **kwargs: Any) -> Sequence[BaseNode]:
+        """Extracts paths from nodes, consulting the cache first."""
+        if self.scheduler is not None:
+            return asyncio.run(self.acall(nodes, show_progress=show_progress, **kwargs))
+        misses, keys = self._serve_hits(nodes)
+        if misses:
+            before = self._snapshot(misses)
+            with span("extract"), record_llm_models() as served:
+                self.extractor(misses, show_progress=show_progress, **kwargs)
+            self._store(misses, keys, before, served)
+        return nodes
+
+    async def acall(self, nodes: Sequence[BaseNode], show_progress: bool = False, **kwargs: Any) -> Sequence[BaseNode]:
+        """Extracts paths from nodes asynchronously, consulting the cache first."""
+        misses, keys = self._serve_hits(nodes)
+        if misses and self.scheduler is not None:
+            before = self._snapshot(misses)
+            served: Dict[str, List[str]] = {}
+            async def extract(node: BaseNode) -> Any:
+                with span("extract"), record_llm_models() as served[node.id_]:
+                    return await self.extractor.acall([node], **kwargs)
+
+            await self.scheduler.run(
+                misses,
+                extract,
+                model=extractor_model(self.extractor),
+                cost=lambda node: estimate_tokens(node.get_content(metadata_mode=MetadataMode.LLM)),
+                on_complete=lambda node: self._store([node], keys, before, served.get(node.id_, [])),
+            )
+        elif misses:
+            before = self._snapshot(misses)
+            with span("extract"), record_llm_models() as served:
+                await self.extractor.acall(misses, show_progress=show_progress, **kwargs)
+            self._store(misses, keys, before, served)
+        return nodes
+
+    def _serve_hits(self, nodes: Sequence[BaseNode]) -> Tuple[List[BaseNode], Dict[str, str]]:
+        """Applies cached results to hit nodes; returns the misses and every node's key."""
+        fingerprint = extractor_fingerprint(self.extractor)
+        misses, keys = [], {}
+        for node in nodes:
+            key = ExtractionCache.key(node.get_content(metadata_mode=MetadataMode.NONE), fingerprint)
+            keys[node.id_] = key
+            payload = self.cache.get(key)
+            if payload is None:
+                misses.append(node)
+                continue
+            metadata = self._source_metadata(node)
+            node.metadata[KG_NODES_KEY] = node.metadata.get(KG_NODES_KEY, []) + [
+                self._load(item, metadata) for item in payload["nodes"]
+            ]
+            node.metadata[KG_RELATIONS_KEY] = node.metadata.get(KG_RELATIONS_KEY, []) + [
+                self._load(item, metadata) for item in payload["relations"]
+            ]
+        return misses, keys
+
+    @staticmethod
+    def _snapshot(nodes: Sequence[BaseNode]) -> Dict[str, Tuple[int, int, Dict[str, Any]]]:
+        """Remembers how many KG items each node carried before extraction, and its metadata."""
+        return {
+            node.id_: (
+                len(node.metadata.get(KG_NODES_KEY, [])),
+                len(node.metadata.get(KG_RELATIONS_KEY, [])),
+                CachedExtractor._source_metadata(node),
+            )
+            for node in nodes
+        }
+
+    def _store(
+        self,
+        nodes: Sequence[BaseNode],
+        keys: Dict[str, str],
+        before: Dict[str, Tuple[int, int, Dict[str, Any]]],
+        served: Sequence[str] = (),
+    ) -> None:
+        """Caches the KG items the wrapped extractor added to each node, and the models that served them."""
+        for node in nodes:
+            n_nodes, n_relations, metadata = before[node.id_]
+            self.cache.put(keys[node.id_], {
+                "nodes": [self._dump(item, metadata) for item in node.metadata.get(KG_NODES_KEY, [])[n_nodes:]],
+                "relations": [self._dump(item, metadata) for item in node.metadata.get(KG_RELATIONS_KEY, [])[n_relations:]],
+                "served_by": sorted(set(served)),
+            })
+
+    @staticmethod
+    def _source_metadata(node: BaseNode) -> Dict[str, Any]:
+        return {k: v for k, v in node.metadata.items() if k not in (KG_NODES_KEY, KG_RELATIONS_KEY)}
+
+    @staticmethod
+    def _dump(item: Any, metadata: Dict[str, Any]) -> Dict[str, Any]:
+        data = item.model_dump(exclude={"embedding"})
+        data["properties"] = {
+            k: v for k, v in data.get("properties", {}).items() if not (k in metadata and metadata[k] == v)
+        }
+        return {"type": type(item).__name__, "data": data}
+
+    @staticmethod
+    def _load(item: Dict[str, Any], metadata: Dict[str, Any]) -> Any:
+        data = dict(item["data"])
+        data["properties"] = {**metadata, **data.get("properties", {})}
+        return KG_TYPES[item["type"]](**data)
@@ -0,0 +1,187 @@
+import asyncio
+import logging
+import random
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_MARKERS = ("429", "rate limit", "ratelimit", "resource exhausted", "resourceexhausted",
+                      "quota", "too many requests")
+
+
+def is_rate_limit_error(error: BaseException) -> bool:
+    """Checks whether an LLM client error means "slow down" rather than "this input failed"."""
+    if getattr(error, "code", None) == 429 or getattr(error, "status_code", None) == 429:
+        return True
+    text = f"{type(error).__name__} {error}".lower()
+    return any(marker in text for marker in RATE_LIMIT_MARKERS)
+
+
+class TokenBucket:
+    """
+    Async token bucket: ``rate`` tokens per second refill up to ``capacity``.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        """
+        Initializes the TokenBucket.
+
+        Args:
+            rate (float): Tokens added per second.
+            capacity (float): Maximum burst size.
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        """Waits until ``amount`` tokens are available and takes them."""
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return
+                await asyncio.sleep((amount - self._tokens) / self.rate)
+
+
+class ExtractionSchedulerConfig(BaseModel):
+    """
+    Settings for parallel, rate-limited LLM extraction.
+
+    Attributes:
+        num_workers (int): Concurrent extraction workers.
+        requests_per_minute (float): Request quota per model.
+        tokens_per_minute (float): Input-token quota per model; 0 disables token limiting.
+        max_retries (int): Retries of a chunk after rate-limit errors.
+        backoff_base (float): First backoff delay in seconds, doubled on every retry.
+        backoff_max (float): Upper bound for a single backoff delay.
+    """
+    num_workers: int = 8
+    requests_per_minute: float = 60.0
+    tokens_per_minute: float = 0.0
+    max_retries: int = 6
+    backoff_base: float = 2.0
+    backoff_max: float = 60.0
+
+
+class ExtractionStats(BaseModel):
+    """
+    Counters of the most recent ``ExtractionScheduler.run``.
+    """
+    completed: int = 0
+    failed: int = 0
+    rate_limited: int = 0
+    elapsed: float = 0.0
+
+
+class ExtractionError(RuntimeError):
+    """Raised after a run in which some chunks could not be extracted."""
+
+
+class ExtractionScheduler:
+    """
+    Runs per-chunk extraction jobs on N async workers under per-model token buckets,
+    retrying rate-limit errors with exponential backoff. A completion callback fires as
+    soon as each chunk finishes, so callers can checkpoint finished work immediately.
+    """
+
+    def __init__(self, config: Optional[ExtractionSchedulerConfig] = None):
+        """
+        Initializes the ExtractionScheduler.
+
+        Args:
+            config (Optional[ExtractionSchedulerConfig]): Worker, quota and retry settings.
+        """
+        self.config = config or ExtractionSchedulerConfig()
+        self.stats = ExtractionStats()
+        self._request_buckets: Dict[str, TokenBucket] = {}
+        self._token_buckets: Dict[str, TokenBucket] = {}
+
+    def _buckets(self, model: str) -> List[TokenBucket]:
+        """Returns the request (and optional token) buckets shared by all calls to ``model``."""
+        if model not in self._request_buckets:
+            rpm = self.config.requests_per_minute
+            self._request_buckets[model] = TokenBucket(rpm / 60.0, max(1.0, rpm / 60.0))
+            if self.config.tokens_per_minute > 0:
+                tpm = self.config.tokens_per_minute
+                self._token_buckets[model] = TokenBucket(tpm / 60.0, tpm / 6.0)
+        buckets = [self._request_buckets[model]]
+        if model in self._token_buckets:
+            buckets.append(self._token_buckets[model])
+        return buckets
+
+    async def run(
+        self,
+        items: Sequence[Any],
+        job: Callable[[Any], Awaitable[None]],
+        model: str,
+        cost: Callable[[Any], float] = lambda item: 1.0,
+        on_complete: Optional[Callable[[Any], None]] = None,
+    ) -> ExtractionStats:
+        """
+        Processes every item with ``job`` on the worker pool.
+
+        Args:
+            items (Sequence[Any]): Work items, e.g. chunks to extract.
+            job (Callable[[Any], Awaitable[None]]): Coroutine performing one LLM call.
+            model (str): Model name; items for the same model share its quota.
+            cost (Callable[[Any], float]): Estimated input tokens of an item (token bucket).
+            on_complete (Optional[Callable[[Any], None]]): Called after each successful item.
+
+        Returns:
+            ExtractionStats: Counters of this run.
+
+        Raises:
+            ExtractionError: If some items still failed after all other items finished.
+        """
+        self.stats = ExtractionStats()
+        started = time.perf_counter()
+        queue: asyncio.Queue = asyncio.Queue()
+        for item in items:
+            queue.put_nowait(item)
+        request_bucket, *token_bucket = self._buckets(model)
+        errors: List[BaseException] = []
+
+        async def worker() -> None:
+            while not queue.empty():
+                item = queue.get_nowait()
+                for attempt in range(self.config.max_retries + 1):
+                    await request_bucket.acquire()
+                    if token_bucket:
+                        await token_bucket[0].acquire(cost(item))
+                    try:
+                        await job(item)
+                    except Exception as e:
+                        if is_rate_limit_error(e) and attempt < self.config.max_retries:
+                            self.stats.rate_limited += 1
+                            delay = min(self.config.backoff_max, self.config.backoff_base * 2 ** attempt)
+                            delay *= random.uniform(0.5, 1.0)
+                            logger.warning(f"Rate limited by {model}; retrying in {delay:.1f}s")
+                            await asyncio.sleep(delay)
+                            continue
+                        self.stats.failed += 1
+                        errors.append(e)
+                        break
+                    self.stats.completed += 1
+                    if on_complete is not None:
+                        on_complete(item)
+                    break
+
+        workers = min(self.config.num_workers, len(items))
+        await asyncio.gather(*(worker() for _ in range(workers)))
+        self.stats.elapsed = time.perf_counter() - started
+        logger.info(
+            f"Extraction: {self.stats.completed} chunks done, {self.stats.failed} failed, "
+            f"{self.stats.rate_limited} rate-limit retries in {self.stats.elapsed:.1f}s."
+        )
+        if errors:
+            raise ExtractionError(f"{len(errors)} chunks failed extraction; first error: {errors[0]}")
+        return self.stats
@@ -0,0 +1,358 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import date
+from typing import Dict, Iterable, List, Literal, Optional, Sequence, Tuple
+from pydantic import BaseModel
+
+FACTS_DB = os.getenv("FACTS_DB", os.path.join("data", "ingestion", "facts.db"))
+
+MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "jun": 6,
+    "jul": 7, "aug": 8, "sep": 9, "oct": 10, "nov": 11, "dec": 12,
+}
+MONTH = r"(?P<month>jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|sept?(?:ember)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)"
+DATE_PATTERNS = [
+    re.compile(r"\b(?P<day>\d{1,2})(?:st|nd|rd|th)?\s+(?:of\s+)?" + MONTH + r"\b\.?(?:,?\s+(?P<year>20\d{2}))?", re.I),
+    re.compile(r"\b" + MONTH + r"\.?\s+(?P<day>\d{1,2})(?:st|nd|rd|th)?\b(?:,?\s+(?P<year>20\d{2}))?", re.I),
+    re.compile(r"\b(?P<year>20\d{2})-(?P<month>\d{2})-(?P<day>\d{2})\b"),
+]
+CURRENCIES = {"£": "GBP", "€": "EUR", "us$": "USD", "$": "USD", "a$": "AUD", "c$": "CAD", "hk$": "HKD", "s$": "SGD",
+              "gbp": "GBP", "usd": "USD", "eur": "EUR", "aud": "AUD", "cad": "CAD", "hkd": "HKD", "sgd": "SGD"}
+AMOUNT = r"(?P<amount>\d{1,3}(?:,\d{3})+|\d+(?:\.\d+)?)\s*(?P<k>k\b)?"
+MONEY_PATTERNS = [
+    re.compile(r"(?P<cur>us\$|a\$|c\$|hk\$|s\$|£|€|\$)\s?" + AMOUNT + r"(?!\s*(?:million|billion|m\b|bn\b))", re.I),
+    re.compile(r"\b(?P<cur>gbp|usd|eur|aud|cad|hkd|sgd)\s?" + AMOUNT + r"(?!\s*(?:million|billion))", re.I),
+    re.compile(AMOUNT + r"\s?(?P<cur>gbp|usd|eur|aud|cad|hkd|sgd)\b", re.I),
+]
+FEE_PERIOD = re.compile(r"\bper\s+(year|annum|term|semester|quarter|class|course|credit|module)\b", re.I)
+TOEFL = re.compile(r"\btoefl\b(?:\s*i?bt)?[^.\n]{0,60}?\b(?P<score>\d{2,3})\b", re.I)
+IELTS = re.compile(r"\bielts\b[^.\n]{0,60}?\b(?P<score>\d(?:\.\d)?)\b", re.I)
+HEADING = re.compile(r"^\s{0,3}#{1,6}\s+(.*)$")
+LINK = re.compile(r"\[([^\]]*)\]\([^)]*\)")
+
+DEADLINE_WORDS = re.compile(r"\b(deadline|due|apply by|closing date|applications? close|submit by)\b", re.I)
+TUITION_WORDS = re.compile(r"\btuition\b", re.I)
+# Amounts in these contexts are aid thresholds or other costs, not tuition.
+NOT_TUITION = re.compile(r"\b(income|incomes|earn|making|application fee|aid|scholarship|waiver|funding|stipend)\b", re.I)
+PROGRAM_WORDS = re.compile(r"\b(msc|ma|mba|mphil|bsc|ba|beng|meng|phd|llm|master'?s?|bachelor'?s?|degree|program|programme|course)\b", re.I)
+
+# Admissions cycles run from August to July, so "before January 1" means the autumn deadlines.
+CYCLE_START_MONTH = 8
+
+
+def cycle_day(month: int, day: int) -> int:
+    """Orders a month/day within an admissions cycle starting in ``CYCLE_START_MONTH``."""
+    return ((month - CYCLE_START_MONTH) % 12) * 31 + day
+
+
+def parse_date(text: str) -> Optional[Tuple[Optional[int], int, int]]:
+    """
+    Finds the first date in ``text``.
+
+    Returns:
+        Optional[Tuple[Optional[int], int, int]]: (year or None, month, day), or None.
+    """
+    for pattern in DATE_PATTERNS:
+        for match in pattern.finditer(text):
+            month = match.group("month")
+            month = int(month) if month.isdigit() else MONTHS[month[:3].lower()]
+            day = int(match.group("day"))
+            year = int(match.group("year")) if match.group("year") else None
+            try:
+                date(year or 2000, month, day)
+            except ValueError:
+                continue
+            return year, month, day
+    return None
+
+
+def normalize_period(word: str) -> str:
+    """Maps a billing period word ("annum", "Semester") to the name stored in ``fee_period``."""
+    word = word.lower()
+    return "year" if word == "annum" else word
+
+
+def parse_money(text: str) -> Optional[Tuple[float, str]]:
+    """
+    Finds the first currency amount in ``text`` ("£30,000", "$62k", "30000 GBP").
+
+    Returns:
+        Optional[Tuple[float, str]]: (amount, ISO currency code), or None.
+    """
+    for pattern in MONEY_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            amount = float(match.group("amount").replace(",", ""))
+            if match.group("k"):
+                amount *= 1000
+            return amount, CURRENCIES[match.group("cur").lower()]
+    return None
+
+
+class FactRecord(BaseModel):
+    """
+    Typed admissions facts found in one section of a page.
+    """
+    university: str
+    program: Optional[str] = None
+    deadline: Optional[str] = None
+    deadline_month: Optional[int] = None
+    deadline_day: Optional[int] = None
+    fee_amount: Optional[float] = None
+    fee_currency: Optional[str] = None
+    fee_period: Optional[str] = None
+    toefl_min: Optional[int] = None
+    ielts_min: Optional[float] = None
+    source_url: str
+    evidence: str = ""
+
+
+class FactExtractor:
+    """
+    Rule-based extraction of deadlines, tuition fees and English-test minima from page
+    markdown. Pages are split into sections at markdown headings; facts in a section are
+    attributed to the section heading when it names a degree programme.
+    """
+
+    def _sections(self, text: str) -> Iterable[Tuple[Optional[str], List[str]]]:
+        heading, lines = None, []
+        for raw in text.splitlines():
+            line = LINK.sub(r"\1", raw).replace("**", "").strip(" *|-\t")
+            match = HEADING.match(raw)
+            if match:
+                if lines:
+                    yield heading, lines
+                heading, lines = LINK.sub(r"\1", match.group(1)).replace("**", "").strip(), []
+            elif line:
+                lines.append(line)
+        if lines:
+            yield heading, lines
+
+    def extract(self, university: str, url: str, text: str) -> List[FactRecord]:
+        """
+        Extracts fact records from one page.
+
+        Args:
+            university (str): University the page belongs to.
+            url (str): Page URL, stored as the records' source.
+            text (str): Page markdown.
+
+        Returns:
+            List[FactRecord]: One record per section with facts, plus one per further
+                deadline or fee found in the same section.
+        """
+        records = []
+        for heading, lines in self._sections(text):
+            program = heading if heading and PROGRAM_WORDS.search(heading) else None
+            base = FactRecord(university=university, program=program, source_url=url)
+            extra: List[FactRecord] = []
+            evidence: List[str] = []
+            in_tuition_section = bool(heading and TUITION_WORDS.search(heading))
+            in_deadline_section = bool(heading and DEADLINE_WORDS.search(heading))
+
+            for line in lines:
+                found = {}
+                if in_deadline_section or DEADLINE_WORDS.search(line):
+                    parsed = parse_date(line)
+                    if parsed:
+                        year, month, day = parsed
+                        found.update(
+                            deadline=date(year, month, day).isoformat() if year else None,
+                            deadline_month=month, deadline_day=day,
+                        )
+                if (in_tuition_section or TUITION_WORDS.search(line)) and not NOT_TUITION.search(line):
+                    money = parse_money(line)
+                    if money and money[0] >= 100:
+                        period = FEE_PERIOD.search(line)
+                        found.update(fee_amount=money[0], fee_currency=money[1],
+                                     fee_period=normalize_period(period.group(1)) if period else None)
+                toefl = TOEFL.search(line)
+                if toefl and 0 < int(toefl.group("score")) <= 120:
+                    found["toefl_min"] = int(toefl.group("score"))
+                ielts = IELTS.search(line)
+                if ielts and 4.0 <= float(ielts.group("score")) <= 9.0:
+                    found["ielts_min"] = float(ielts.group("score"))
+                if not found:
+                    continue
+
+                taken = {k for k in found if getattr(base, k) is not None}
+                if not taken:
+                    base = base.model_copy(update=found)
+                    evidence.append(line)
+                elif {"deadline_month", "fee_amount"} & set(found):
+                    extra.append(FactRecord(university=university, program=program, source_url=url,
+                                            evidence=line[:300], **found))
+            if evidence:
+                records.append(base.model_copy(update={"evidence": " / ".join(evidence)[:300]}))
+            records.extend(extra)
+        return records
+
+
+class FactQuery(BaseModel):
+    """
+    A filter/sort/aggregate request against the fact table.
+
+    Attributes:
+        field (str): "deadline", "fee", "toefl" or "ielts".
+        op (Optional[str]): Comparison of the field with ``value``: <, <=, >, >=.
+        value (Optional[float]): Number to compare with (a ``cycle_day`` for yearless dates).
+        deadline_date (Optional[str]): ISO date to compare deadlines with when a year was given.
+        currency (Optional[str]): Only consider fees in this currency.
+        period (Optional[str]): Only consider fees charged per this period ("year", "term", ...).
+        universities (List[str]): Only consider these universities.
+        aggregate (str): "list", "min", "max", "avg" or "count".
+        limit (int): Maximum rows for "list", "min" and "max".
+    """
+    field: Literal["deadline", "fee", "toefl", "ielts"]
+    op: Optional[Literal["<", "<=", ">", ">="]] = None
+    value: Optional[float] = None
+    deadline_date: Optional[str] = None
+    currency: Optional[str] = None
+    period: Optional[str] = None
+    universities: List[str] = []
+    aggregate: Literal["list", "min", "max", "avg", "count"] = "list"
+    limit: int = 20
+
+
+class FactQueryResult(BaseModel):
+    """
+    Rows (or an aggregate value per fee unit, e.g. "GBP per year") returned by ``FactStore.query``.
+    """
+    records: List[FactRecord] = []
+    values: Dict[str, float] = {}
+    elapsed_ms: float = 0.0
+
+
+class FactStore:
+    """
+    SQLite table of ``FactRecord`` rows, indexed on the columns questions filter and sort on.
+    """
+
+    COLUMNS = list(FactRecord.model_fields)
+    # Column each FactQuery field filters/sorts on.
+    SORT_COLUMNS = {"deadline": "cycle_day", "fee": "fee_amount", "toefl": "toefl_min", "ielts": "ielts_min"}
+
+    def __init__(self, path: str = ":memory:"):
+        """
+        Initializes the FactStore.
+
+        Args:
+            path (str): SQLite file path, or ``:memory:`` for a throwaway table.
+        """
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS facts (
+                university TEXT NOT NULL,
+                program TEXT,
+                deadline TEXT,
+                deadline_month INTEGER,
+                deadline_day INTEGER,
+                cycle_day INTEGER,
+                fee_amount REAL,
+                fee_currency TEXT,
+                fee_period TEXT,
+                toefl_min INTEGER,
+                ielts_min REAL,
+                source_url TEXT NOT NULL,
+                evidence TEXT
+            )
+            """
+        )
+        for column in ("university", "deadline", "cycle_day", "fee_amount", "toefl_min", "ielts_min"):
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS idx_facts_{column} ON facts ({column})")
+        self._conn.commit()
+
+    def replace(self, universities: Sequence[str], records: Sequence[FactRecord]) -> None:
+        """Replaces all facts of ``universities`` with ``records`` in one transaction."""
+        # Pages reachable under several URLs (anchors, trailing slashes) repeat their facts.
+        records = list({tuple(r.model_dump().values()): r for r in records}.values())
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM facts WHERE university = ?", [(u,) for u in universities])
+            self._conn.executemany(
+                f"INSERT INTO facts ({', '.join(self.COLUMNS)}, cycle_day) "
+                f"VALUES ({', '.join('?' * (len(self.COLUMNS) + 1))})",
+                [
+                    (*(getattr(r, c) for c in self.COLUMNS),
+                     cycle_day(r.deadline_month, r.deadline_day) if r.deadline_month else None)
+                    for r in records
+                ],
+            )
+
+    def universities(self) -> List[str]:
+        """Returns the universities that have facts."""
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT DISTINCT university FROM facts ORDER BY university")]
+
+    def query(self, request: FactQuery) -> FactQueryResult:
+        """
+        Runs a filter/sort/aggregate request.
+
+        Args:
+            request (FactQuery): What to select.
+
+        Returns:
+            FactQueryResult: Matching records, or aggregate values for "avg" and "count".
+                Fee amounts are only compared within one currency and billing period: fee
+                rows are ranked per unit and averages are keyed by it ("GBP per year"; ""
+                for fields without one).
+        """
+        started = time.perf_counter()
+        column = self.SORT_COLUMNS[request.field]
+        fee = request.field == "fee"
+        where, params = [f"{column} IS NOT NULL"], []
+        if request.universities:
+            where.append(f"university IN ({', '.join('?' * len(request.universities))})")
+            params.extend(request.universities)
+        if request.currency and fee:
+            where.append("fee_currency = ?")
+            params.append(request.currency)
+        if request.period and fee:
+            where.append("fee_period = ?")
+            params.append(request.period)
+        if request.op and request.deadline_date and request.field == "deadline":
+            where.append(f"deadline IS NOT NULL AND deadline {request.op} ?")
+            params.append(request.deadline_date)
+        elif request.op and request.value is not None:
+            where.append(f"{column} {request.op} ?")
+            params.append(request.value)
+        condition = " AND ".join(where)
+
+        result = FactQueryResult()
+        if request.aggregate in ("avg", "count"):
+            function = "AVG" if request.aggregate == "avg" else "COUNT"
+            target = column if request.aggregate == "avg" else "DISTINCT university"
+            # Averages are only meaningful per fee unit; counts are over universities.
+            group = "fee_currency, fee_period" if fee and request.aggregate == "avg" else "'', NULL"
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT {group}, {function}({target}) FROM facts WHERE {condition} GROUP BY {group}", params
+                ).fetchall()
+            result.values = {
+                (currency or "") + (f" per {period}" if period else ""): value for currency, period, value in rows
+            }
+        else:
+            order = "DESC" if request.aggregate == "max" else "ASC"
+            partition = "PARTITION BY fee_currency, fee_period " if fee else ""
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT {', '.join(self.COLUMNS)} FROM ("
+                    f"SELECT *, ROW_NUMBER() OVER ({partition}ORDER BY {column} {order}, university) AS position "
+                    f"FROM facts WHERE {condition}) WHERE position <= ? "
+                    f"ORDER BY {'fee_currency, fee_period, ' if fee else ''}{column} {order}, university",
+                    [*params, request.limit],
+                ).fetchall()
+            result.records = [FactRecord(**dict(zip(self.COLUMNS, row))) for row in rows]
+        result.elapsed_ms = (time.perf_counter() - started) * 1000
+        return result
+
+    def close(self) -> None:
+        """Closes the underlying SQLite connection."""
+        with self._lock:
+            self._conn.close()
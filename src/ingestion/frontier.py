@@ -0,0 +1,272 @@
+import heapq
+import itertools
+import os
+import sqlite3
+import time
+from typing import Iterable, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit, urlunsplit
+from pydantic import BaseModel
+
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def canonicalize_url(url: str, base_url: Optional[str] = None, keep_query: bool = False) -> Optional[str]:
+    """
+    Normalizes a URL so that trivially different spellings map to one frontier entry.
+
+    Resolves relative links against ``base_url``, lower-cases scheme and host, drops default
+    ports, fragments, trailing slashes and (unless ``keep_query``) the query string.
+
+    Args:
+        url (str): Raw link as found on a page.
+        base_url (Optional[str]): Page the link was found on, used to resolve relative links.
+        keep_query (bool): Whether to keep the query string.
+
+    Returns:
+        Optional[str]: The canonical URL, or None for non-HTTP links (mailto:, javascript:, ...).
+    """
+    url = url.strip().split()[0] if url.strip() else ""
+    if base_url:
+        url = urljoin(base_url, url)
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    if scheme not in DEFAULT_PORTS or not parts.hostname:
+        return None
+
+    host = parts.hostname.lower()
+    if parts.port and parts.port != DEFAULT_PORTS[scheme]:
+        host = f"{host}:{parts.port}"
+
+    path = parts.path or "/"
+    while "//" in path:
+        path = path.replace("//", "/")
+    if len(path) > 1:
+        path = path.rstrip("/")
+
+    query = parts.query if keep_query else ""
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+def site_of(url: str) -> str:
+    """Returns the host of a URL without a leading ``www.``, used for same-site checks."""
+    host = (urlsplit(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+def is_same_site(url: str, base_url: str) -> bool:
+    """Checks whether ``url`` lives on the site of ``base_url`` or one of its subdomains."""
+    host, site = (urlsplit(url).hostname or "").lower(), site_of(base_url)
+    return host == site or host.endswith("." + site)
+
+
+def score_url(url: str, keywords: Iterable[str]) -> int:
+    """Scores a URL by how many admission keywords its path contains."""
+    lower_path = urlsplit(url).path.lower()
+    return sum(1 for k in keywords if k in lower_path)
+
+
+class FrontierEntry(BaseModel):
+    """
+    A URL waiting in, or taken from, a university's crawl frontier.
+    """
+    url: str
+    depth: int
+    score: int
+
+
+class VisitedIndex:
+    """
+    On-disk (SQLite) record of every URL a crawl has queued or fetched, per university.
+
+    Finished pages keep their markdown, so an interrupted crawl can be resumed without
+    re-fetching what was already stored.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        """
+        Initializes the VisitedIndex.
+
+        Args:
+            path (str): SQLite file path, or ``:memory:`` for a throwaway index.
+        """
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS frontier (
+                university TEXT NOT NULL,
+                url TEXT NOT NULL,
+                depth INTEGER NOT NULL,
+                score INTEGER NOT NULL,
+                status TEXT NOT NULL,
+                content TEXT,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (university, url)
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_frontier_status ON frontier (university, status)"
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        """Closes the underlying SQLite connection."""
+        self._conn.close()
+
+    def add(self, university: str, entry: FrontierEntry) -> bool:
+        """
+        Records a newly discovered URL as queued.
+
+        Returns:
+            bool: False if the URL was already known for this university.
+        """
+        cur = self._conn.execute(
+            "INSERT OR IGNORE INTO frontier (university, url, depth, score, status, updated_at) "
+            "VALUES (?, ?, ?, ?, 'queued', ?)",
+            (university, entry.url, entry.depth, entry.score, time.time()),
+        )
+        self._conn.commit()
+        return cur.rowcount > 0
+
+    def mark(self, university: str, url: str, status: str, content: Optional[str] = None) -> None:
+        """Marks a URL as ``done`` (with its content) or ``failed``."""
+        self._conn.execute(
+            "UPDATE frontier SET status = ?, content = ?, updated_at = ? WHERE university = ? AND url = ?",
+            (status, content, time.time(), university, url),
+        )
+        self._conn.commit()
+
+    def queued(self, university: str) -> List[FrontierEntry]:
+        """Returns URLs still waiting to be fetched from a previous, interrupted crawl."""
+        rows = self._conn.execute(
+            "SELECT url, depth, score FROM frontier WHERE university = ? AND status = 'queued'",
+            (university,),
+        ).fetchall()
+        return [FrontierEntry(url=u, depth=d, score=s) for u, d, s in rows]
+
+    def finished(self, university: str) -> List[Tuple[FrontierEntry, Optional[str]]]:
+        """Returns fetched (``done``) entries with their stored content, in fetch order."""
+        rows = self._conn.execute(
+            "SELECT url, depth, score, content FROM frontier "
+            "WHERE university = ? AND status = 'done' ORDER BY updated_at",
+            (university,),
+        ).fetchall()
+        return [(FrontierEntry(url=u, depth=d, score=s), c) for u, d, s, c in rows]
+
+    def attempted(self, university: str) -> int:
+        """Counts URLs already fetched or given up on for a university."""
+        (count,) = self._conn.execute(
+            "SELECT COUNT(*) FROM frontier WHERE university = ? AND status != 'queued'",
+            (university,),
+        ).fetchone()
+        return count
+
+    def reset(self, university: str) -> None:
+        """Forgets a university's previous crawl so the next one starts fresh."""
+        self._conn.execute("DELETE FROM frontier WHERE university = ?", (university,))
+        self._conn.commit()
+
+    def close_pass(self, university: str) -> None:
+        """Drops URLs left queued once a crawl completes, so they are not mistaken for a crash."""
+        self._conn.execute(
+            "DELETE FROM frontier WHERE university = ? AND status = 'queued'", (university,)
+        )
+        self._conn.commit()
+
+
+class Frontier:
+    """
+    Priority queue of URLs for one university, scored by keyword relevance and bounded by
+    depth and page budgets. Every push and pop is mirrored into a ``VisitedIndex``.
+    """
+
+    def __init__(self, index: VisitedIndex, university: str, base_url: str,
+                 keywords: List[str], max_depth: int, max_pages: int):
+        """
+        Initializes the Frontier.
+
+        Args:
+            index (VisitedIndex): Persistent visited-set index.
+            university (str): University name the frontier belongs to.
+            base_url (str): The university's root URL; links off this site are ignored.
+            keywords (List[str]): Relevance keywords used for scoring.
+            max_depth (int): Maximum link depth, where the root page is depth 0.
+            max_pages (int): Maximum number of pages fetched, including the root page.
+        """
+        self.index = index
+        self.university = university
+        self.base_url = base_url
+        self.keywords = keywords
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self._heap: List[Tuple[int, int, int, FrontierEntry]] = []
+        self._seq = itertools.count()
+        self._taken = 0
+
+    def resume(self) -> bool:
+        """
+        Reloads queued URLs left over from an interrupted crawl.
+
+        Returns:
+            bool: True if a previous crawl is being resumed; otherwise the index is reset.
+        """
+        pending = self.index.queued(self.university)
+        if not pending:
+            self.index.reset(self.university)
+            return False
+        for entry in pending:
+            self._push(entry)
+        self._taken = self.index.attempted(self.university)
+        return True
+
+    def _push(self, entry: FrontierEntry) -> None:
+        heapq.heappush(self._heap, (-entry.score, entry.depth, next(self._seq), entry))
+
+    def add(self, url: str, depth: int, source_url: Optional[str] = None, force: bool = False) -> bool:
+        """
+        Canonicalizes, filters and enqueues a discovered link.
+
+        Args:
+            url (str): Raw link.
+            depth (int): Depth the link would be fetched at.
+            source_url (Optional[str]): Page the link was found on.
+            force (bool): Enqueue even without a keyword match (used for the root page).
+
+        Returns:
+            bool: True if the link was new and enqueued.
+        """
+        canonical = canonicalize_url(url, source_url or self.base_url)
+        if canonical is None or depth > self.max_depth or not is_same_site(canonical, self.base_url):
+            return False
+        score = score_url(canonical, self.keywords)
+        if score == 0 and not force:
+            return False
+        entry = FrontierEntry(url=canonical, depth=depth, score=score)
+        if not self.index.add(self.university, entry):
+            return False
+        self._push(entry)
+        return True
+
+    def pop_batch(self, size: int) -> List[FrontierEntry]:
+        """Takes up to ``size`` of the highest-priority URLs within the remaining page budget."""
+        batch = []
+        while self._heap and len(batch) < size and self._taken < self.max_pages:
+            batch.append(heapq.heappop(self._heap)[-1])
+            self._taken += 1
+        return batch
+
+    def done(self, entry: FrontierEntry, content: Optional[str]) -> None:
+        """Records the outcome of a fetch; ``content=None`` marks it as failed."""
+        status = "done" if content is not None else "failed"
+        self.index.mark(self.university, entry.url, status, content)
+
+    def finish(self) -> None:
+        """Closes the crawl pass; the next crawl of this university starts from scratch."""
+        self._heap.clear()
+        self.index.close_pass(self.university)
+
+    def __len__(self) -> int:
+        return len(self._heap)
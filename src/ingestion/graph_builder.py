@@ -1,13 +1,26 @@
 import os
-import json
 import logging
-from typing import List
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence
 from dotenv import load_dotenv
 from llama_index.core import Document, PropertyGraphIndex, Settings
+from llama_index.core.ingestion import run_transformations
+from llama_index.core.indices.property_graph import ImplicitPathExtractor, SimpleLLMPathExtractor
+from llama_index.core.graph_stores.types import LabelledNode, Relation
 from llama_index.graph_stores.neo4j import Neo4jPropertyGraphStore
-from llama_index.embeddings.fastembed import FastEmbedEmbedding
-from llama_index.llms.gemini import Gemini
 import nest_asyncio
+from src.ingestion.cleaner import BoilerplateCleaner
+from src.ingestion.embedding import CachedEmbedding, VectorCache
+from src.ingestion.extraction_cache import CachedExtractor, ExtractionCache
+from src.ingestion.extraction_scheduler import ExtractionScheduler, ExtractionSchedulerConfig
+from src.ingestion.facts import FACTS_DB, FactExtractor, FactStore
+from src.ingestion.manifest import MANIFEST_PATH, IngestionManifest, with_stable_id
+from src.ingestion.page_store import LEGACY_RAW_DIR, PAGE_STORE_DIR, PageStore
+from src.ingestion.summaries import GraphSummarizer
+from src.ingestion.vector_index import delete_chunks, get_vector_store, index_chunks
+from src.models import configure_settings, get_embed_model, get_llm
+from src.telemetry import record_cache, span, trace
 
 nest_asyncio.apply()
 
@@ -21,87 +34,341 @@ load_dotenv()
 NEO4J_URI = os.getenv("NEO4J_URI", "bolt://localhost:7687")
 NEO4J_USERNAME = os.getenv("NEO4J_USERNAME", "neo4j")
 NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD", "password")
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-
-if not GOOGLE_API_KEY:
-    logger.warning("GOOGLE_API_KEY not found in environment variables. Gemini LLM may fail.")
-
-# Setup LLM & Embedding
-# Using FastEmbed for embeddings
-Settings.embed_model = FastEmbedEmbedding(model_name="BAAI/bge-small-en-v1.5")
-
-# Using Gemini 2.5 Flash for specific reasoning capabilities
-Settings.llm = Gemini(model="models/gemini-2.5-flash", api_key=GOOGLE_API_KEY)
-
-def load_documents_from_json(data_dir: str) -> List[Document]:
-    """Loads university data from JSON files as LlamaIndex Documents."""
-    documents = []
-    if not os.path.exists(data_dir):
-        logger.warning(f"Data directory not found: {data_dir}")
-        return []
-
-    for filename in os.listdir(data_dir):
-        if filename.endswith(".json"):
-            filepath = os.path.join(data_dir, filename)
-            try:
-                with open(filepath, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    
-                    # Main Page
-                    if data.get("content"):
-                        doc = Document(
-                            text=data["content"],
-                            metadata={
-                                "url": data.get("url", ""),
-                                "title": data.get("name", "Unknown"),
-                                "type": "main_page",
-                                "university": data.get("name", "Unknown")
-                            }
-                        )
-                        documents.append(doc)
-                    
-                    # Sub Pages
-                    for sub in data.get("sub_pages", []):
-                        if sub.get("content"):
-                            doc = Document(
-                                text=sub["content"],
-                                metadata={
-                                    "url": sub.get("url", ""),
-                                    "title": f"{data.get('name', 'Unknown')} - SubPage",
-                                    "type": "sub_page",
-                                    "university": data.get("name", "Unknown")
-                                }
-                            )
-                            documents.append(doc)
-            except Exception as e:
-                logger.error(f"Error loading {filename}: {e}")
-                
-    return documents
-
-def build_graph():
-    """Ingests documents into Neo4j Property Graph."""
+EXTRACTION_CACHE_PATH = os.getenv("EXTRACTION_CACHE", os.path.join("data", "ingestion", "extraction_cache.db"))
+EXTRACTION_CACHE_MAX_MB = int(os.getenv("EXTRACTION_CACHE_MAX_MB", "512"))
+EXTRACTION_WORKERS = int(os.getenv("EXTRACTION_WORKERS", "8"))
+EXTRACTION_RPM = float(os.getenv("EXTRACTION_RPM", "60"))
+EXTRACTION_TPM = float(os.getenv("EXTRACTION_TPM", "0"))
+NEO4J_BATCH_SIZE = int(os.getenv("NEO4J_BATCH_SIZE", "5000"))
+EMBEDDING_CACHE_DIR = os.getenv("EMBEDDING_CACHE_DIR", os.path.join("data", "ingestion", "embeddings"))
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "256"))
+# FastEmbed worker processes for large batches; 0 uses every core.
+EMBED_WORKERS = int(os.getenv("EMBED_WORKERS", "0"))
+SUMMARY_CONCURRENCY = int(os.getenv("SUMMARY_CONCURRENCY", "4"))
+SUMMARY_MIN_COMMUNITY = int(os.getenv("SUMMARY_MIN_COMMUNITY", "5"))
+SUMMARY_MAX_COMMUNITIES = int(os.getenv("SUMMARY_MAX_COMMUNITIES", "50"))
+
+# Constraints and indexes the ingestion upserts, incremental deletes and retrieval
+# lookups (by id, document, university, url and entity name) depend on.
+SCHEMA_STATEMENTS = [
+    "CREATE CONSTRAINT node_id IF NOT EXISTS FOR (n:`__Node__`) REQUIRE n.id IS UNIQUE",
+    "CREATE CONSTRAINT entity_id IF NOT EXISTS FOR (n:`__Entity__`) REQUIRE n.id IS UNIQUE",
+    "CREATE INDEX chunk_ref_doc_id IF NOT EXISTS FOR (c:Chunk) ON (c.ref_doc_id)",
+    "CREATE INDEX chunk_university IF NOT EXISTS FOR (c:Chunk) ON (c.university)",
+    "CREATE INDEX chunk_url IF NOT EXISTS FOR (c:Chunk) ON (c.url)",
+    "CREATE INDEX entity_name IF NOT EXISTS FOR (e:`__Entity__`) ON (e.name)",
+    "CREATE INDEX entity_university IF NOT EXISTS FOR (e:`__Entity__`) ON (e.university)",
+    "CREATE INDEX entity_url IF NOT EXISTS FOR (e:`__Entity__`) ON (e.url)",
+    "CREATE FULLTEXT INDEX entity_name_fulltext IF NOT EXISTS FOR (e:`__Entity__`) ON EACH [e.name]",
+    "CREATE CONSTRAINT summary_id IF NOT EXISTS FOR (s:Summary) REQUIRE s.id IS UNIQUE",
+]
+
+class BulkNeo4jPropertyGraphStore(Neo4jPropertyGraphStore):
+    """
+    Neo4jPropertyGraphStore whose upserts run as large UNWIND batches inside one explicit
+    write transaction per query, instead of one auto-commit query per 1000 rows. Only the
+    batching is overridden: the parent's upserts run with their ``structured_query`` calls
+    collected, and each query's rows are then written ``batch_size`` at a time.
+    """
+
+    def __init__(self, *args: Any, batch_size: int = NEO4J_BATCH_SIZE, **kwargs: Any):
+        """
+        Initializes the BulkNeo4jPropertyGraphStore.
+
+        Args:
+            batch_size (int): Rows per UNWIND statement.
+            *args, **kwargs: Passed on to ``Neo4jPropertyGraphStore``.
+        """
+        self.batch_size = batch_size
+        self._collecting = threading.local()
+        super().__init__(*args, **kwargs)
+
+    def structured_query(self, query: str, param_map: Optional[Dict[str, Any]] = None) -> Any:
+        """Runs ``query``; inside an upsert, its UNWIND rows are collected for batching instead."""
+        pending = getattr(self._collecting, "queries", None)
+        if pending is not None and param_map is not None and list(param_map) == ["data"]:
+            pending.setdefault(query, []).extend(param_map["data"])
+            return []
+        return super().structured_query(query, param_map)
+
+    def _write_batches(self, kind: str, query: str, rows: List[Dict[str, Any]]) -> None:
+        """Runs ``query`` over ``rows`` in UNWIND batches within a single transaction."""
+        if not rows:
+            return
+        batches = [rows[i:i + self.batch_size] for i in range(0, len(rows), self.batch_size)]
+
+        def work(tx: Any) -> None:
+            for number, batch in enumerate(batches, 1):
+                started = time.perf_counter()
+                tx.run(query, data=batch).consume()
+                logger.info(
+                    f"Neo4j {kind} batch {number}/{len(batches)}: {len(batch)} rows "
+                    f"in {(time.perf_counter() - started) * 1000:.0f} ms"
+                )
+
+        started = time.perf_counter()
+        with span(f"neo4j_{kind}_upsert"), self._driver.session(database=self._database) as session:
+            session.execute_write(work)
+        logger.info(f"Neo4j {kind} upsert: {len(rows)} rows committed in {time.perf_counter() - started:.2f}s")
+
+    def _batched(self, kind: str, upsert: Callable[[List[Any]], None], items: List[Any]) -> None:
+        """Runs the parent's ``upsert`` with its queries collected, then writes them in batches, in order."""
+        self._collecting.queries = {}
+        try:
+            upsert(items)
+            queries = self._collecting.queries
+        finally:
+            self._collecting.queries = None
+        for query, rows in queries.items():
+            self._write_batches(kind, query, rows)
+
+    def upsert_nodes(self, nodes: List[LabelledNode]) -> None:
+        """Upserts chunk nodes, then entity nodes (with their MENTIONS edges)."""
+        self._batched("node", super().upsert_nodes, nodes)
+
+    def upsert_relations(self, relations: List[Relation]) -> None:
+        """Upserts relations; their endpoint nodes are expected to exist already."""
+        self._batched("relation", super().upsert_relations, relations)
+
+def bootstrap_schema(graph_store: Neo4jPropertyGraphStore) -> None:
+    """Creates the constraints and indexes in ``SCHEMA_STATEMENTS`` if they do not exist."""
+    started = time.perf_counter()
+    for statement in SCHEMA_STATEMENTS:
+        graph_store.structured_query(statement)
+    logger.info(f"Neo4j schema ready ({len(SCHEMA_STATEMENTS)} constraints/indexes) in {time.perf_counter() - started:.2f}s")
+
+def iter_documents(
+    store: PageStore, cleaner: Optional[BoilerplateCleaner] = None, universities: Optional[Sequence[str]] = None
+) -> Iterator[Document]:
+    """
+    Lazily reads crawled pages from the page store as LlamaIndex Documents, one
+    university at a time, so memory use does not grow with the corpus.
+
+    Args:
+        store (PageStore): Raw page store written by the crawler.
+        cleaner (Optional[BoilerplateCleaner]): If given, strips navigation and other
+            boilerplate repeated across each university's pages before building Documents.
+        universities (Optional[Sequence[str]]): Only read these universities (default: all).
+
+    Yields:
+        Document: One Document per non-empty page, with a stable ID derived from its URL
+            and the hash of its raw (uncleaned) content.
+    """
+    for university, pages in store.iter_sites(universities):
+        texts = [page.content for page in pages]
+        if cleaner is not None:
+            texts = cleaner.clean_site(university, texts)
+            report = cleaner.reports[-1]
+            logger.info(
+                f"Cleaned {report.university}: {report.bytes_saved} bytes "
+                f"(~{report.tokens_saved} tokens) of boilerplate removed, "
+                f"{report.duplicate_pages} duplicate pages dropped."
+            )
+        for page, text in zip(pages, texts):
+            if not text:
+                continue
+            doc = Document(
+                text=text,
+                metadata={
+                    "url": page.url,
+                    "title": university if page.type == "main_page" else f"{university} - SubPage",
+                    "type": page.type,
+                    "university": university,
+                },
+            )
+            yield with_stable_id(doc, raw=page.content)
+
+def refresh_facts(documents: Iterable[Document], store: FactStore, universities: Optional[Sequence[str]] = None) -> int:
+    """
+    Re-extracts the typed fact table (deadlines, fees, test minima) from every document.
+    Rule-based and cheap, so it always runs over the whole corpus (or university).
+
+    Args:
+        documents (Iterable[Document]): All loaded (cleaned) documents, read once.
+        store (FactStore): Fact table to rewrite.
+        universities (Optional[Sequence[str]]): If given, ``documents`` only cover these
+            universities and the facts of all others are kept.
+
+    Returns:
+        int: Number of fact records stored.
+    """
+    extractor = FactExtractor()
+    records = []
+    replaced = set(store.universities() if universities is None else universities)
+    for doc in documents:
+        university = doc.metadata.get("university", "Unknown")
+        replaced.add(university)
+        records.extend(extractor.extract(university, doc.metadata.get("url", ""), doc.text))
+    store.replace(sorted(replaced), records)
+    return len(records)
+
+def delete_documents(graph_store: Neo4jPropertyGraphStore, doc_ids: List[str]) -> None:
+    """
+    Removes everything derived from the given documents: their chunks, the relations
+    extracted from those chunks, and entities no other chunk still mentions.
+
+    Args:
+        graph_store (Neo4jPropertyGraphStore): Target graph store.
+        doc_ids (List[str]): Stable document IDs (the chunks' ``ref_doc_id``).
+    """
+    if not doc_ids:
+        return
+    graph_store.structured_query(
+        """
+        MATCH (c:Chunk) WHERE c.ref_doc_id IN $doc_ids
+        OPTIONAL MATCH (c)-[:MENTIONS]->(e)
+        WITH collect(DISTINCT c) AS chunks, collect(DISTINCT e) AS entities,
+             collect(DISTINCT c.id) AS chunk_ids
+        CALL {
+            WITH chunk_ids
+            MATCH ()-[r]->() WHERE r.triplet_source_id IN chunk_ids
+            DELETE r
+        }
+        FOREACH (c IN chunks | DETACH DELETE c)
+        WITH entities
+        UNWIND entities AS e
+        WITH e WHERE e IS NOT NULL AND NOT (e)<-[:MENTIONS]-(:Chunk)
+        DETACH DELETE e
+        """,
+        param_map={"doc_ids": doc_ids},
+    )
+    logger.info(f"Deleted graph data of {len(doc_ids)} stale documents.")
+
+def refresh_summaries(graph_store: Neo4jPropertyGraphStore, embed_model: Any) -> None:
+    """
+    Recomputes entity communities (GDS Leiden) and regenerates the university and
+    community summaries whose facts changed. Failures are logged, not raised: the
+    summaries only serve global questions and the rest of the graph stays usable.
+
+    Args:
+        graph_store (Neo4jPropertyGraphStore): Ingested graph.
+        embed_model (Any): Embedding model the summaries are embedded with.
+    """
+    summarizer = GraphSummarizer(
+        graph_store,
+        llm=get_llm("synthesis"),
+        embed_model=embed_model,
+        min_community_size=SUMMARY_MIN_COMMUNITY,
+        max_communities=SUMMARY_MAX_COMMUNITIES,
+        concurrency=SUMMARY_CONCURRENCY,
+    )
+    try:
+        with span("summaries"):
+            stats = summarizer.refresh()
+    except Exception as e:
+        logger.error(f"Error building graph summaries: {e}")
+        return
+    logger.info(
+        f"Graph summaries: {stats.summarized} written, {stats.unchanged} unchanged, {stats.deleted} deleted "
+        f"({stats.communities} communities) in {stats.elapsed:.2f}s."
+    )
+
+def build_summaries():
+    """
+    Runs only the summary step over the already ingested graph, then touches the
+    ingestion manifest so running APIs reload the summaries and drop cached answers.
+    """
+    configure_settings()
+    graph_store = BulkNeo4jPropertyGraphStore(username=NEO4J_USERNAME, password=NEO4J_PASSWORD, url=NEO4J_URI)
+    bootstrap_schema(graph_store)
+    refresh_summaries(graph_store, get_embed_model())
+    if os.path.exists(MANIFEST_PATH):
+        os.utime(MANIFEST_PATH)
+
+def build_graph(
+    incremental: bool = True,
+    universities: Optional[Sequence[str]] = None,
+    documents: Optional[List[Document]] = None,
+) -> bool:
+    """
+    Ingests documents into Neo4j Property Graph and logs how long each stage took.
+
+    Args:
+        incremental (bool): Only extract new or changed pages and delete data of changed or
+            vanished ones, based on the ingestion manifest. False re-ingests the whole corpus.
+        universities (Optional[Sequence[str]]): Only (re-)ingest these universities; the
+            rest of the graph is left as it is. Default: the whole page store.
+        documents (Optional[List[Document]]): Already cleaned documents of ``universities``,
+            used instead of reading the page store.
+
+    Returns:
+        bool: Whether ingestion completed (also True if there was nothing to do).
+    """
+    with trace("ingest") as ingest_trace:
+        try:
+            return _build_graph(incremental, universities, documents)
+        finally:
+            logger.info(f"Ingestion stages: {ingest_trace.summary() or 'none'}")
+
+def _build_graph(incremental: bool, universities: Optional[Sequence[str]], documents: Optional[List[Document]]) -> bool:
     logger.info("Initializing Graph Builder...")
+    # Setup LLM & Embedding (FastEmbed + the local/cloud LLM router), shared with retrieval
+    configure_settings()
     
     # 1. Connect to Neo4j
     try:
-        graph_store = Neo4jPropertyGraphStore(
+        graph_store = BulkNeo4jPropertyGraphStore(
             username=NEO4J_USERNAME,
             password=NEO4J_PASSWORD,
             url=NEO4J_URI,
         )
         logger.info("Connected to Neo4j.")
+        bootstrap_schema(graph_store)
     except Exception as e:
         logger.error(f"Failed to connect to Neo4j: {e}")
-        return
+        return False
+
+    # Chunks are also written to Qdrant (same IDs as the graph's chunk nodes) for the
+    # hybrid retriever's ANN search.
+    try:
+        vector_store = get_vector_store()
+        logger.info("Connected to Qdrant.")
+    except Exception as e:
+        logger.error(f"Failed to connect to Qdrant: {e}")
+        return False
 
-    # 2. Load Documents
-    data_path = os.path.join(os.getcwd(), "data", "raw")
-    docs = load_documents_from_json(data_path)
-    logger.info(f"Loaded {len(docs)} documents from {data_path}.")
+    # 2. Load Documents. The page store is read lazily (twice: once for the fact table,
+    # once for the manifest diff), so only changed pages are ever held in memory.
+    page_store = PageStore(PAGE_STORE_DIR)
+    if not len(page_store):
+        imported = page_store.import_json(LEGACY_RAW_DIR)
+        logger.info(f"Imported {imported} pages from {LEGACY_RAW_DIR} into the page store.")
+    
+    fact_store = FactStore(FACTS_DB)
+    started = time.perf_counter()
+    with span("facts"):
+        count = refresh_facts(
+            documents if documents is not None else iter_documents(page_store, BoilerplateCleaner(), universities),
+            fact_store,
+            universities,
+        )
+    logger.info(f"Stored {count} fact records in {time.perf_counter() - started:.2f}s.")
+    fact_store.close()
     
-    if not docs:
+    # A full run still diffs against the manifest, so pages removed since the last run
+    # are deleted from Neo4j and Qdrant.
+    manifest = IngestionManifest(MANIFEST_PATH)
+    cleaner = BoilerplateCleaner()
+    with span("load_documents"):
+        plan = manifest.plan(
+            documents if documents is not None else iter_documents(page_store, cleaner, universities),
+            universities,
+            full=not incremental,
+        )
+    page_store.close()
+    logger.info(
+        f"Read {plan.new + plan.changed + plan.unchanged} documents from {PAGE_STORE_DIR}. Boilerplate stripping "
+        f"saved {sum(r.bytes_saved for r in cleaner.reports)} bytes "
+        f"(~{sum(r.tokens_saved for r in cleaner.reports)} tokens) across {len(cleaner.reports)} universities."
+    )
+    logger.info(
+        f"Ingestion plan: {plan.new} new, {plan.changed} changed, {plan.unchanged} unchanged, "
+        f"{len(plan.removed)} removed pages."
+    )
+
+    if not plan.to_ingest and not plan.stale_doc_ids:
         logger.warning("No documents to ingest. Exiting.")
-        return
+        return True
 
     # 3. Create Index
     # PropertyGraphIndex will use the default extractor (ImplicitPathExtractor) if not specified,
@@ -109,18 +376,85 @@ def build_graph():
     # Without an LLM configured in Settings, this might fail if it tries to use OpenAI by default and no key is present.
     # We will try to rely on the environment variables provided by the user.
     
-    logger.info("Creating PropertyGraphIndex... (This may take time)")
+    logger.info(f"Creating PropertyGraphIndex for {len(plan.to_ingest)} documents... (This may take time)")
+    
+    # LLM extraction results are cached by chunk text + prompt + model, so identical
+    # chunks and re-runs after a failure do not call the LLM again. Misses run on a
+    # rate-limited worker pool and are cached (checkpointed) one chunk at a time.
+    extraction_cache = ExtractionCache(EXTRACTION_CACHE_PATH, max_bytes=EXTRACTION_CACHE_MAX_MB * 1024 * 1024)
+    scheduler = ExtractionScheduler(ExtractionSchedulerConfig(
+        num_workers=EXTRACTION_WORKERS,
+        requests_per_minute=EXTRACTION_RPM,
+        tokens_per_minute=EXTRACTION_TPM,
+    ))
+    kg_extractors = [
+        CachedExtractor(
+            extractor=SimpleLLMPathExtractor(llm=get_llm("extraction"), num_workers=1),
+            cache=extraction_cache,
+            scheduler=scheduler,
+        ),
+        ImplicitPathExtractor(),
+    ]
+    
+    # Chunk and entity embeddings are computed in large multi-process batches and cached
+    # by text hash, so unchanged chunks are never re-embedded.
+    embed_model = CachedEmbedding(
+        get_embed_model(),
+        VectorCache(EMBEDDING_CACHE_DIR),
+        encode_batch_size=EMBED_BATCH_SIZE,
+        parallel=EMBED_WORKERS,
+    )
     
     try:
-        index = PropertyGraphIndex.from_documents(
-            docs,
-            property_graph_store=graph_store,
-            show_progress=True,
-            # We can specify kg_extractors here if we want to customize, e.g., SimpleLLMPathExtractor
-        )
+        with span("delete_stale"):
+            delete_documents(graph_store, plan.stale_doc_ids)
+            delete_chunks(vector_store, plan.stale_doc_ids)
+        if plan.to_ingest:
+            with span("chunk"):
+                nodes = run_transformations(plan.to_ingest, Settings.transformations, show_progress=True)
+            # Extraction, chunk/entity embedding and the Neo4j writes; their own spans
+            # break this down further.
+            with span("build_index"):
+                index = PropertyGraphIndex(
+                    nodes=nodes,
+                    property_graph_store=graph_store,
+                    kg_extractors=kg_extractors,
+                    embed_model=embed_model,
+                    show_progress=True,
+                )
+            with span("index_chunks"):
+                index_chunks(vector_store, nodes, embed_model)
+        # Written before the manifest is saved: its new version makes the API reload them.
+        refresh_summaries(graph_store, embed_model)
+        manifest.apply(plan)
+        manifest.save()
         logger.info("Graph ingestion complete! Nodes and relationships should be in Neo4j.")
+        return True
     except Exception as e:
         logger.error(f"Error building index: {e}")
+        return False
+    finally:
+        stats = extraction_cache.stats()
+        record_cache("extraction", stats.hits, stats.misses)
+        record_cache("embedding", embed_model.stats.hits, embed_model.stats.misses)
+        logger.info(
+            f"Extraction cache: {stats.hits} hits, {stats.misses} misses ({stats.hit_rate:.0%}), "
+            f"{stats.evictions} evictions, {stats.entries} entries / {stats.size_bytes} bytes."
+        )
+        extraction_cache.close()
+        logger.info(
+            f"Embeddings: {embed_model.stats.misses} computed ({embed_model.stats.texts_per_sec:.0f}/s), "
+            f"{embed_model.stats.hits} served from the vector cache ({embed_model.stats.hit_rate:.0%})."
+        )
+        embed_model.cache.close()
 
 if __name__ == "__main__":
-    build_graph()
+    import argparse
+    parser = argparse.ArgumentParser(description="Ingest crawled pages into the Neo4j property graph.")
+    parser.add_argument("--full", action="store_true", help="Re-ingest every page instead of only changes.")
+    parser.add_argument("--summaries-only", action="store_true", help="Only rebuild the graph summaries.")
+    args = parser.parse_args()
+    if args.summaries_only:
+        build_summaries()
+    else:
+        build_graph(incremental=not args.full)
@@ -0,0 +1,469 @@
+import asyncio
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Literal, Optional, Sequence, Tuple
+from pydantic import BaseModel
+
+# Kept free of Crawl4AI/LlamaIndex imports so the API can serve job endpoints before (and
+# without) loading them; the default stages import them when a job actually runs.
+
+JOBS_DB = os.getenv("JOBS_DB", os.path.join("data", "jobs", "jobs.db"))
+# JSON list of {"name", "url", "rank"} entries (e.g. an exported QS ranking).
+UNIVERSITY_CATALOG = os.getenv("UNIVERSITY_CATALOG", os.path.join("data", "universities.json"))
+JOB_CRAWL_WORKERS = int(os.getenv("JOB_CRAWL_WORKERS", "2"))
+# Universities buffered between two pipeline stages before the upstream stage waits.
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "4"))
+
+JobStatus = Literal["queued", "running", "succeeded", "failed"]
+ItemStage = Literal["queued", "crawl", "clean", "ingest", "done", "failed"]
+
+# Share of a university's work finished once it reaches a stage, for the progress bar.
+STAGE_PROGRESS: Dict[str, float] = {"queued": 0.0, "crawl": 0.0, "clean": 0.5, "ingest": 0.6, "done": 1.0, "failed": 1.0}
+
+
+class UniversitySpec(BaseModel):
+    """
+    A university to crawl, as submitted to a job (mirrors the crawler's ``University``).
+    """
+    name: str
+    url: str
+    rank: int
+    max_depth: Optional[int] = None
+    max_pages: Optional[int] = None
+
+
+DEFAULT_CATALOG = [
+    UniversitySpec(name="MIT", url="https://www.mit.edu/admissions/", rank=1),
+    UniversitySpec(name="Cambridge", url="https://www.undergraduate.study.cam.ac.uk/", rank=2),
+    UniversitySpec(name="Oxford", url="https://www.ox.ac.uk/admissions", rank=3),
+    UniversitySpec(name="Harvard", url="https://college.harvard.edu/admissions", rank=4),
+    UniversitySpec(name="Stanford", url="https://www.stanford.edu/admission/", rank=5),
+]
+
+
+class JobRequest(BaseModel):
+    """
+    What to crawl and ingest: explicit universities, a rank range of the catalog, or both.
+    ``rank_to`` alone selects ranks 1 to ``rank_to``; ``rank_from`` alone a single rank.
+    """
+    universities: List[UniversitySpec] = []
+    rank_from: Optional[int] = None
+    rank_to: Optional[int] = None
+
+
+class JobItem(BaseModel):
+    """
+    Progress of one university through the crawl → clean → ingest pipeline.
+    """
+    university: str
+    stage: ItemStage = "queued"
+    pages: int = 0
+    documents: int = 0
+    error: Optional[str] = None
+    updated_at: float = 0.0
+
+
+class Job(BaseModel):
+    """
+    A submitted crawl-and-ingest job and the progress of each of its universities.
+
+    Attributes:
+        progress (float): Fraction of the job's work done, from 0 to 1.
+    """
+    id: str
+    status: JobStatus = "queued"
+    created_at: float
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+    progress: float = 0.0
+    items: List[JobItem] = []
+
+
+def load_catalog(path: str = UNIVERSITY_CATALOG) -> List[UniversitySpec]:
+    """Returns the university catalog at ``path``, or the built-in top five if it is missing."""
+    if not os.path.exists(path):
+        return list(DEFAULT_CATALOG)
+    with open(path, "r", encoding="utf-8") as f:
+        return sorted((UniversitySpec(**entry) for entry in json.load(f)), key=lambda u: u.rank)
+
+
+def resolve_universities(request: JobRequest, catalog: Sequence[UniversitySpec]) -> List[UniversitySpec]:
+    """
+    Expands a job request into its universities (explicit ones first, no duplicate names).
+
+    Raises:
+        ValueError: If the request selects no university.
+    """
+    selected = list(request.universities)
+    if request.rank_from is not None or request.rank_to is not None:
+        low, high = request.rank_from or 1, request.rank_to or request.rank_from
+        selected += [u for u in catalog if low <= u.rank <= high]
+    unique: List[UniversitySpec] = []
+    for university in selected:
+        if all(u.name != university.name for u in unique):
+            unique.append(university)
+    if not unique:
+        raise ValueError("The job selects no universities.")
+    return unique
+
+
+class JobStore:
+    """
+    Persistent job state backed by SQLite, so jobs and their progress survive restarts.
+    Reads are single indexed queries, cheap enough to poll.
+    """
+
+    def __init__(self, path: str = ":memory:"):
+        """
+        Initializes the JobStore.
+
+        Args:
+            path (str): SQLite file path, or ``:memory:`` for throwaway job state.
+        """
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                status TEXT NOT NULL,
+                universities TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                error TEXT
+            );
+            CREATE TABLE IF NOT EXISTS job_items (
+                job_id TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                university TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                pages INTEGER NOT NULL DEFAULT 0,
+                documents INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (job_id, university)
+            );
+            """
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        """Closes the underlying SQLite connection."""
+        self._conn.close()
+
+    def create(self, universities: Sequence[UniversitySpec]) -> Job:
+        """Persists a new queued job for ``universities`` and returns it."""
+        job_id, now = uuid.uuid4().hex[:12], time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (id, status, universities, created_at) VALUES (?, 'queued', ?, ?)",
+                (job_id, json.dumps([u.model_dump() for u in universities]), now),
+            )
+            self._conn.executemany(
+                "INSERT INTO job_items (job_id, position, university, stage, updated_at) VALUES (?, ?, ?, 'queued', ?)",
+                [(job_id, i, u.name, now) for i, u in enumerate(universities)],
+            )
+        return self.get(job_id)
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Returns a job with the progress of each of its universities, if it exists."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, status, created_at, started_at, finished_at, error FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            items = self._conn.execute(
+                "SELECT university, stage, pages, documents, error, updated_at FROM job_items "
+                "WHERE job_id = ? ORDER BY position",
+                (job_id,),
+            ).fetchall()
+        job = Job(**dict(zip(("id", "status", "created_at", "started_at", "finished_at", "error"), row)))
+        job.items = [JobItem(**dict(zip(("university", "stage", "pages", "documents", "error", "updated_at"), i)))
+                     for i in items]
+        job.progress = sum(STAGE_PROGRESS[i.stage] for i in job.items) / len(job.items) if job.items else 1.0
+        return job
+
+    def list(self, limit: int = 20) -> List[Job]:
+        """Returns the most recently created jobs, newest first."""
+        with self._lock:
+            ids = [row[0] for row in self._conn.execute(
+                "SELECT id FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)
+            )]
+        return [job for job in map(self.get, ids) if job is not None]
+
+    def universities(self, job_id: str) -> List[UniversitySpec]:
+        """Returns the universities a job was submitted with."""
+        with self._lock:
+            row = self._conn.execute("SELECT universities FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return [UniversitySpec(**u) for u in json.loads(row[0])] if row else []
+
+    def unfinished(self) -> List[str]:
+        """IDs of queued and running jobs, oldest first."""
+        with self._lock:
+            return [row[0] for row in self._conn.execute(
+                "SELECT id FROM jobs WHERE status IN ('queued', 'running') ORDER BY created_at"
+            )]
+
+    def set_status(self, job_id: str, status: JobStatus, error: Optional[str] = None) -> None:
+        """Records a job's status, stamping its start and end times."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, error = ?, "
+                "started_at = CASE WHEN ? = 'running' THEN ? ELSE started_at END, "
+                "finished_at = CASE WHEN ? IN ('succeeded', 'failed') THEN ? ELSE NULL END WHERE id = ?",
+                (status, error, status, now, status, now, job_id),
+            )
+
+    def update_item(self, job_id: str, university: str, stage: ItemStage, **fields: Any) -> None:
+        """
+        Moves one university of a job to ``stage``.
+
+        Args:
+            job_id (str): Job ID.
+            university (str): University name.
+            stage (ItemStage): New stage.
+            **fields: Optional ``pages``, ``documents`` or ``error`` values to record.
+        """
+        columns = {k: v for k, v in fields.items() if k in ("pages", "documents", "error")}
+        assignments = "".join(f", {column} = ?" for column in columns)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"UPDATE job_items SET stage = ?, updated_at = ?{assignments} WHERE job_id = ? AND university = ?",
+                (stage, time.time(), *columns.values(), job_id, university),
+            )
+
+
+class JobStages(BaseModel):
+    """
+    The pipeline's stage implementations, swappable for tests.
+
+    Attributes:
+        crawl (Callable): ``async (UniversitySpec) -> int``: crawls a university into the
+            page store and returns the number of pages stored.
+        clean (Callable): ``(university) -> list``: cleaned documents of a university. Runs
+            in a worker thread.
+        ingest (Callable): ``(universities, documents) -> bool``: ingests a batch of
+            universities into the graph. Runs in a worker thread, one batch at a time.
+    """
+    model_config = {"arbitrary_types_allowed": True}
+
+    crawl: Callable[[UniversitySpec], Awaitable[int]]
+    clean: Callable[[str], List[Any]]
+    ingest: Callable[[List[str], List[Any]], bool]
+
+
+async def crawl_university(spec: UniversitySpec) -> int:
+    """Crawls one university with the production crawler, appending pages to the page store."""
+    from src.ingestion.crawler import CrawlConfig, University, UniversityCrawler
+    from src.ingestion.page_store import PAGE_STORE_DIR
+
+    crawler = UniversityCrawler(CrawlConfig(
+        frontier_db=os.path.join("data", "crawl", "frontier.db"),
+        cache_db=os.path.join("data", "crawl", "cache.db"),
+        page_store=PAGE_STORE_DIR,
+    ))
+    uni = University(**spec.model_dump())
+    await crawler.crawl_universities([uni])
+    return (1 if uni.content else 0) + len(uni.sub_pages)
+
+
+def clean_university(university: str) -> List[Any]:
+    """Reads a university's pages from the page store as boilerplate-free documents."""
+    from src.ingestion.cleaner import BoilerplateCleaner
+    from src.ingestion.graph_builder import iter_documents
+    from src.ingestion.page_store import PAGE_STORE_DIR, PageStore
+
+    store = PageStore(PAGE_STORE_DIR)
+    try:
+        return list(iter_documents(store, BoilerplateCleaner(), [university]))
+    finally:
+        store.close()
+
+
+def ingest_universities(universities: List[str], documents: List[Any]) -> bool:
+    """Incrementally ingests a batch of universities into Neo4j and Qdrant."""
+    from src.ingestion.graph_builder import build_graph
+
+    return build_graph(incremental=True, universities=universities, documents=documents)
+
+
+def default_stages() -> JobStages:
+    """The production stages: Crawl4AI crawl, boilerplate cleaning, graph ingestion."""
+    return JobStages(crawl=crawl_university, clean=clean_university, ingest=ingest_universities)
+
+
+class JobRunner:
+    """
+    Runs submitted jobs one after another in the background. Within a job, universities
+    flow through a crawl → clean → ingest pipeline: ``crawl_workers`` crawls run at once,
+    bounded queues connect the stages, and the single ingest worker takes whatever has
+    been cleaned as one batch, so crawling overlaps ingestion without two ingestion runs
+    ever writing to the graph at the same time.
+    """
+
+    def __init__(
+        self,
+        store: JobStore,
+        stages: Optional[JobStages] = None,
+        crawl_workers: int = JOB_CRAWL_WORKERS,
+        queue_size: int = JOB_QUEUE_SIZE,
+        catalog: Optional[Sequence[UniversitySpec]] = None,
+    ):
+        """
+        Initializes the JobRunner.
+
+        Args:
+            store (JobStore): Persistent job state.
+            stages (Optional[JobStages]): Stage implementations (default: ``default_stages()``).
+            crawl_workers (int): Universities crawled concurrently.
+            queue_size (int): Capacity of the queues between stages.
+            catalog (Optional[Sequence[UniversitySpec]]): Universities rank ranges select from
+                (default: ``load_catalog()``).
+        """
+        self.store = store
+        self.stages = stages or default_stages()
+        self.crawl_workers = max(1, crawl_workers)
+        self.queue_size = max(1, queue_size)
+        self.catalog = list(catalog) if catalog is not None else load_catalog()
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    def submit(self, request: JobRequest) -> Job:
+        """
+        Persists and queues a job.
+
+        Raises:
+            ValueError: If the request selects no university.
+        """
+        job = self.store.create(resolve_universities(request, self.catalog))
+        self._queue.put_nowait(job.id)
+        return job
+
+    async def start(self) -> None:
+        """Starts the background loop, first re-queueing jobs interrupted by a restart."""
+        for job_id in self.store.unfinished():
+            for item in self.store.get(job_id).items:
+                if item.stage not in ("done", "failed"):
+                    self.store.update_item(job_id, item.university, "queued")
+            self.store.set_status(job_id, "queued")
+            self._queue.put_nowait(job_id)
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        """Cancels the background loop; the running job resumes on the next ``start``."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _loop(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self.run(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.store.set_status(job_id, "failed", str(e))
+
+    async def run(self, job_id: str) -> Job:
+        """
+        Runs one job's pipeline to completion. Universities already done (before a
+        restart) are skipped.
+
+        Returns:
+            Job: The finished job.
+        """
+        self.store.set_status(job_id, "running")
+        done = {item.university for item in self.store.get(job_id).items if item.stage in ("done", "failed")}
+        pending = [spec for spec in self.store.universities(job_id) if spec.name not in done]
+
+        crawl_queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        clean_queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+        ingest_queue: asyncio.Queue = asyncio.Queue(self.queue_size)
+
+        def fail(university: str, error: Exception) -> None:
+            self.store.update_item(job_id, university, "failed", error=str(error) or type(error).__name__)
+
+        async def feed() -> None:
+            for spec in pending:
+                await crawl_queue.put(spec)
+            for _ in range(self.crawl_workers):
+                await crawl_queue.put(None)
+
+        async def crawl_worker() -> None:
+            while (spec := await crawl_queue.get()) is not None:
+                self.store.update_item(job_id, spec.name, "crawl")
+                try:
+                    pages = await self.stages.crawl(spec)
+                except Exception as e:
+                    fail(spec.name, e)
+                    continue
+                self.store.update_item(job_id, spec.name, "clean", pages=pages)
+                await clean_queue.put(spec.name)
+
+        async def crawl_stage() -> None:
+            await asyncio.gather(*(crawl_worker() for _ in range(self.crawl_workers)))
+            await clean_queue.put(None)
+
+        async def clean_stage() -> None:
+            while (university := await clean_queue.get()) is not None:
+                try:
+                    documents = await asyncio.to_thread(self.stages.clean, university)
+                    if not documents:
+                        raise RuntimeError("no pages were crawled")
+                except Exception as e:
+                    fail(university, e)
+                    continue
+                self.store.update_item(job_id, university, "ingest", documents=len(documents))
+                await ingest_queue.put((university, documents))
+            await ingest_queue.put(None)
+
+        async def ingest_stage() -> None:
+            finished = False
+            while not finished:
+                batch: List[Tuple[str, List[Any]]] = []
+                item = await ingest_queue.get()
+                while item is not None:
+                    batch.append(item)
+                    if ingest_queue.empty():
+                        break
+                    item = ingest_queue.get_nowait()
+                finished = item is None
+                if not batch:
+                    continue
+                universities = [university for university, _ in batch]
+                documents = [doc for _, docs in batch for doc in docs]
+                try:
+                    ok = await asyncio.to_thread(self.stages.ingest, universities, documents)
+                    error = None if ok else RuntimeError("ingestion failed, see the ingestion log")
+                except Exception as e:
+                    error = e
+                for university in universities:
+                    if error is None:
+                        self.store.update_item(job_id, university, "done")
+                    else:
+                        fail(university, error)
+
+        await asyncio.gather(feed(), crawl_stage(), clean_stage(), ingest_stage())
+
+        job = self.store.get(job_id)
+        failed = [item.university for item in job.items if item.stage == "failed"]
+        if failed:
+            self.store.set_status(job_id, "failed", f"{len(failed)} of {len(job.items)} universities failed: {', '.join(failed)}")
+        else:
+            self.store.set_status(job_id, "succeeded")
+        return self.store.get(job_id)
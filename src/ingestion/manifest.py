@@ -0,0 +1,166 @@
+import hashlib
+import json
+import os
+import time
+from typing import Dict, Iterable, List, Optional, Sequence
+from llama_index.core import Document
+from pydantic import BaseModel
+from src.ingestion.crawl_cache import content_hash
+
+MANIFEST_PATH = os.getenv("INGESTION_MANIFEST", os.path.join("data", "ingestion", "manifest.json"))
+
+
+def document_id(url: str, digest: str) -> str:
+    """
+    Builds a stable document ID from a page URL and its content hash.
+
+    The same page with the same content always maps to the same ID; any edit yields a
+    new ID, so stale graph data can be found by the old one.
+    """
+    return hashlib.sha256(f"{url}\n{digest}".encode("utf-8")).hexdigest()[:32]
+
+
+def with_stable_id(doc: Document, raw: Optional[str] = None) -> Document:
+    """
+    Assigns ``doc`` its stable ID and records the content hash in its metadata.
+
+    Args:
+        doc (Document): Document with a ``url`` in its metadata.
+        raw (Optional[str]): The page as crawled, hashed instead of ``doc.text``. Cleaned
+            text depends on the site's other pages (shared boilerplate), so hashing it
+            would give every page of a site a new ID whenever one page is added or removed.
+    """
+    digest = content_hash(doc.text if raw is None else raw)
+    doc.id_ = document_id(doc.metadata.get("url", ""), digest)
+    doc.metadata["content_hash"] = digest
+    doc.excluded_llm_metadata_keys.append("content_hash")
+    doc.excluded_embed_metadata_keys.append("content_hash")
+    return doc
+
+
+def graph_version(path: str = MANIFEST_PATH) -> str:
+    """
+    Identifies the current state of the ingested graph: changes whenever an ingestion run
+    saves the manifest. Returns "" before the first ingestion.
+    """
+    try:
+        return str(os.stat(path).st_mtime_ns)
+    except FileNotFoundError:
+        return ""
+
+
+class ManifestEntry(BaseModel):
+    """
+    Ingestion record of one page: which document ID currently represents it in the graph.
+    """
+    doc_id: str
+    content_hash: str
+    university: str
+    ingested_at: float
+
+
+class IngestionPlan(BaseModel):
+    """
+    What an incremental run has to do, as computed by ``IngestionManifest.plan``.
+
+    Attributes:
+        to_ingest (List[Document]): New and changed documents to extract and upsert.
+        stale_doc_ids (List[str]): Graph document IDs of changed or vanished pages to delete.
+        new (int): Pages never ingested before.
+        changed (int): Pages whose content hash differs from the manifest.
+        unchanged (int): Pages skipped because their content is already in the graph.
+        removed (List[str]): URLs in the manifest that no longer appear in the corpus.
+    """
+    model_config = {"arbitrary_types_allowed": True}
+
+    to_ingest: List[Document] = []
+    stale_doc_ids: List[str] = []
+    new: int = 0
+    changed: int = 0
+    unchanged: int = 0
+    removed: List[str] = []
+
+
+class IngestionManifest:
+    """
+    JSON manifest mapping each ingested page URL to the document ID stored in Neo4j.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initializes the IngestionManifest, loading it from ``path`` if it exists.
+
+        Args:
+            path (str): Location of the manifest JSON file.
+        """
+        self.path = path
+        self.entries: Dict[str, ManifestEntry] = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                self.entries = {url: ManifestEntry(**e) for url, e in json.load(f).items()}
+
+    def save(self) -> None:
+        """Writes the manifest atomically, so a crash never leaves it half-written."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({url: e.model_dump() for url, e in self.entries.items()}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def plan(
+        self, documents: Iterable[Document], universities: Optional[Sequence[str]] = None, full: bool = False
+    ) -> IngestionPlan:
+        """
+        Diffs the current corpus against the manifest. Only new and changed documents are
+        kept, so ``documents`` can be a generator over a corpus larger than memory.
+
+        Args:
+            documents (Iterable[Document]): Documents with stable IDs (see ``with_stable_id``).
+            universities (Optional[Sequence[str]]): If given, ``documents`` only cover these
+                universities, and only their pages can be found to have vanished.
+            full (bool): Re-ingest every document, unchanged ones included; the graph data of
+                every recorded page is stale, so it is deleted before the upsert.
+
+        Returns:
+            IngestionPlan: Documents to upsert and stale document IDs to delete.
+        """
+        plan = IngestionPlan()
+        seen = set()
+        for doc in documents:
+            url = doc.metadata.get("url", "")
+            if url in seen:
+                continue
+            seen.add(url)
+            entry = self.entries.get(url)
+            if entry is None:
+                plan.new += 1
+                plan.to_ingest.append(doc)
+            elif entry.doc_id != doc.id_:
+                plan.changed += 1
+                plan.to_ingest.append(doc)
+                plan.stale_doc_ids.append(entry.doc_id)
+            else:
+                plan.unchanged += 1
+                if full:
+                    plan.to_ingest.append(doc)
+                    plan.stale_doc_ids.append(entry.doc_id)
+
+        plan.removed = [
+            url for url, entry in self.entries.items()
+            if url not in seen and (universities is None or entry.university in universities)
+        ]
+        plan.stale_doc_ids.extend(self.entries[url].doc_id for url in plan.removed)
+        return plan
+
+    def apply(self, plan: IngestionPlan) -> None:
+        """Records a successfully executed plan."""
+        now = time.time()
+        for url in plan.removed:
+            self.entries.pop(url, None)
+        for doc in plan.to_ingest:
+            self.entries[doc.metadata.get("url", "")] = ManifestEntry(
+                doc_id=doc.id_,
+                content_hash=doc.metadata["content_hash"],
+                university=doc.metadata.get("university", "Unknown"),
+                ingested_at=now,
+            )
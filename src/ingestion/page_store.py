@@ -0,0 +1,281 @@
+import gzip
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Iterable, Iterator, List, Literal, Optional, Sequence, Tuple
+from pydantic import BaseModel
+from src.ingestion.crawl_cache import content_hash
+
+PAGE_STORE_DIR = os.getenv("PAGE_STORE_DIR", os.path.join("data", "pages"))
+# One JSON file per university, as written by earlier crawler versions (and the sample data).
+LEGACY_RAW_DIR = os.path.join("data", "raw")
+
+PageType = Literal["main_page", "sub_page"]
+
+
+class PageRecord(BaseModel):
+    """
+    One crawled page as stored in the page log.
+    """
+    university: str
+    url: str
+    type: PageType
+    content: str
+    content_hash: str
+    fetched_at: float
+
+
+class PageStoreStats(BaseModel):
+    """
+    Size of the page store.
+
+    Attributes:
+        pages (int): Live pages (the latest record of every indexed URL).
+        live_bytes (int): Compressed size of the live records.
+        file_bytes (int): Size of the log, including superseded records until ``compact``.
+    """
+    pages: int = 0
+    live_bytes: int = 0
+    file_bytes: int = 0
+
+
+class PageStore:
+    """
+    Append-only store of crawled pages. Every page version is appended to the page log
+    (``pages.jsonl.gz``, renamed by each ``compact``) as its own gzip member, so the file
+    as a whole is still plain gzipped JSONL, and a SQLite index maps each URL to the
+    offset and length of its latest record and names the current log file.
+
+    Pages are written one at a time and read back lazily, so neither the crawler nor
+    ingestion has to hold the corpus in memory. All index and log access holds one lock:
+    the crawl writes from one thread while the clean stage reads from another.
+    """
+
+    def __init__(self, directory: str = PAGE_STORE_DIR):
+        """
+        Initializes the PageStore, creating ``directory`` if needed.
+
+        Args:
+            directory (str): Directory holding the page log and its ``pages.db`` index.
+        """
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(directory, "pages.db"), check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pages (
+                url TEXT PRIMARY KEY,
+                university TEXT NOT NULL,
+                type TEXT NOT NULL,
+                offset INTEGER NOT NULL,
+                length INTEGER NOT NULL,
+                content_hash TEXT NOT NULL,
+                fetched_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS pages_university ON pages (university)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        self._conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('log', 'pages.jsonl.gz')")
+        self._conn.commit()
+        log_name = self._conn.execute("SELECT value FROM meta WHERE key = 'log'").fetchone()[0]
+        self.log_path = os.path.join(directory, log_name)
+        # Leftovers of an interrupted ``compact``: the index never pointed at the new log,
+        # or it did and the old log was not deleted yet.
+        for name in os.listdir(directory):
+            if name.startswith("pages") and name.endswith(".jsonl.gz") and name != log_name:
+                os.remove(os.path.join(directory, name))
+        self._writer = open(self.log_path, "ab")
+        self._reader = open(self.log_path, "rb")
+
+    def close(self) -> None:
+        """Closes the log and the index."""
+        self._writer.close()
+        self._reader.close()
+        self._conn.close()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def put(
+        self, university: str, url: str, content: str, type: PageType = "sub_page", fetched_at: Optional[float] = None
+    ) -> bool:
+        """
+        Stores a page unless its latest record already has the same content.
+
+        Args:
+            university (str): University the page belongs to.
+            url (str): Page URL; the key of the index.
+            content (str): Page markdown.
+            type (PageType): "main_page" for the university's root page, else "sub_page".
+            fetched_at (Optional[float]): Fetch time (default: now).
+
+        Returns:
+            bool: True if a new record was appended, False if the content was unchanged.
+        """
+        digest = content_hash(content)
+        fetched_at = fetched_at or time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content_hash, university, type FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+            if row is not None and row == (digest, university, type):
+                self._conn.execute("UPDATE pages SET fetched_at = ? WHERE url = ?", (fetched_at, url))
+                self._conn.commit()
+                return False
+            record = PageRecord(
+                university=university, url=url, type=type, content=content,
+                content_hash=digest, fetched_at=fetched_at,
+            )
+            data = gzip.compress((record.model_dump_json() + "\n").encode("utf-8"))
+            # Written before the index points at it: a crash in between only leaves an
+            # unreferenced record in the log, which the next ``compact`` drops.
+            offset = self._writer.seek(0, os.SEEK_END)
+            self._writer.write(data)
+            self._writer.flush()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages (url, university, type, offset, length, content_hash, fetched_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, university, type, offset, len(data), digest, fetched_at),
+            )
+            self._conn.commit()
+            return True
+
+    def retain(self, university: str, urls: Iterable[str], gone: Iterable[str] = (), complete: bool = True) -> int:
+        """
+        Drops the university's pages a re-crawl found gone.
+
+        Args:
+            university (str): University whose pages to prune.
+            urls (Iterable[str]): Pages the crawl fetched.
+            gone (Iterable[str]): Pages the crawl reached and found removed (404/410).
+            complete (bool): Whether the crawl reached everything it could; only then are
+                stored pages outside ``urls`` (no longer linked) dropped as well.
+
+        Returns:
+            int: Number of pages dropped.
+        """
+        keep, removed = set(urls), set(gone)
+        with self._lock:
+            stored = [row[0] for row in self._conn.execute("SELECT url FROM pages WHERE university = ?", (university,))]
+            dropped = [url for url in stored if url in removed or (complete and url not in keep)]
+            self._conn.executemany("DELETE FROM pages WHERE url = ?", [(url,) for url in dropped])
+            self._conn.commit()
+        return len(dropped)
+
+    def get(self, url: str) -> Optional[PageRecord]:
+        """Returns the latest record of ``url``, if stored."""
+        # Look up and read under one lock, so a concurrent ``compact`` cannot move the record.
+        with self._lock:
+            row = self._conn.execute("SELECT offset, length FROM pages WHERE url = ?", (url,)).fetchone()
+            if row is None:
+                return None
+            self._reader.seek(row[0])
+            data = self._reader.read(row[1])
+        return PageRecord.model_validate_json(gzip.decompress(data))
+
+    def universities(self) -> List[str]:
+        """Universities with at least one stored page, sorted."""
+        with self._lock:
+            return [row[0] for row in self._conn.execute("SELECT DISTINCT university FROM pages ORDER BY university")]
+
+    def iter_pages(self, university: Optional[str] = None) -> Iterator[PageRecord]:
+        """
+        Yields the latest record of every page (of one university, if given), grouped by
+        university with the main page first. Records are read from disk one at a time.
+        """
+        query = "SELECT url FROM pages"
+        params: Tuple = ()
+        if university is not None:
+            query += " WHERE university = ?"
+            params = (university,)
+        with self._lock:
+            urls = [row[0] for row in self._conn.execute(query + " ORDER BY university, type, url", params)]
+        for url in urls:
+            record = self.get(url)
+            if record is not None:
+                yield record
+
+    def iter_sites(self, universities: Optional[Sequence[str]] = None) -> Iterator[Tuple[str, List[PageRecord]]]:
+        """
+        Yields ``(university, pages)`` one university at a time, main page first.
+
+        Args:
+            universities (Optional[Sequence[str]]): Only these universities (default: all).
+        """
+        for university in self.universities():
+            if universities is None or university in universities:
+                yield university, list(self.iter_pages(university))
+
+    def stats(self) -> PageStoreStats:
+        """Returns the number of live pages and the log's live and total size."""
+        with self._lock:
+            pages, live = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(length), 0) FROM pages").fetchone()
+            file_bytes = os.path.getsize(self.log_path)
+        return PageStoreStats(pages=pages, live_bytes=live, file_bytes=file_bytes)
+
+    def compact(self) -> int:
+        """
+        Rewrites the log with only the live records, dropping superseded and unreferenced ones.
+        The live records go to a new log file; the index switches to it and its offsets in
+        one transaction, and the old log is deleted only after that commit, so a crash at
+        any point leaves the index consistent with the log it names.
+
+        Returns:
+            int: Bytes reclaimed.
+        """
+        with self._lock:
+            old_path = self.log_path
+            before = os.path.getsize(old_path)
+            rows = self._conn.execute("SELECT url, offset, length FROM pages ORDER BY offset").fetchall()
+            new_name = f"pages.{time.time_ns()}.jsonl.gz"
+            new_path = os.path.join(self.directory, new_name)
+            moved = []
+            with open(new_path, "wb") as out:
+                for url, offset, length in rows:
+                    self._reader.seek(offset)
+                    moved.append((out.tell(), url))
+                    out.write(self._reader.read(length))
+                out.flush()
+                os.fsync(out.fileno())
+            with self._conn:
+                self._conn.executemany("UPDATE pages SET offset = ? WHERE url = ?", moved)
+                self._conn.execute("UPDATE meta SET value = ? WHERE key = 'log'", (new_name,))
+            self._writer.close()
+            self._reader.close()
+            self.log_path = new_path
+            self._writer = open(self.log_path, "ab")
+            self._reader = open(self.log_path, "rb")
+            os.remove(old_path)
+            return before - os.path.getsize(self.log_path)
+
+    def import_json(self, data_dir: str = LEGACY_RAW_DIR) -> int:
+        """
+        Imports one-JSON-file-per-university crawl output (the crawler's former format).
+
+        Args:
+            data_dir (str): Directory of ``<university>.json`` files.
+
+        Returns:
+            int: Number of pages appended.
+        """
+        if not os.path.isdir(data_dir):
+            return 0
+        appended = 0
+        for filename in sorted(os.listdir(data_dir)):
+            if not filename.endswith(".json"):
+                continue
+            path = os.path.join(data_dir, filename)
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            name, fetched_at = data.get("name", "Unknown"), os.path.getmtime(path)
+            if data.get("content"):
+                appended += self.put(name, data.get("url", ""), data["content"], "main_page", fetched_at)
+            for sub in data.get("sub_pages", []):
+                if sub.get("content"):
+                    appended += self.put(name, sub.get("url", ""), sub["content"], "sub_page", fetched_at)
+        return appended
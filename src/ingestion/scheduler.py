@@ -1,31 +1,33 @@
-
 import asyncio
-from typing import List
-from src.ingestion.crawler import UniversityCrawler, University
+from typing import Optional
+from src.ingestion.jobs import JOBS_DB, JobRequest, JobRunner, JobStore
 
-async def main():
+async def main(rank_from: Optional[int] = None, rank_to: Optional[int] = None):
     """
-    Main entry point to schedule and run the university crawler.
+    Main entry point to crawl and ingest a rank range of the university catalog in this
+    process, through the same job pipeline the API runs in the background.
+
+    Args:
+        rank_from (Optional[int]): First catalog rank to crawl.
+        rank_to (Optional[int]): Last catalog rank to crawl.
     """
-    
-    # Target Universities (Top 5 "Vibe Check")
-    target_universities = [
-        University(name="MIT", url="https://www.mit.edu/admissions/", rank=1),
-        University(name="Cambridge", url="https://www.undergraduate.study.cam.ac.uk/", rank=2),
-        University(name="Oxford", url="https://www.ox.ac.uk/admissions", rank=3),
-        University(name="Harvard", url="https://college.harvard.edu/admissions", rank=4),
-        University(name="Stanford", url="https://www.stanford.edu/admission/", rank=5)
-    ]
-    
-    crawler = UniversityCrawler()
-    
-    print(f"Initializing crawl for {len(target_universities)} universities...")
-    
-    # Run sequentially using the batch method
-    results = await crawler.crawl_universities(target_universities)
-    
-    await crawler.save_results(results)
-    print("Crawl session completed.")
+    store = JobStore(JOBS_DB)
+    runner = JobRunner(store)
+    # Defaults to the top five ("Vibe Check").
+    job = runner.submit(JobRequest(rank_from=rank_from or 1, rank_to=rank_to or 5))
+    print(f"Initializing crawl for {len(job.items)} universities (job {job.id})...")
+
+    job = await runner.run(job.id)
+    for item in job.items:
+        print(f"  - {item.university}: {item.stage}, {item.pages} pages, {item.documents} documents"
+              + (f" ({item.error})" if item.error else ""))
+    print(f"Crawl session completed: {job.status}.")
+    store.close()
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    import argparse
+    parser = argparse.ArgumentParser(description="Crawl and ingest universities of the catalog by rank.")
+    parser.add_argument("--rank-from", type=int, default=1)
+    parser.add_argument("--rank-to", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.rank_from, args.rank_to))
@@ -0,0 +1,299 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Literal, Optional
+from pydantic import BaseModel
+from src.ingestion.crawl_cache import content_hash
+
+logger = logging.getLogger(__name__)
+
+SummaryLevel = Literal["university", "community"]
+
+# In-memory GDS projection of the entity graph (relationships treated as undirected for
+# Leiden); dropped again once communities are written to the entities.
+GDS_GRAPH_NAME = "unigraph_entities"
+
+GDS_PROJECT_QUERY = """
+MATCH (a:`__Entity__`)-[r]->(b:`__Entity__`)
+WITH gds.graph.project($name, a, b, {}, {undirectedRelationshipTypes: ['*']}) AS g
+RETURN g.nodeCount AS nodes, g.relationshipCount AS relationships
+"""
+
+GDS_LEIDEN_QUERY = """
+CALL gds.leiden.write($name, {writeProperty: 'community'})
+YIELD communityCount, modularity
+RETURN communityCount, modularity
+"""
+
+GDS_DROP_QUERY = "CALL gds.graph.drop($name, false) YIELD graphName RETURN graphName"
+
+# Per university: chunk count and the triplets extracted from its chunks, most
+# frequently mentioned subjects first.
+UNIVERSITY_CONTEXT_QUERY = """
+MATCH (c:Chunk) WHERE c.university IS NOT NULL
+WITH c.university AS university, collect(c) AS chunks
+CALL (chunks) {
+    UNWIND chunks AS c
+    MATCH (c)-[:MENTIONS]->(a:`__Entity__`)-[r]->(b:`__Entity__`)
+    WHERE r.triplet_source_id = c.id
+    WITH a.name + ' ' + type(r) + ' ' + b.name AS triplet, count(*) AS support
+    ORDER BY support DESC, triplet
+    RETURN collect(triplet)[..$triplet_limit] AS triplets
+}
+RETURN university, size(chunks) AS size, triplets
+ORDER BY university
+"""
+
+# Largest Leiden communities with their internal triplets and the universities whose
+# chunks mention their members.
+COMMUNITY_CONTEXT_QUERY = """
+MATCH (e:`__Entity__`) WHERE e.community IS NOT NULL
+WITH e.community AS community, collect(e) AS members
+WHERE size(members) >= $min_size
+ORDER BY size(members) DESC LIMIT $max_communities
+CALL (community, members) {
+    UNWIND members AS a
+    MATCH (a)-[r]->(b:`__Entity__`) WHERE b.community = community
+    WITH a.name + ' ' + type(r) + ' ' + b.name AS triplet, COUNT { (a)--() } AS degree
+    ORDER BY degree DESC, triplet
+    RETURN collect(DISTINCT triplet)[..$triplet_limit] AS triplets
+}
+CALL (members) {
+    UNWIND members AS a
+    MATCH (c:Chunk)-[:MENTIONS]->(a) WHERE c.university IS NOT NULL
+    RETURN collect(DISTINCT c.university) AS universities
+}
+RETURN community, size(members) AS size, triplets, universities
+"""
+
+SUMMARY_HASHES_QUERY = "MATCH (s:Summary) RETURN s.id AS id, s.source_hash AS source_hash"
+
+SUMMARY_UPSERT_QUERY = """
+UNWIND $data AS row
+MERGE (s:Summary {id: row.id})
+SET s.level = row.level, s.name = row.name, s.text = row.text, s.source_hash = row.source_hash,
+    s.universities = row.universities, s.size = row.size, s.updated_at = datetime()
+WITH s, row
+CALL db.create.setNodeVectorProperty(s, 'embedding', row.embedding)
+RETURN count(*)
+"""
+
+SUMMARY_DELETE_QUERY = "MATCH (s:Summary) WHERE NOT s.id IN $keep DETACH DELETE s"
+
+SUMMARY_PROMPT = """You are summarizing part of a knowledge graph about university admissions.
+{subject}
+Write a concise overview (at most {max_words} words) covering what the facts say about
+programs, requirements, deadlines, fees and other notable points. Use only these facts:
+
+{facts}
+
+Overview:"""
+
+
+class SummaryContext(BaseModel):
+    """
+    Input of one summary: the graph facts about a university or a community.
+
+    Attributes:
+        id (str): Stable summary ID, e.g. "university:Stanford" or "community:<facts hash>".
+        level (SummaryLevel): "university" or "community".
+        name (str): University name, or a label naming the community's main entities.
+        facts (List[str]): Triplets ("A RELATION B") the summary is written from.
+        universities (List[str]): Universities the summary covers.
+        size (int): Chunks (universities) or member entities (communities) covered.
+    """
+    id: str
+    level: SummaryLevel
+    name: str
+    facts: List[str] = []
+    universities: List[str] = []
+    size: int = 0
+
+    @property
+    def source_hash(self) -> str:
+        """Hash of everything the summary text depends on."""
+        return content_hash("\n".join([self.level, self.name, *self.universities, *self.facts]))
+
+
+class SummaryStats(BaseModel):
+    """
+    Outcome of one ``GraphSummarizer.refresh`` run.
+    """
+    communities: int = 0
+    summarized: int = 0
+    unchanged: int = 0
+    deleted: int = 0
+    elapsed: float = 0.0
+
+
+class GraphSummarizer:
+    """
+    Precomputes summaries of the graph for global questions ("Which universities are in
+    the database?", comparisons) that per-chunk retrieval cannot cover with a small top-k.
+
+    One summary is written per university and per Leiden community of the entity graph
+    (computed with the Neo4j GDS plugin). Summaries are stored as ``Summary`` nodes with
+    an embedding; only those whose underlying facts changed are regenerated.
+    """
+
+    def __init__(
+        self,
+        graph_store: Any,
+        llm: Any,
+        embed_model: Any,
+        triplet_limit: int = 60,
+        min_community_size: int = 5,
+        max_communities: int = 50,
+        max_words: int = 200,
+        concurrency: int = 4,
+    ):
+        """
+        Initializes the GraphSummarizer.
+
+        Args:
+            graph_store (Any): Property graph store answering ``structured_query``.
+            llm (Any): LLM writing the summaries (``acomplete``).
+            embed_model (Any): Embedding model used at ingestion and retrieval.
+            triplet_limit (int): Facts given to the LLM per summary.
+            min_community_size (int): Smallest community (in entities) that gets a summary.
+            max_communities (int): Number of largest communities summarized.
+            max_words (int): Requested summary length.
+            concurrency (int): Concurrent LLM calls.
+        """
+        self.graph_store = graph_store
+        self.llm = llm
+        self.embed_model = embed_model
+        self.triplet_limit = triplet_limit
+        self.min_community_size = min_community_size
+        self.max_communities = max_communities
+        self.max_words = max_words
+        self.concurrency = concurrency
+
+    def detect_communities(self) -> int:
+        """
+        Runs Leiden over the entity graph and writes each entity's ``community``.
+
+        Returns:
+            int: Number of communities found, or 0 if GDS is unavailable (community
+                summaries are then skipped).
+        """
+        started = time.perf_counter()
+        try:
+            self.graph_store.structured_query(GDS_DROP_QUERY, param_map={"name": GDS_GRAPH_NAME})
+            projected = self.graph_store.structured_query(GDS_PROJECT_QUERY, param_map={"name": GDS_GRAPH_NAME})
+            if not projected or not projected[0]["relationships"]:
+                return 0
+            result = self.graph_store.structured_query(GDS_LEIDEN_QUERY, param_map={"name": GDS_GRAPH_NAME})
+        except Exception as e:
+            logger.warning(f"Community detection skipped (GDS unavailable?): {e}")
+            return 0
+        finally:
+            try:
+                self.graph_store.structured_query(GDS_DROP_QUERY, param_map={"name": GDS_GRAPH_NAME})
+            except Exception:
+                pass
+        count = result[0]["communityCount"]
+        logger.info(
+            f"Leiden: {count} communities over {projected[0]['nodes']} entities "
+            f"(modularity {result[0]['modularity']:.3f}) in {time.perf_counter() - started:.2f}s"
+        )
+        return count
+
+    def contexts(self, with_communities: bool = True) -> List[SummaryContext]:
+        """Collects the facts each university and community summary is written from."""
+        contexts = [
+            SummaryContext(
+                id=f"university:{row['university']}",
+                level="university",
+                name=row["university"],
+                facts=row["triplets"] or [],
+                universities=[row["university"]],
+                size=row["size"],
+            )
+            for row in self.graph_store.structured_query(
+                UNIVERSITY_CONTEXT_QUERY, param_map={"triplet_limit": self.triplet_limit}
+            ) or []
+        ]
+        if not with_communities:
+            return contexts
+        for row in self.graph_store.structured_query(COMMUNITY_CONTEXT_QUERY, param_map={
+            "min_size": self.min_community_size,
+            "max_communities": self.max_communities,
+            "triplet_limit": self.triplet_limit,
+        }) or []:
+            if not row["triplets"]:
+                continue
+            subjects = list(dict.fromkeys(fact.split(" ", 1)[0] for fact in row["triplets"]))
+            # Leiden numbers communities arbitrarily on every run, so they are identified
+            # by their facts: an unchanged community keeps its summary.
+            contexts.append(SummaryContext(
+                id=f"community:{content_hash(' | '.join(row['triplets']))[:16]}",
+                level="community",
+                name=", ".join(subjects[:3]),
+                facts=row["triplets"],
+                universities=sorted(row["universities"] or []),
+                size=row["size"],
+            ))
+        return contexts
+
+    def _prompt(self, context: SummaryContext) -> str:
+        if context.level == "university":
+            subject = f"Summarize what is known about {context.name}."
+        else:
+            subject = (f"Summarize a cluster of related entities ({context.name}) mentioned by: "
+                       f"{', '.join(context.universities) or 'unknown universities'}.")
+        facts = "\n".join(f"- {fact}" for fact in context.facts) or "- (no extracted facts)"
+        return SUMMARY_PROMPT.format(subject=subject, max_words=self.max_words, facts=facts)
+
+    async def _summarize(self, contexts: List[SummaryContext]) -> List[str]:
+        semaphore = asyncio.Semaphore(max(1, self.concurrency))
+
+        async def run(context: SummaryContext) -> str:
+            async with semaphore:
+                response = await self.llm.acomplete(self._prompt(context))
+                return response.text.strip()
+
+        return await asyncio.gather(*(run(context) for context in contexts))
+
+    def refresh(self) -> SummaryStats:
+        """
+        Recomputes communities and regenerates the summaries whose facts changed; summaries
+        of universities or communities that no longer exist are deleted.
+
+        Returns:
+            SummaryStats: Counts and timing of the run.
+        """
+        started = time.perf_counter()
+        stats = SummaryStats(communities=self.detect_communities())
+        contexts = self.contexts(with_communities=stats.communities > 0)
+        existing: Dict[str, Optional[str]] = {
+            row["id"]: row["source_hash"]
+            for row in self.graph_store.structured_query(SUMMARY_HASHES_QUERY) or []
+        }
+        todo = [c for c in contexts if existing.get(c.id) != c.source_hash]
+        stats.unchanged = len(contexts) - len(todo)
+
+        if todo:
+            texts = asyncio.run(self._summarize(todo))
+            embeddings = self.embed_model.get_text_embedding_batch(texts)
+            self.graph_store.structured_query(SUMMARY_UPSERT_QUERY, param_map={"data": [
+                {
+                    "id": context.id,
+                    "level": context.level,
+                    "name": context.name,
+                    "text": text,
+                    "source_hash": context.source_hash,
+                    "universities": context.universities,
+                    "size": context.size,
+                    "embedding": embedding,
+                }
+                for context, text, embedding in zip(todo, texts, embeddings)
+            ]})
+        stats.summarized = len(todo)
+
+        keep = [c.id for c in contexts]
+        stats.deleted = len(set(existing) - set(keep))
+        if stats.deleted:
+            self.graph_store.structured_query(SUMMARY_DELETE_QUERY, param_map={"keep": keep})
+        stats.elapsed = time.perf_counter() - started
+        return stats
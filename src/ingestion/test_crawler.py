@@ -0,0 +1,202 @@
+import sys
+import os
+import asyncio
+import hashlib
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+# Ensure the src directory is in the python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.ingestion.crawler import CrawlConfig, University, UniversityCrawler
+from src.ingestion.page_store import PageStore
+
+# Path -> (markdown body, artificial latency in seconds)
+SITE = {
+    "/": ("# Home\n[Admissions](/admissions) [Tuition](/tuition) [News](/news) [Slow fees](/fees-slow)", 0.0),
+    "/admissions": ("# Admissions\nApply by January 1.", 0.2),
+    "/tuition": ("# Tuition\nTuition is $60,000.", 0.2),
+    "/fees-slow": ("# Fees\nNever answers in time.", 2.5),
+    "/news": ("# News", 0.0),
+}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    hits = {}
+    site = SITE
+    content_type = "text/markdown"
+
+    def do_GET(self):
+        path = self.path.split("?")[0]
+        _Handler.hits[path] = _Handler.hits.get(path, 0) + 1
+        if path not in _Handler.site:
+            self.send_error(404)
+            return
+        body, latency = _Handler.site[path]
+        etag = '"%s"' % hashlib.md5(body.encode("utf-8")).hexdigest()
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        time.sleep(latency)
+        self.send_response(200)
+        self.send_header("Content-Type", _Handler.content_type)
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body.encode("utf-8"))
+
+    def log_message(self, *args):
+        pass
+
+
+class LocalHTTPCrawler:
+    """Minimal stand-in for AsyncWebCrawler that serves markdown over plain HTTP."""
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def arun(self, url: str, config=None):
+        if url.startswith("raw:"):
+            # Like crawl4ai, converts the given document without a request.
+            return SimpleNamespace(success=True, markdown=url[len("raw:"):], links={},
+                                   status_code=200, error_message="")
+
+        def fetch():
+            try:
+                with urllib.request.urlopen(url, timeout=10) as r:
+                    return SimpleNamespace(success=True, markdown=r.read().decode(), links={},
+                                           status_code=r.status, error_message="",
+                                           response_headers=dict(r.headers))
+            except urllib.error.HTTPError as e:
+                return SimpleNamespace(success=False, markdown="", links={},
+                                       status_code=e.code, error_message=str(e))
+        return await asyncio.to_thread(fetch)
+
+
+def _serve():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def test_concurrent_crawl():
+    server = _serve()
+    _Handler.hits = {}
+    hosts = ["127.0.0.1", "localhost"]  # two "domains" on the same stand-in server
+    universities = [
+        University(name=f"Uni {host}", url=f"http://{host}:{server.server_port}/", rank=i)
+        for i, host in enumerate(hosts, 1)
+    ]
+    config = CrawlConfig(max_concurrency=4, per_domain_concurrency=2, per_domain_delay=0.0,
+                         page_timeout=1.0, max_retries=1, retry_backoff=0.0)
+    crawler = UniversityCrawler(config, crawler_factory=LocalHTTPCrawler)
+
+    try:
+        results = asyncio.run(crawler.crawl_universities(universities))
+    finally:
+        server.shutdown()
+
+    for uni in results:
+        assert uni.content.startswith("# Home")
+        # The slow page times out on every attempt; the rest still land.
+        assert sorted(p.url.rsplit("/", 1)[-1] for p in uni.sub_pages) == ["admissions", "tuition"]
+
+    assert crawler.stats.pages_fetched == 6
+    assert crawler.stats.pages_failed == 2
+    assert crawler.stats.retries == 2
+    assert _Handler.hits["/fees-slow"] == 4
+    # Timeout (1s) + retry (1s) dominates; a serial crawl would need well over 4s.
+    assert crawler.stats.elapsed < 3.5
+    assert crawler.stats.pages_per_sec > 6 / 3.5
+
+
+def test_domain_delay_spaces_requests():
+    server = _serve()
+    url = f"http://127.0.0.1:{server.server_port}/news"
+    crawler = UniversityCrawler(CrawlConfig(per_domain_concurrency=4, per_domain_delay=0.2),
+                                crawler_factory=LocalHTTPCrawler)
+
+    async def run():
+        crawler._global_limit = asyncio.Semaphore(8)
+        async with LocalHTTPCrawler() as session:
+            started = time.perf_counter()
+            await asyncio.gather(*(crawler._fetch(session, url) for _ in range(4)))
+            return time.perf_counter() - started
+
+    try:
+        elapsed = asyncio.run(run())
+    finally:
+        server.shutdown()
+
+    # Four request starts on one domain need at least three 0.2s gaps.
+    assert elapsed >= 0.6
+
+
+def test_recrawl_skips_unchanged_pages():
+    site = {
+        "/": ("# Home\n[Admissions](/admissions) [Tuition](/tuition)", 0.0),
+        "/admissions": ("# Admissions\nApply by January 1.", 0.0),
+        "/tuition": ("# Tuition\nTuition is $60,000.", 0.0),
+    }
+    server = _serve()
+    _Handler.site = site
+
+    with tempfile.TemporaryDirectory() as tmp:
+        config = CrawlConfig(per_domain_delay=0.0, cache_db=os.path.join(tmp, "cache.db"))
+        crawler = UniversityCrawler(config, crawler_factory=LocalHTTPCrawler)
+        out_dir = os.path.join(tmp, "pages")
+
+        def crawl():
+            uni = University(name="Local U", url=f"http://127.0.0.1:{server.server_port}/", rank=1)
+            asyncio.run(crawler.crawl_universities([uni]))
+            asyncio.run(crawler.save_results([uni], out_dir))
+            return uni
+
+        try:
+            first = crawl()
+            assert first.content_status == "new"
+            assert {p.status for p in first.sub_pages} == {"new"}
+            store = PageStore(out_dir)
+            assert len(store) == 3
+            saved_size = store.stats().file_bytes
+            store.close()
+
+            second = crawl()
+            assert crawler.stats.not_modified == 3 and crawler.stats.pages_fetched == 0
+            assert second.content_status == "unchanged"
+            assert second.sub_pages[0].content.startswith("#")
+            store = PageStore(out_dir)
+            assert store.stats().file_bytes == saved_size
+            store.close()
+
+            site["/tuition"] = ("# Tuition\nTuition is $62,000.", 0.0)
+            third = crawl()
+            statuses = {p.url.rsplit("/", 1)[-1]: p.status for p in third.sub_pages}
+            assert statuses == {"admissions": "unchanged", "tuition": "changed"}
+            assert crawler.stats.pages_fetched == 1
+
+            # A changed HTML page is converted from the probe's body, not downloaded again.
+            _Handler.content_type = "text/html"
+            site["/tuition"] = ("# Tuition\nTuition is $64,000.", 0.0)
+            hits = _Handler.hits.get("/tuition", 0)
+            fourth = crawl()
+            assert {p.url.rsplit("/", 1)[-1]: p.content for p in fourth.sub_pages}["tuition"].endswith("$64,000.")
+            assert crawler.stats.pages_fetched == 1 and _Handler.hits["/tuition"] == hits + 1
+        finally:
+            _Handler.site = SITE
+            _Handler.content_type = "text/markdown"
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    test_concurrent_crawl()
+    test_domain_delay_spaces_requests()
+    test_recrawl_skips_unchanged_pages()
@@ -0,0 +1,113 @@
+import sys
+import os
+import asyncio
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+# Ensure the src directory is in the python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from src.ingestion.embedding import CachedEmbedding, VectorCache
+
+
+class CountingEmbedding(BaseEmbedding):
+    """Fake embedding model whose vectors depend on the text length."""
+
+    calls: int = 0
+    embedded: int = 0
+
+    def _vector(self, text: str) -> List[float]:
+        return [float(len(text)), 1.0, 0.5]
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        self.calls += 1
+        self.embedded += len(texts)
+        return [self._vector(t) for t in texts]
+
+    def _get_text_embedding(self, text: str) -> List[float]:
+        return self._get_text_embeddings([text])[0]
+
+    def _get_query_embedding(self, query: str) -> List[float]:
+        return self._vector(query)
+
+    async def _aget_query_embedding(self, query: str) -> List[float]:
+        return self._vector(query)
+
+
+def test_vectors_are_cached_across_runs():
+    texts = ["Oxford", "Tuition fees are £30,000.", "Oxford", "Deadline: 15 October"]
+    with tempfile.TemporaryDirectory() as tmp:
+        inner = CountingEmbedding(model_name="fake", embed_batch_size=2)
+        embed = CachedEmbedding(inner, VectorCache(tmp))
+        vectors = embed.get_text_embedding_batch(texts)
+        assert vectors[0] == vectors[2] == [6.0, 1.0, 0.5]
+        # Only distinct misses reach the model.
+        assert inner.embedded == 3 and embed.stats.misses == 3
+        embed.cache.close()
+
+        # A fresh process reopens the memory-mapped file and embeds only the new text.
+        embed = CachedEmbedding(inner, VectorCache(tmp))
+        again = asyncio.run(embed.aget_text_embedding_batch(texts + ["Cambridge"]))
+        assert again[:4] == vectors
+        assert inner.embedded == 4 and embed.stats.hits == 4
+        assert len(embed.cache) == 4
+        embed.cache.close()
+
+        # Vectors are namespaced by model.
+        other = CachedEmbedding(CountingEmbedding(model_name="other"), VectorCache(tmp))
+        other.get_text_embedding("Oxford")
+        assert other.stats.misses == 1
+        other.cache.close()
+
+
+def test_dimension_mismatch():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = VectorCache(tmp)
+        cache.put_many(["a"], [[1.0, 2.0]])
+        try:
+            cache.put_many(["b"], [[1.0, 2.0, 3.0]])
+            assert False, "a 3-d vector should not fit a 2-d cache"
+        except ValueError:
+            pass
+        assert list(cache.get_many(["a", "b"])) == ["a"]
+        cache.close()
+
+
+def test_interrupted_write_keeps_rows_aligned():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = VectorCache(tmp)
+        cache.put_many(["a"], [[1.0, 2.0]])
+        # A crash mid-append leaves half a row behind.
+        with open(os.path.join(tmp, "vectors.f32"), "ab") as f:
+            f.write(b"\x00" * 6)
+        cache.put_many(["b"], [[3.0, 4.0]])
+        found = cache.get_many(["a", "b"])
+        assert found["a"].tolist() == [1.0, 2.0] and found["b"].tolist() == [3.0, 4.0]
+        cache.close()
+
+
+def test_concurrent_reads_and_writes():
+    # aget_text_embedding_batch runs its batches concurrently, each in a worker thread.
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = VectorCache(tmp)
+
+        def work(i):
+            keys = [f"{i}-{j}" for j in range(5)]
+            cache.put_many(keys, [[float(i), float(j)] for j in range(5)])
+            return cache.get_many(keys + [f"{i - 1}-0"])
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(work, range(100)))
+        found = cache.get_many([f"{i}-{j}" for i in range(100) for j in range(5)])
+        assert len(found) == len(cache) == 500 and cache.rows == 500
+        assert all(found[f"{i}-{j}"].tolist() == [float(i), float(j)] for i in range(100) for j in range(5))
+        cache.close()
+
+
+if __name__ == "__main__":
+    test_vectors_are_cached_across_runs()
+    test_dimension_mismatch()
+    test_interrupted_write_keeps_rows_aligned()
+    test_concurrent_reads_and_writes()
@@ -0,0 +1,82 @@
+import sys
+import os
+import asyncio
+import tempfile
+from typing import Any
+
+# Ensure the src directory is in the python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from llama_index.core.graph_stores.types import KG_NODES_KEY, KG_RELATIONS_KEY
+from llama_index.core.indices.property_graph import SimpleLLMPathExtractor
+from llama_index.core.llms import CompletionResponse, CustomLLM, LLMMetadata
+from llama_index.core.llms.callbacks import llm_completion_callback
+from llama_index.core.schema import TextNode
+from src.ingestion.extraction_cache import CachedExtractor, ExtractionCache
+
+
+class CountingLLM(CustomLLM):
+    """Fake LLM that answers every extraction prompt with one fixed triplet."""
+
+    calls: int = 0
+    model: str = "fake-extractor"
+
+    @property
+    def metadata(self) -> LLMMetadata:
+        return LLMMetadata(model_name=self.model)
+
+    @llm_completion_callback()
+    def complete(self, prompt: str, formatted: bool = False, **kwargs: Any) -> CompletionResponse:
+        self.calls += 1
+        return CompletionResponse(text="(Oxford, offers, PPE)")
+
+    @llm_completion_callback()
+    def stream_complete(self, prompt: str, formatted: bool = False, **kwargs: Any):
+        yield self.complete(prompt)
+
+
+def _nodes():
+    return [
+        TextNode(text="Oxford offers PPE.", metadata={"url": "https://ox.ac.uk/ppe", "university": "Oxford"}),
+        TextNode(text="Oxford offers PPE.", metadata={"url": "https://ox.ac.uk/courses", "university": "Oxford"}),
+        TextNode(text="Deadline is 15 October.", metadata={"url": "https://ox.ac.uk/dates", "university": "Oxford"}),
+    ]
+
+
+def test_cached_extraction():
+    llm = CountingLLM()
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = ExtractionCache(os.path.join(tmp, "cache.db"))
+        extractor = CachedExtractor(extractor=SimpleLLMPathExtractor(llm=llm), cache=cache)
+
+        first = asyncio.run(extractor.acall(_nodes()))
+        # Three chunks, two distinct texts -> the duplicate is still a miss within one batch.
+        assert llm.calls == 3
+        assert [r.label.lower() for r in first[0].metadata[KG_RELATIONS_KEY]] == ["offers"]
+
+        second = extractor(_nodes())
+        assert llm.calls == 3
+        assert cache.stats().hits == 3
+        # Cached entities take their source properties from the chunk they now appear on.
+        assert {n.properties["url"] for n in second[1].metadata[KG_NODES_KEY]} == {"https://ox.ac.uk/courses"}
+        assert {n.name.lower() for n in second[1].metadata[KG_NODES_KEY]} == {"oxford", "ppe"}
+
+        # A different model means a different fingerprint.
+        llm.model = "other-model"
+        extractor(_nodes()[:1])
+        assert llm.calls == 4
+        cache.close()
+
+
+def test_size_based_eviction():
+    cache = ExtractionCache(max_bytes=100)
+    for i in range(5):
+        cache.put(f"k{i}", {"nodes": [], "relations": [], "pad": "x" * 20})
+    stats = cache.stats()
+    assert stats.size_bytes <= 100 and stats.evictions > 0
+    assert cache.get("k4") is not None and cache.get("k0") is None
+
+
+if __name__ == "__main__":
+    test_cached_extraction()
+    test_size_based_eviction()
@@ -0,0 +1,83 @@
+import sys
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Ensure the src directory is in the python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.ingestion.facts import FactExtractor, FactQuery, FactStore, parse_date, parse_money
+
+PAGE = """
+# Graduate admissions
+
+## MSc Computer Science
+The application deadline is 15 January 2026. Tuition: £39,000 per year.
+Applicants need IELTS 7.0 overall or TOEFL iBT 100.
+
+## MBA
+Apply by 1 December. Tuition fees are £71k.
+
+## Financial aid
+Tuition is covered for families with incomes under £100,000.
+Application fee: £75.
+"""
+
+
+def test_parsers():
+    assert parse_date("due by March 1") == (None, 3, 1)
+    assert parse_date("closes 2025-10-15") == (2025, 10, 15)
+    assert parse_date("on the 31st of February") is None
+    assert parse_money("tuition $62,484 a year") == (62484.0, "USD")
+    assert parse_money("about 30k GBP") == (30000.0, "GBP")
+    assert parse_money("a $7 million fund") is None
+
+
+def test_extract_and_query():
+    records = FactExtractor().extract("Oxford", "https://ox.ac.uk/grad", PAGE)
+    msc, mba = records
+    assert (msc.program, msc.deadline, msc.fee_amount, msc.fee_currency, msc.fee_period) == (
+        "MSc Computer Science", "2026-01-15", 39000.0, "GBP", "year")
+    assert (msc.ielts_min, msc.toefl_min) == (7.0, 100)
+    # Year-less deadline; the aid threshold and application fee are not tuition.
+    assert (mba.deadline, mba.deadline_month, mba.deadline_day, mba.fee_amount) == (None, 12, 1, 71000.0)
+
+    store = FactStore()
+    store.replace(["Oxford"], records)
+    store.replace(["Cambridge"], FactExtractor().extract("Cambridge", "https://cam.ac.uk", "Tuition: £25,000. Apply by 15 October."))
+    assert store.universities() == ["Cambridge", "Oxford"]
+
+    cheap = store.query(FactQuery(field="fee", op="<", value=40000, currency="GBP"))
+    assert [(r.university, r.fee_amount) for r in cheap.records] == [("Cambridge", 25000.0), ("Oxford", 39000.0)]
+    # "Before 1 January" within the admissions cycle: October and December deadlines.
+    early = store.query(FactQuery(field="deadline", op="<", value=5 * 31 + 1))
+    assert [r.deadline_month for r in early.records] == [10, 12]
+    assert store.query(FactQuery(field="fee", aggregate="count")).values == {"": 2}
+
+    store.replace(["Oxford"], [])
+    assert store.universities() == ["Cambridge"]
+
+
+def test_concurrent_queries():
+    # The API queries the store from worker threads while ingestion replaces rows.
+    store = FactStore()
+    records = FactExtractor().extract("Oxford", "https://ox.ac.uk/grad", PAGE)
+    store.replace(["Oxford"], records)
+    expected = store.query(FactQuery(field="fee", aggregate="max")).records
+
+    def work(i):
+        if i % 4 == 0:
+            store.replace(["Oxford"], records)
+            return None
+        return store.query(FactQuery(field="fee", aggregate="max")).records
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(work, range(200)))
+    # Each replace is one transaction: readers see the old rows or the new ones, never an error.
+    assert all(r is None or r == expected for r in results)
+    assert store.universities() == ["Oxford"]
+
+
+if __name__ == "__main__":
+    test_parsers()
+    test_extract_and_query()
+    test_concurrent_queries()
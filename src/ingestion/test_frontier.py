@@ -0,0 +1,95 @@
+import sys
+import os
+import asyncio
+import tempfile
+from types import SimpleNamespace
+
+# Ensure the src directory is in the python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.ingestion.crawler import CrawlConfig, University, UniversityCrawler
+from src.ingestion.frontier import Frontier, FrontierEntry, VisitedIndex, canonicalize_url
+
+KEYWORDS = ["admission", "tuition", "fee"]
+
+
+def test_canonicalize_url():
+    base = "https://www.ox.ac.uk/admissions"
+    variants = [
+        "https://www.ox.ac.uk/admissions#main-content",
+        "https://WWW.ox.ac.uk:443/admissions/",
+        "https://www.ox.ac.uk//admissions?source=webteaser",
+        "/admissions",
+        '/admissions "Admissions"',
+    ]
+    assert {canonicalize_url(v, base) for v in variants} == {"https://www.ox.ac.uk/admissions"}
+    assert canonicalize_url("https://www.ox.ac.uk/") == "https://www.ox.ac.uk/"
+    assert canonicalize_url("mailto:admissions@ox.ac.uk") is None
+
+
+def test_frontier_priority_budget_and_site():
+    frontier = Frontier(VisitedIndex(), "Oxford", "https://www.ox.ac.uk/", KEYWORDS,
+                        max_depth=1, max_pages=3)
+    frontier.add("https://www.ox.ac.uk/", 0, force=True)
+    assert frontier.pop_batch(10)[0].url == "https://www.ox.ac.uk/"
+
+    links = ["/news-admission", "/admissions/tuition-fees", "/admissions/tuition-fees#x",
+             "https://www.linkedin.com/shareArticle?admission", "https://graduate.ox.ac.uk/admission",
+             "/about", "/admissions/deep"]
+    assert [frontier.add(l, 1) for l in links] == [True, True, False, False, True, False, True]
+    assert not frontier.add("/admissions/too-deep", 2)
+
+    batch = frontier.pop_batch(10)
+    # Budget of 3 pages leaves room for two more, highest keyword score first.
+    assert [e.url for e in batch][0] == "https://www.ox.ac.uk/admissions/tuition-fees"
+    assert len(batch) == 2
+
+
+class _StubCrawler:
+    fetched = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def arun(self, url: str):
+        _StubCrawler.fetched.append(url)
+        return SimpleNamespace(success=True, markdown=f"# {url}", links={}, error_message="")
+
+
+def test_crawl_resumes_from_visited_index():
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, "frontier.db")
+        # State left behind by a crawl that died after the main page and one sub-page.
+        index = VisitedIndex(db)
+        for url, depth, status in [("https://mit.edu/admissions", 0, "done"),
+                                   ("https://mit.edu/admissions/tuition", 1, "done"),
+                                   ("https://mit.edu/admissions/apply", 1, "queued")]:
+            index.add("MIT", FrontierEntry(url=url, depth=depth, score=1))
+            if status == "done":
+                index.mark("MIT", url, "done", f"stored {url}")
+        index.close()
+
+        config = CrawlConfig(per_domain_delay=0.0, frontier_db=db)
+        crawler = UniversityCrawler(config, crawler_factory=_StubCrawler)
+        uni = University(name="MIT", url="https://mit.edu/admissions/", rank=1)
+        _StubCrawler.fetched = []
+        asyncio.run(crawler.crawl_universities([uni]))
+
+        assert _StubCrawler.fetched == ["https://mit.edu/admissions/apply"]
+        assert uni.content == "stored https://mit.edu/admissions"
+        assert [p.url for p in uni.sub_pages] == ["https://mit.edu/admissions/tuition",
+                                                   "https://mit.edu/admissions/apply"]
+
+        # The pass completed, so the next crawl starts over from the root page.
+        _StubCrawler.fetched = []
+        asyncio.run(crawler.crawl_universities([University(name="MIT", url="https://mit.edu/admissions/", rank=1)]))
+        assert _StubCrawler.fetched == ["https://mit.edu/admissions"]
+
+
+if __name__ == "__main__":
+    test_canonicalize_url()
+    test_frontier_priority_budget_and_site()
+    test_crawl_resumes_from_visited_index()
@@ -0,0 +1,94 @@
+import sys
+import os
+import neo4j
+
+# Ensure the src directory is in the python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from llama_index.core.graph_stores.types import ChunkNode, EntityNode, Relation
+from llama_index.graph_stores.neo4j import Neo4jPropertyGraphStore
+from src.ingestion.graph_builder import SCHEMA_STATEMENTS, BulkNeo4jPropertyGraphStore, bootstrap_schema
+
+
+class FakeDriver:
+    """Records auto-commit queries and the batches each write transaction runs."""
+
+    def __init__(self):
+        self.queries = []
+        self.transactions = []
+
+    def execute_query(self, query, parameters_=None, database_=None, **kwargs):
+        self.queries.append(query.text)
+        return [], None, None
+
+    def session(self, database=None):
+        return FakeSession(self)
+
+
+class FakeSession:
+    def __init__(self, driver):
+        self.driver = driver
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def execute_write(self, work):
+        transaction = FakeTransaction()
+        work(transaction)
+        self.driver.transactions.append(transaction.batches)
+
+
+class FakeTransaction:
+    def __init__(self):
+        self.batches = []
+
+    def run(self, query, data):
+        self.batches.append((query, len(data)))
+        return self
+
+    def consume(self):
+        pass
+
+
+def _store(monkeypatch, batch_size):
+    driver = FakeDriver()
+    monkeypatch.setattr(neo4j.GraphDatabase, "driver", lambda *args, **kwargs: driver)
+    monkeypatch.setattr(neo4j.AsyncGraphDatabase, "driver", lambda *args, **kwargs: driver)
+    monkeypatch.setattr(Neo4jPropertyGraphStore, "verify_version", lambda self: None)
+    store = BulkNeo4jPropertyGraphStore("neo4j", "password", "bolt://fake", refresh_schema=False,
+                                        create_indexes=False, batch_size=batch_size)
+    return store, driver
+
+
+def test_upserts_run_in_batches(monkeypatch):
+    store, driver = _store(monkeypatch, batch_size=3)
+    chunks = [ChunkNode(text=f"Chunk {i}", id_=f"c{i}") for i in range(4)]
+    entities = [EntityNode(name=f"Entity {i}", label="PROGRAM", properties={"triplet_source_id": "c0"}) for i in range(5)]
+    store.upsert_nodes(chunks + entities)
+    store.upsert_relations([Relation(label="OFFERS", source_id="c0", target_id=e.id) for e in entities[:4]])
+
+    # One write transaction per query, running the library's UNWIND queries batch_size rows at a time.
+    sizes = [[size for _, size in transaction] for transaction in driver.transactions]
+    assert sizes == [[3, 1], [3, 2], [3, 1]]
+    queries = [transaction[0][0] for transaction in driver.transactions]
+    assert "c:Chunk" in queries[0] and "MENTIONS" in queries[1] and "apoc.merge.relationship" in queries[2]
+    assert driver.queries == []
+
+    # Outside an upsert, queries with a data parameter still run directly.
+    store.structured_query("UNWIND $data AS row RETURN row", param_map={"data": [1]})
+    assert driver.queries == ["UNWIND $data AS row RETURN row"]
+
+
+def test_bootstrap_schema(monkeypatch):
+    store, driver = _store(monkeypatch, batch_size=3)
+    bootstrap_schema(store)
+    assert driver.queries == SCHEMA_STATEMENTS
+
+
+if __name__ == "__main__":
+    import pytest
+
+    pytest.main([__file__])
@@ -0,0 +1,105 @@
+import sys
+import os
+import asyncio
+import tempfile
+import threading
+
+# Ensure the src directory is in the python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.ingestion.jobs import (
+    DEFAULT_CATALOG, JobRequest, JobRunner, JobStages, JobStore, UniversitySpec, resolve_universities,
+)
+
+
+class FakePipeline:
+    """Records what each stage saw; crawling ``fail`` raises."""
+
+    def __init__(self, fail=(), crawl_delay=0.05):
+        self.fail = set(fail)
+        self.crawl_delay = crawl_delay
+        self.crawled = []
+        self.batches = []
+        self.lock = threading.Lock()
+
+    async def crawl(self, spec):
+        await asyncio.sleep(self.crawl_delay)
+        if spec.name in self.fail:
+            raise RuntimeError("site unreachable")
+        self.crawled.append(spec.name)
+        return 3
+
+    def clean(self, university):
+        return [f"{university} page {i}" for i in range(2)]
+
+    def ingest(self, universities, documents):
+        with self.lock:
+            self.batches.append(list(universities))
+        return True
+
+    def stages(self):
+        return JobStages(crawl=self.crawl, clean=self.clean, ingest=self.ingest)
+
+
+def test_resolve_rank_range():
+    extra = UniversitySpec(name="ETH Zurich", url="https://ethz.ch", rank=7)
+    names = [u.name for u in resolve_universities(JobRequest(universities=[extra], rank_from=2, rank_to=3), DEFAULT_CATALOG)]
+    assert names == ["ETH Zurich", "Cambridge", "Oxford"]
+    assert len(resolve_universities(JobRequest(rank_to=5), DEFAULT_CATALOG)) == 5
+    try:
+        resolve_universities(JobRequest(rank_from=50, rank_to=60), DEFAULT_CATALOG)
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+
+
+def test_pipeline_runs_stages_and_records_progress():
+    pipeline = FakePipeline(fail={"Oxford"})
+    store = JobStore()
+    runner = JobRunner(store, pipeline.stages(), crawl_workers=2, queue_size=1)
+    job = runner.submit(JobRequest(rank_to=5))
+    assert job.status == "queued" and job.progress == 0.0
+
+    job = asyncio.run(runner.run(job.id))
+    assert job.status == "failed" and "Oxford" in job.error
+    stages = {item.university: (item.stage, item.pages, item.documents) for item in job.items}
+    assert stages["Oxford"][0] == "failed"
+    assert all(stage == ("done", 3, 2) for name, stage in stages.items() if name != "Oxford")
+    assert job.progress == 1.0
+    # Every crawled university was ingested exactly once, in as many batches as were ready.
+    assert sorted(u for batch in pipeline.batches for u in batch) == sorted(pipeline.crawled)
+
+
+def test_jobs_resume_after_restart():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "jobs.db")
+        store = JobStore(path)
+        job = JobRunner(store, FakePipeline().stages()).submit(JobRequest(rank_to=3))
+        # Simulate a crash while the job was running, after MIT was done.
+        store.set_status(job.id, "running")
+        store.update_item(job.id, "MIT", "done", pages=3, documents=2)
+        store.update_item(job.id, "Cambridge", "ingest")
+        store.close()
+
+        pipeline = FakePipeline()
+        store = JobStore(path)
+        runner = JobRunner(store, pipeline.stages())
+
+        async def restart():
+            await runner.start()
+            for _ in range(100):
+                if store.get(job.id).status == "succeeded":
+                    break
+                await asyncio.sleep(0.02)
+            await runner.stop()
+
+        asyncio.run(restart())
+        assert store.get(job.id).status == "succeeded"
+        assert sorted(pipeline.crawled) == ["Cambridge", "Oxford"]
+        store.close()
+
+
+if __name__ == "__main__":
+    test_resolve_rank_range()
+    test_pipeline_runs_stages_and_records_progress()
+    test_jobs_resume_after_restart()
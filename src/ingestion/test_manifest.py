@@ -0,0 +1,80 @@
+import sys
+import os
+import tempfile
+
+# Ensure the src directory is in the python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from llama_index.core import Document
+from src.ingestion.manifest import IngestionManifest, with_stable_id
+
+
+def _doc(url, text):
+    return with_stable_id(Document(text=text, metadata={"url": url, "university": "Oxford"}))
+
+
+def test_stable_ids():
+    assert _doc("https://ox.ac.uk/fees", "£30k").id_ == _doc("https://ox.ac.uk/fees", "£30k").id_
+    assert _doc("https://ox.ac.uk/fees", "£30k").id_ != _doc("https://ox.ac.uk/fees", "£31k").id_
+    assert _doc("https://ox.ac.uk/fees", "£30k").id_ != _doc("https://ox.ac.uk/costs", "£30k").id_
+    # The ID follows the raw page, not its cleaned text (which depends on the site's other pages).
+    cleaned = Document(text="£30k", metadata={"url": "https://ox.ac.uk/fees"})
+    recleaned = Document(text="Fees: £30k", metadata={"url": "https://ox.ac.uk/fees"})
+    assert with_stable_id(cleaned, raw="<nav/> Fees: £30k").id_ == with_stable_id(recleaned, raw="<nav/> Fees: £30k").id_
+
+
+def test_incremental_plan():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "manifest.json")
+        first = [_doc("https://ox.ac.uk/", "home"), _doc("https://ox.ac.uk/fees", "£30k"),
+                 _doc("https://ox.ac.uk/old", "gone soon")]
+
+        manifest = IngestionManifest(path)
+        plan = manifest.plan(first)
+        assert (plan.new, plan.changed, plan.unchanged) == (3, 0, 0)
+        manifest.apply(plan)
+        manifest.save()
+
+        second = [_doc("https://ox.ac.uk/", "home"), _doc("https://ox.ac.uk/fees", "£31k"),
+                  _doc("https://ox.ac.uk/deadlines", "15 October")]
+        manifest = IngestionManifest(path)
+        plan = manifest.plan(second)
+        assert (plan.new, plan.changed, plan.unchanged) == (1, 1, 1)
+        assert [d.metadata["url"] for d in plan.to_ingest] == ["https://ox.ac.uk/fees", "https://ox.ac.uk/deadlines"]
+        assert plan.removed == ["https://ox.ac.uk/old"]
+        assert sorted(plan.stale_doc_ids) == sorted([first[1].id_, first[2].id_])
+
+        manifest.apply(plan)
+        assert IngestionManifest(path).plan(second).to_ingest != []  # not saved yet
+        manifest.save()
+        plan = IngestionManifest(path).plan(second)
+        assert plan.to_ingest == [] and plan.stale_doc_ids == []
+
+
+def test_plan_scoped_to_universities():
+    manifest = IngestionManifest(os.path.join(tempfile.gettempdir(), "unused-manifest.json"))
+    oxford = _doc("https://ox.ac.uk/", "home")
+    mit = with_stable_id(Document(text="home", metadata={"url": "https://mit.edu/", "university": "MIT"}))
+    manifest.apply(manifest.plan([oxford, mit]))
+
+    # Ingesting only MIT must not treat Oxford's pages as vanished.
+    plan = manifest.plan([], universities=["MIT"])
+    assert plan.removed == ["https://mit.edu/"]
+
+
+def test_full_plan_removes_vanished_pages():
+    manifest = IngestionManifest(os.path.join(tempfile.gettempdir(), "unused-manifest.json"))
+    home, old = _doc("https://ox.ac.uk/", "home"), _doc("https://ox.ac.uk/old", "gone soon")
+    manifest.apply(manifest.plan([home, old]))
+
+    # Everything is re-ingested, and the vanished page is still found.
+    plan = manifest.plan([home], full=True)
+    assert plan.to_ingest == [home] and plan.removed == ["https://ox.ac.uk/old"]
+    assert sorted(plan.stale_doc_ids) == sorted([home.id_, old.id_])
+
+
+if __name__ == "__main__":
+    test_stable_ids()
+    test_incremental_plan()
+    test_plan_scoped_to_universities()
+    test_full_plan_removes_vanished_pages()
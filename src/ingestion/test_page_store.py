@@ -0,0 +1,141 @@
+import sys
+import os
+import gzip
+import json
+import tempfile
+import threading
+
+# Ensure the src directory is in the python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.ingestion.page_store import PageStore
+
+
+def test_put_dedupes_and_reads_lazily():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PageStore(tmp)
+        assert store.put("MIT", "https://mit.edu", "# MIT", "main_page")
+        assert store.put("MIT", "https://mit.edu/fees", "Tuition is $60,000.")
+        assert store.put("Oxford", "https://ox.ac.uk", "# Oxford", "main_page")
+        # Unchanged content is not appended again; changed content supersedes the old record.
+        assert not store.put("MIT", "https://mit.edu/fees", "Tuition is $60,000.")
+        assert store.put("MIT", "https://mit.edu/fees", "Tuition is $62,000.")
+
+        assert len(store) == 3 and store.universities() == ["MIT", "Oxford"]
+        assert store.get("https://mit.edu/fees").content == "Tuition is $62,000."
+        sites = [(name, [p.url for p in pages]) for name, pages in store.iter_sites()]
+        assert sites == [("MIT", ["https://mit.edu", "https://mit.edu/fees"]), ("Oxford", ["https://ox.ac.uk"])]
+        store.close()
+
+        # The log is plain gzipped JSONL holding every version.
+        with gzip.open(os.path.join(tmp, "pages.jsonl.gz"), "rt", encoding="utf-8") as f:
+            assert [json.loads(line)["url"] for line in f].count("https://mit.edu/fees") == 2
+
+
+def test_retain_and_compact():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PageStore(tmp)
+        store.put("MIT", "https://mit.edu", "# MIT", "main_page")
+        store.put("MIT", "https://mit.edu/old", "Old page")
+        store.put("MIT", "https://mit.edu/fees", "v1")
+        store.put("MIT", "https://mit.edu/fees", "v2")
+
+        assert store.retain("MIT", ["https://mit.edu", "https://mit.edu/fees"]) == 1
+        stats = store.stats()
+        assert stats.pages == 2 and stats.file_bytes > stats.live_bytes
+
+        assert store.compact() > 0
+        assert store.stats().file_bytes == store.stats().live_bytes
+        assert [p.content for p in store.iter_pages("MIT")] == ["# MIT", "v2"]
+        store.close()
+
+        # The index names the compacted log; the old one is gone.
+        reopened = PageStore(tmp)
+        assert [p.content for p in reopened.iter_pages("MIT")] == ["# MIT", "v2"]
+        assert [n for n in os.listdir(tmp) if n.endswith(".jsonl.gz")] == [os.path.basename(reopened.log_path)]
+        reopened.close()
+
+
+def test_retain_keeps_failed_fetches():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PageStore(tmp)
+        for path in ("", "/fees", "/flaky", "/removed"):
+            store.put("MIT", f"https://mit.edu{path}", f"page {path}")
+
+        # A crawl where /flaky timed out must not drop it; /removed answered 404.
+        assert store.retain("MIT", ["https://mit.edu", "https://mit.edu/fees"],
+                            gone=["https://mit.edu/removed"], complete=False) == 1
+        assert store.get("https://mit.edu/flaky") is not None and store.get("https://mit.edu/removed") is None
+        store.close()
+
+
+def test_compact_interrupted_before_commit():
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PageStore(tmp)
+        store.put("MIT", "https://mit.edu", "# MIT", "main_page")
+        store.close()
+        # A compacted log that was written but never switched to is discarded on open.
+        with open(os.path.join(tmp, "pages.123.jsonl.gz"), "wb") as f:
+            f.write(b"partial")
+        store = PageStore(tmp)
+        assert store.get("https://mit.edu").content == "# MIT"
+        assert not os.path.exists(os.path.join(tmp, "pages.123.jsonl.gz"))
+        store.close()
+
+
+def test_import_json():
+    with tempfile.TemporaryDirectory() as tmp:
+        raw = os.path.join(tmp, "raw")
+        os.makedirs(raw)
+        with open(os.path.join(raw, "mit.json"), "w", encoding="utf-8") as f:
+            json.dump({"name": "MIT", "url": "https://mit.edu/", "content": "# MIT", "sub_pages": [
+                {"url": "https://mit.edu/fees", "content": "Fees"}, {"url": "https://mit.edu/empty", "content": ""},
+            ]}, f)
+        store = PageStore(os.path.join(tmp, "pages"))
+        assert store.import_json(raw) == 2
+        assert store.import_json(raw) == 0
+        assert [p.type for p in store.iter_pages()] == ["main_page", "sub_page"]
+        store.close()
+
+
+def test_reads_during_writes_and_compaction():
+    # The job runner cleans one university from a worker thread while the crawl stores another.
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PageStore(tmp)
+        for i in range(20):
+            store.put("Oxford", f"https://ox.ac.uk/{i}", f"# Page {i}")
+        errors = []
+
+        def write():
+            for round in range(10):
+                for i in range(20):
+                    store.put("MIT", f"https://mit.edu/{i}", f"# MIT {i} v{round}")
+                store.compact()
+
+        def read():
+            try:
+                for _ in range(100):
+                    assert [p.content for p in store.iter_pages("Oxford")] == sorted(f"# Page {i}" for i in range(20))
+                    stats = store.stats()
+                    assert 20 <= stats.pages <= len(store) and stats.live_bytes <= stats.file_bytes
+                    assert "Oxford" in store.universities()
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=write), threading.Thread(target=read)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert errors == []
+        assert store.get("https://mit.edu/3").content == "# MIT 3 v9"
+        store.close()
+
+
+if __name__ == "__main__":
+    test_put_dedupes_and_reads_lazily()
+    test_retain_and_compact()
+    test_retain_keeps_failed_fetches()
+    test_compact_interrupted_before_commit()
+    test_import_json()
+    test_reads_during_writes_and_compaction()
@@ -0,0 +1,75 @@
+import sys
+import os
+
+# Ensure the src directory is in the python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from llama_index.core import MockEmbedding
+from llama_index.core.llms import MockLLM
+from src.ingestion import summaries as s
+
+
+class FakeGraphStore:
+    """Stands in for Neo4j: answers the summarizer's queries and records summary writes."""
+
+    def __init__(self, gds=True):
+        self.gds = gds
+        self.universities = [
+            {"university": "Oxford", "size": 12, "triplets": ["Oxford OFFERS MSc Computer Science"]},
+            {"university": "Stanford", "size": 30, "triplets": ["Stanford REQUIRES TOEFL 100"]},
+        ]
+        self.communities = [{"community": 7, "size": 9, "triplets": ["MSc Computer Science REQUIRES IELTS 7.0"],
+                             "universities": ["Oxford"]}]
+        self.summaries = {}
+
+    def structured_query(self, query, param_map=None):
+        params = param_map or {}
+        if "gds." in query:
+            if not self.gds:
+                raise RuntimeError("There is no procedure with the name `gds.graph.drop`")
+            if query == s.GDS_PROJECT_QUERY:
+                return [{"nodes": 40, "relationships": 55}]
+            if query == s.GDS_LEIDEN_QUERY:
+                return [{"communityCount": 3, "modularity": 0.41}]
+            return []
+        if query == s.UNIVERSITY_CONTEXT_QUERY:
+            return self.universities
+        if query == s.COMMUNITY_CONTEXT_QUERY:
+            return self.communities
+        if query == s.SUMMARY_HASHES_QUERY:
+            return [{"id": k, "source_hash": v["source_hash"]} for k, v in self.summaries.items()]
+        if query == s.SUMMARY_UPSERT_QUERY:
+            self.summaries.update({row["id"]: row for row in params["data"]})
+        elif query == s.SUMMARY_DELETE_QUERY:
+            self.summaries = {k: v for k, v in self.summaries.items() if k in params["keep"]}
+        return []
+
+
+def test_incremental_refresh():
+    store = FakeGraphStore()
+    summarizer = s.GraphSummarizer(store, MockLLM(max_tokens=8), MockEmbedding(embed_dim=4))
+    stats = summarizer.refresh()
+    assert (stats.communities, stats.summarized, stats.unchanged) == (3, 3, 0)
+    oxford = store.summaries["university:Oxford"]
+    assert oxford["text"] and len(oxford["embedding"]) == 4 and oxford["universities"] == ["Oxford"]
+    community = next(v for k, v in store.summaries.items() if k.startswith("community:"))
+    assert community["name"] == "MSc" and community["universities"] == ["Oxford"]
+
+    # Only the university whose facts changed is summarized again; a vanished one is deleted.
+    store.universities = [{"university": "Oxford", "size": 13,
+                           "triplets": ["Oxford OFFERS MSc Computer Science", "Oxford HAS_DEADLINE 15 January"]}]
+    stats = summarizer.refresh()
+    assert (stats.summarized, stats.unchanged, stats.deleted) == (1, 1, 1)
+    assert "university:Stanford" not in store.summaries
+
+
+def test_without_gds():
+    store = FakeGraphStore(gds=False)
+    stats = s.GraphSummarizer(store, MockLLM(max_tokens=8), MockEmbedding(embed_dim=4)).refresh()
+    assert stats.communities == 0
+    assert sorted(store.summaries) == ["university:Oxford", "university:Stanford"]
+
+
+if __name__ == "__main__":
+    test_incremental_refresh()
+    test_without_gds()
@@ -0,0 +1,78 @@
+import os
+import logging
+import time
+from typing import Any, List, Optional, Sequence
+from qdrant_client import QdrantClient
+from qdrant_client.http import models as rest
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.core.schema import BaseNode, MetadataMode
+from llama_index.core.vector_stores.types import FilterOperator, MetadataFilter, MetadataFilters
+from llama_index.vector_stores.qdrant import QdrantVectorStore
+
+logger = logging.getLogger(__name__)
+
+QDRANT_URL = os.getenv("QDRANT_URL", "http://localhost:6333")
+QDRANT_COLLECTION = os.getenv("QDRANT_COLLECTION", "unigraph_chunks")
+
+# Chunk metadata the retriever filters on; indexed so filtered ANN search stays fast.
+FILTER_FIELDS = ("university", "type")
+
+
+def get_vector_store(client: Optional[QdrantClient] = None, collection_name: str = QDRANT_COLLECTION) -> QdrantVectorStore:
+    """
+    Returns the Qdrant store holding one point per graph chunk.
+
+    Points share their ID with the chunk node in Neo4j and carry the chunk metadata as
+    payload, with keyword indexes on ``FILTER_FIELDS`` and the source document ID.
+
+    Args:
+        client (Optional[QdrantClient]): Client to use; defaults to one for ``QDRANT_URL``.
+        collection_name (str): Qdrant collection name.
+    """
+    return QdrantVectorStore(
+        collection_name=collection_name,
+        client=client or QdrantClient(url=QDRANT_URL),
+        payload_indexes=[
+            {"field_name": field, "field_schema": rest.PayloadSchemaType.KEYWORD} for field in FILTER_FIELDS
+        ],
+    )
+
+
+def delete_chunks(vector_store: QdrantVectorStore, doc_ids: Sequence[str]) -> None:
+    """Removes the points of every chunk of the given documents."""
+    if not doc_ids or not vector_store.client.collection_exists(vector_store.collection_name):
+        return
+    vector_store.delete_nodes(filters=MetadataFilters(
+        filters=[MetadataFilter(key="doc_id", value=list(doc_ids), operator=FilterOperator.IN)]
+    ))
+
+
+def index_chunks(vector_store: QdrantVectorStore, nodes: Sequence[BaseNode], embed_model: BaseEmbedding) -> int:
+    """
+    Upserts chunk nodes into Qdrant, replacing earlier points of the same documents.
+
+    Nodes that already carry an embedding (set while building the property graph) are
+    stored as is; the others are embedded with ``embed_model``.
+
+    Args:
+        vector_store (QdrantVectorStore): Target store, see ``get_vector_store``.
+        nodes (Sequence[BaseNode]): Chunk nodes, with the IDs used in the graph.
+        embed_model (BaseEmbedding): Embedding model matching the one used at query time.
+
+    Returns:
+        int: Number of points written.
+    """
+    if not nodes:
+        return 0
+    started = time.perf_counter()
+    missing: List[Any] = [node for node in nodes if node.embedding is None]
+    if missing:
+        vectors = embed_model.get_text_embedding_batch(
+            [node.get_content(metadata_mode=MetadataMode.EMBED) for node in missing]
+        )
+        for node, vector in zip(missing, vectors):
+            node.embedding = vector
+    delete_chunks(vector_store, sorted({node.ref_doc_id for node in nodes if node.ref_doc_id}))
+    vector_store.add(list(nodes))
+    logger.info(f"Indexed {len(nodes)} chunks in Qdrant in {time.perf_counter() - started:.2f}s.")
+    return len(nodes)
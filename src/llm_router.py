@@ -0,0 +1,421 @@
+import contextvars
+import logging
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Literal, Optional, Sequence, Tuple
+from llama_index.core.base.llms.types import (
+    ChatMessage, ChatResponse, ChatResponseAsyncGen, ChatResponseGen, CompletionResponse,
+    CompletionResponseAsyncGen, CompletionResponseGen, LLMMetadata,
+)
+from llama_index.core.bridge.pydantic import Field, PrivateAttr
+from llama_index.core.llms import LLM
+from pydantic import BaseModel
+from src.telemetry import LLM_COST, LLM_ROUTE_CALLS, LLM_ROUTE_SECONDS, token_counts
+
+logger = logging.getLogger(__name__)
+
+# What an LLM call is for. Lookups and extraction are high-volume and simple enough for the
+# local model; multi-hop reasoning and summary synthesis go to the cloud model.
+LLMRoute = Literal["lookup", "reasoning", "extraction", "synthesis"]
+Backend = Literal["local", "cloud"]
+
+ROUTE_POLICY: Dict[str, Backend] = {
+    "lookup": "local",
+    "reasoning": "cloud",
+    "extraction": "local",
+    "synthesis": "cloud",
+}
+# Calls made outside any route (e.g. through ``Settings.llm``) keep going to the cloud model.
+DEFAULT_ROUTE: LLMRoute = "synthesis"
+
+# Questions that need several facts combined rather than one looked up.
+REASONING = re.compile(
+    r"\b(?:compare|comparison|versus|vs\.?|difference|differ|better|best|worse|rank(?:ed|ing)?|why|explain|"
+    r"recommend|should i|pros|cons|trade-?offs?|both|between|cheaper|harder|easier|more than|less than)\b",
+    re.I,
+)
+REASONING_MIN_WORDS = 30
+
+_route: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("llm_route", default=None)
+_served: contextvars.ContextVar[Optional[List[str]]] = contextvars.ContextVar("llm_served", default=None)
+
+
+def classify_query(query: str, retrieval_route: str = "graph") -> LLMRoute:
+    """
+    Classifies a user question for the model router.
+
+    Args:
+        query (str): User question.
+        retrieval_route (str): Route the retriever picked ("summaries" for global questions).
+
+    Returns:
+        LLMRoute: "synthesis" for global questions answered from summaries, "reasoning" for
+        comparisons and long multi-part questions, "lookup" otherwise.
+    """
+    if retrieval_route == "summaries":
+        return "synthesis"
+    if REASONING.search(query) or len(query.split()) >= REASONING_MIN_WORDS:
+        return "reasoning"
+    return "lookup"
+
+
+@contextmanager
+def use_llm_route(route: str) -> Iterator[None]:
+    """Routes the LLM calls made inside the block (including from worker threads) as ``route``."""
+    token = _route.set(route)
+    try:
+        yield
+    finally:
+        _route.reset(token)
+
+
+async def route_stream(chunks: AsyncIterator[Any], route: str) -> AsyncIterator[Any]:
+    """
+    Routes the LLM calls a lazy stream makes (LlamaIndex starts streaming synthesis on the
+    first pull) as ``route``. The route is set around each pull rather than across yields,
+    so the stream can be consumed from any context.
+    """
+    while True:
+        with use_llm_route(route):
+            try:
+                chunk = await chunks.__anext__()
+            except StopAsyncIteration:
+                return
+        yield chunk
+
+
+@contextmanager
+def record_llm_models() -> Iterator[List[str]]:
+    """
+    Collects the names of the models that serve the routed LLM calls made inside the block,
+    including from tasks and threads it starts (they share the list).
+    """
+    served: List[str] = []
+    token = _served.set(served)
+    try:
+        yield served
+    finally:
+        _served.reset(token)
+
+
+def current_llm_route() -> Optional[str]:
+    """The route set by the innermost ``use_llm_route`` block, if any."""
+    return _route.get()
+
+
+class RouteStats(BaseModel):
+    """
+    Calls one backend served for one route since startup.
+
+    Attributes:
+        fallbacks (int): Calls served after the preferred backend failed or was down.
+        seconds (float): Total latency of successful calls.
+        cost_usd (float): Estimated spend, from token counts and the backend's prices.
+    """
+    route: str
+    backend: str
+    calls: int = 0
+    errors: int = 0
+    fallbacks: int = 0
+    seconds: float = 0.0
+    mean_seconds: float = 0.0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cost_usd: float = 0.0
+
+
+def _prompt_text(args: Sequence[Any], kwargs: Dict[str, Any]) -> str:
+    value = args[0] if args else kwargs.get("messages", kwargs.get("prompt", ""))
+    if isinstance(value, str):
+        return value
+    return "".join(str(m.content or "") for m in value)
+
+
+def _response_text(response: Any) -> str:
+    if isinstance(response, ChatResponse):
+        return str(response.message.content or "")
+    return str(getattr(response, "text", "") or "")
+
+
+class LLMRouter:
+    """
+    Dispatches LLM calls to a local or a cloud model by route. A backend that fails is
+    skipped for ``cooldown`` seconds and the call falls back to the other one; so is a
+    backend whose recent latency exceeds ``latency_budget``. Backends are created on first
+    use, so a missing Ollama server or API key only matters if that backend is needed.
+    """
+
+    def __init__(
+        self,
+        backends: Dict[Backend, Callable[[], Any]],
+        policy: Optional[Dict[str, Backend]] = None,
+        fallback: bool = True,
+        cooldown: float = 60.0,
+        latency_budget: float = 30.0,
+        prices: Optional[Dict[Backend, Tuple[float, float]]] = None,
+        clock: Callable[[], float] = time.monotonic,
+        models: Optional[Dict[Backend, str]] = None,
+    ):
+        """
+        Initializes the LLMRouter.
+
+        Args:
+            backends (Dict[Backend, Callable[[], Any]]): Factories of the LlamaIndex LLMs.
+            policy (Optional[Dict[str, Backend]]): Preferred backend per route (default: ``ROUTE_POLICY``).
+            fallback (bool): Retry a failed call on the other backend.
+            cooldown (float): Seconds a failed or slow backend is skipped.
+            latency_budget (float): Seconds; a backend whose average latency exceeds it is skipped.
+            prices (Optional[Dict[Backend, Tuple[float, float]]]): USD per million prompt and
+                completion tokens; backends without prices are free.
+            clock (Callable[[], float]): Time source for cooldowns, in seconds.
+            models (Optional[Dict[Backend, str]]): Configured model name of each backend, so
+                it is known without creating the backend.
+        """
+        self.factories = backends
+        self.policy = policy or ROUTE_POLICY
+        self.fallback = fallback
+        self.cooldown = cooldown
+        self.latency_budget = latency_budget
+        self.prices = prices or {}
+        self.clock = clock
+        self.models = models or {}
+        self._backends: Dict[str, Any] = {}
+        self._down_until: Dict[str, float] = {}
+        self._latency: Dict[str, float] = {}
+        self._stats: Dict[Tuple[str, str], RouteStats] = {}
+        self._lock = threading.Lock()
+
+    def backend(self, name: str) -> Any:
+        """Returns backend ``name``, creating it on first use."""
+        with self._lock:
+            if name not in self._backends:
+                self._backends[name] = self.factories[name]()
+            return self._backends[name]
+
+    def model_name(self, backend: str) -> str:
+        """The model backend ``backend`` serves: its configured name, else its own metadata's."""
+        if backend in self.models:
+            return self.models[backend]
+        return self.backend(backend).metadata.model_name
+
+    def plan(self, route: str) -> List[str]:
+        """Backends to try for ``route``, in order: the preferred one unless it is cooling down."""
+        preferred = self.policy.get(route, "cloud")
+        order = [preferred] + ([b for b in self.factories if b != preferred] if self.fallback else [])
+        order = [b for b in order if b in self.factories]
+        now = self.clock()
+        available = [b for b in order if self._down_until.get(b, 0.0) <= now]
+        return available or order
+
+    def stats(self) -> List[RouteStats]:
+        """Per-route, per-backend call statistics, sorted by route."""
+        with self._lock:
+            return [s.model_copy() for _, s in sorted(self._stats.items())]
+
+    def _entry(self, route: str, backend: str) -> RouteStats:
+        key = (route, backend)
+        if key not in self._stats:
+            self._stats[key] = RouteStats(route=route, backend=backend)
+        return self._stats[key]
+
+    def _failed(self, route: str, backend: str, error: Exception) -> None:
+        logger.warning(f"LLM backend {backend} failed for {route}: {error}; skipping it for {self.cooldown:.0f}s.")
+        LLM_ROUTE_CALLS.labels(route, backend, "error").inc()
+        with self._lock:
+            self._entry(route, backend).errors += 1
+            self._down_until[backend] = self.clock() + self.cooldown
+
+    def _succeeded(self, route: str, backend: str, seconds: float, prompt: str, response: Any, fallback: bool) -> None:
+        prompt_tokens, completion_tokens = token_counts(prompt, _response_text(response), getattr(response, "raw", None))
+        price_in, price_out = self.prices.get(backend, (0.0, 0.0))
+        cost = (prompt_tokens * price_in + completion_tokens * price_out) / 1_000_000
+        served = _served.get()
+        if served is not None:
+            served.append(self.model_name(backend))
+        LLM_ROUTE_CALLS.labels(route, backend, "fallback" if fallback else "ok").inc()
+        LLM_ROUTE_SECONDS.labels(route, backend).observe(seconds)
+        LLM_COST.labels(route, backend).inc(cost)
+        with self._lock:
+            stats = self._entry(route, backend)
+            stats.calls += 1
+            stats.fallbacks += fallback
+            stats.seconds += seconds
+            stats.mean_seconds = stats.seconds / stats.calls
+            stats.prompt_tokens += prompt_tokens
+            stats.completion_tokens += completion_tokens
+            stats.cost_usd += cost
+            latency = self._latency.get(backend)
+            self._latency[backend] = seconds if latency is None else 0.8 * latency + 0.2 * seconds
+            if self.fallback and len(self.factories) > 1 and self._latency[backend] > self.latency_budget:
+                logger.warning(
+                    f"LLM backend {backend} averages {self._latency[backend]:.1f}s (budget {self.latency_budget:.0f}s); "
+                    f"skipping it for {self.cooldown:.0f}s."
+                )
+                self._down_until[backend] = self.clock() + self.cooldown
+                self._latency.pop(backend)
+
+    def call(self, route: str, method: str, *args: Any, **kwargs: Any) -> Any:
+        """Calls ``method`` of the route's backend, falling back to the other backend on errors."""
+        error: Optional[Exception] = None
+        for backend in self.plan(route):
+            started = time.perf_counter()
+            try:
+                response = getattr(self.backend(backend), method)(*args, **kwargs)
+            except Exception as e:
+                self._failed(route, backend, e)
+                error = e
+                continue
+            self._succeeded(route, backend, time.perf_counter() - started, _prompt_text(args, kwargs), response, backend != self.policy.get(route, "cloud"))
+            return response
+        raise error
+
+    async def acall(self, route: str, method: str, *args: Any, **kwargs: Any) -> Any:
+        """Async ``call``."""
+        error: Optional[Exception] = None
+        for backend in self.plan(route):
+            started = time.perf_counter()
+            try:
+                response = await getattr(self.backend(backend), method)(*args, **kwargs)
+            except Exception as e:
+                self._failed(route, backend, e)
+                error = e
+                continue
+            self._succeeded(route, backend, time.perf_counter() - started, _prompt_text(args, kwargs), response, backend != self.policy.get(route, "cloud"))
+            return response
+        raise error
+
+    def stream(self, route: str, method: str, *args: Any, **kwargs: Any) -> Iterator[Any]:
+        """
+        Streaming ``call``. Falls back only until the first chunk: once tokens have been
+        sent on, an error is raised to the caller.
+        """
+        error: Optional[Exception] = None
+        for backend in self.plan(route):
+            started = time.perf_counter()
+            try:
+                chunks = getattr(self.backend(backend), method)(*args, **kwargs)
+                first = next(chunks, None)
+            except Exception as e:
+                self._failed(route, backend, e)
+                error = e
+                continue
+            last = first
+            if first is not None:
+                yield first
+                for last in chunks:
+                    yield last
+            self._succeeded(route, backend, time.perf_counter() - started, _prompt_text(args, kwargs), last, backend != self.policy.get(route, "cloud"))
+            return
+        raise error
+
+    async def astream(self, route: str, method: str, *args: Any, **kwargs: Any) -> AsyncIterator[Any]:
+        """Async ``stream``."""
+        error: Optional[Exception] = None
+        for backend in self.plan(route):
+            started = time.perf_counter()
+            try:
+                chunks = await getattr(self.backend(backend), method)(*args, **kwargs)
+                first = await chunks.__anext__()
+            except StopAsyncIteration:
+                first = None
+            except Exception as e:
+                self._failed(route, backend, e)
+                error = e
+                continue
+            last = first
+            if first is not None:
+                yield first
+                async for last in chunks:
+                    yield last
+            self._succeeded(route, backend, time.perf_counter() - started, _prompt_text(args, kwargs), last, backend != self.policy.get(route, "cloud"))
+            return
+        raise error
+
+
+class RoutedLLM(LLM):
+    """
+    LlamaIndex LLM that sends each call through an ``LLMRouter``. Bound to a route (e.g.
+    "extraction" for the ingestion extractor) or, if unbound, routed by the enclosing
+    ``use_llm_route`` block. Token counting and tracing events are emitted by the backend
+    LLM that served the call.
+    """
+
+    route: Optional[str] = Field(default=None, description="Fixed route; None follows use_llm_route.")
+    _router: LLMRouter = PrivateAttr()
+
+    def __init__(self, router: LLMRouter, route: Optional[str] = None, **kwargs: Any):
+        super().__init__(route=route, **kwargs)
+        self._router = router
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "RoutedLLM"
+
+    @property
+    def router(self) -> LLMRouter:
+        return self._router
+
+    def current_route(self) -> str:
+        """The route this call is made for."""
+        return self.route or current_llm_route() or DEFAULT_ROUTE
+
+    @property
+    def model(self) -> str:
+        """
+        The model the current route is configured for. Stable while a backend cools down,
+        so it can identify the route's output (e.g. in the extraction cache's fingerprint).
+        """
+        return self._router.model_name(self._router.policy.get(self.current_route(), "cloud"))
+
+    @property
+    def metadata(self) -> LLMMetadata:
+        """
+        Metadata of the first backend the current route can use, with the smallest context
+        window of all; backends that cannot be created (no API key, no server) are skipped.
+        """
+        available: List[LLMMetadata] = []
+        error: Optional[Exception] = None
+        for name in self._router.plan(self.current_route()):
+            try:
+                available.append(self._router.backend(name).metadata)
+            except Exception as e:
+                logger.warning(f"LLM backend {name} unavailable: {e}")
+                error = e
+        if not available:
+            raise error
+        try:
+            model_name = self.model
+        except Exception:
+            model_name = available[0].model_name
+        return LLMMetadata(
+            context_window=min(m.context_window for m in available),
+            num_output=available[0].num_output,
+            is_chat_model=True,
+            model_name=model_name,
+        )
+
+    def chat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponse:
+        return self._router.call(self.current_route(), "chat", messages, **kwargs)
+
+    def complete(self, prompt: str, formatted: bool = False, **kwargs: Any) -> CompletionResponse:
+        return self._router.call(self.current_route(), "complete", prompt, formatted=formatted, **kwargs)
+
+    def stream_chat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponseGen:
+        return self._router.stream(self.current_route(), "stream_chat", messages, **kwargs)
+
+    def stream_complete(self, prompt: str, formatted: bool = False, **kwargs: Any) -> CompletionResponseGen:
+        return self._router.stream(self.current_route(), "stream_complete", prompt, formatted=formatted, **kwargs)
+
+    async def achat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponse:
+        return await self._router.acall(self.current_route(), "achat", messages, **kwargs)
+
+    async def acomplete(self, prompt: str, formatted: bool = False, **kwargs: Any) -> CompletionResponse:
+        return await self._router.acall(self.current_route(), "acomplete", prompt, formatted=formatted, **kwargs)
+
+    async def astream_chat(self, messages: Sequence[ChatMessage], **kwargs: Any) -> ChatResponseAsyncGen:
+        return self._router.astream(self.current_route(), "astream_chat", messages, **kwargs)
+
+    async def astream_complete(self, prompt: str, formatted: bool = False, **kwargs: Any) -> CompletionResponseAsyncGen:
+        return self._router.astream(self.current_route(), "astream_complete", prompt, formatted=formatted, **kwargs)
@@ -0,0 +1,118 @@
+import os
+import logging
+import time
+from functools import lru_cache
+from typing import Any, Optional
+from dotenv import load_dotenv
+from src.telemetry import instrument_llm_calls
+
+logger = logging.getLogger(__name__)
+
+# Load environment variables
+load_dotenv()
+
+EMBED_MODEL_NAME = os.getenv("EMBED_MODEL", "BAAI/bge-small-en-v1.5")
+RERANK_MODEL_NAME = os.getenv("RERANK_MODEL", "Xenova/ms-marco-MiniLM-L-6-v2")
+LLM_MODEL_NAME = os.getenv("LLM_MODEL", "models/gemini-2.5-flash")
+GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
+OLLAMA_MODEL = os.getenv("OLLAMA_MODEL", "llama3.1:8b")
+OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+OLLAMA_TIMEOUT = float(os.getenv("OLLAMA_TIMEOUT", "120"))
+OLLAMA_CONTEXT_WINDOW = int(os.getenv("OLLAMA_CONTEXT_WINDOW", "8192"))
+# "auto" sends lookups and extraction to Ollama and reasoning and synthesis to Gemini
+# (see llm_router.ROUTE_POLICY); "cloud" or "local" sends everything to one of them.
+LLM_ROUTER = os.getenv("LLM_ROUTER", "auto")
+LLM_FALLBACK = os.getenv("LLM_FALLBACK", "1") == "1"
+LLM_COOLDOWN = float(os.getenv("LLM_COOLDOWN", "60"))
+LLM_LATENCY_BUDGET = float(os.getenv("LLM_LATENCY_BUDGET", "30"))
+# USD per million prompt / completion tokens of the cloud model, for cost estimates.
+CLOUD_PRICE_INPUT = float(os.getenv("CLOUD_PRICE_INPUT", "0.30"))
+CLOUD_PRICE_OUTPUT = float(os.getenv("CLOUD_PRICE_OUTPUT", "2.50"))
+
+# Model construction is deferred to these factories: importing LlamaIndex integrations,
+# loading the ONNX embedding model and creating the Gemini client take seconds and must
+# not happen when a module is merely imported. Each model is built once per process and
+# shared by ingestion and retrieval, which must use the same embedding model.
+
+
+@lru_cache(maxsize=1)
+def get_embed_model() -> Any:
+    """Returns the shared FastEmbed embedding model, loading it on first use."""
+    from llama_index.embeddings.fastembed import FastEmbedEmbedding
+
+    started = time.perf_counter()
+    model = FastEmbedEmbedding(model_name=EMBED_MODEL_NAME)
+    logger.info(f"Loaded embedding model {EMBED_MODEL_NAME} in {time.perf_counter() - started:.2f}s")
+    return model
+
+
+@lru_cache(maxsize=1)
+def get_reranker() -> Any:
+    """Returns the shared FastEmbed cross-encoder (ONNX, CPU) used to rerank retrieved chunks."""
+    from fastembed.rerank.cross_encoder import TextCrossEncoder
+
+    started = time.perf_counter()
+    model = TextCrossEncoder(model_name=RERANK_MODEL_NAME)
+    logger.info(f"Loaded reranker {RERANK_MODEL_NAME} in {time.perf_counter() - started:.2f}s")
+    return model
+
+
+@lru_cache(maxsize=1)
+def get_cloud_llm() -> Any:
+    """Returns the shared Gemini LLM client, creating it on first use."""
+    from llama_index.llms.gemini import Gemini
+
+    if not GOOGLE_API_KEY:
+        logger.warning("GOOGLE_API_KEY not found in environment variables. Gemini LLM may fail.")
+    return Gemini(model=LLM_MODEL_NAME, api_key=GOOGLE_API_KEY)
+
+
+@lru_cache(maxsize=1)
+def get_local_llm() -> Any:
+    """Returns the shared Ollama client for local inference."""
+    from llama_index.llms.ollama import Ollama
+
+    return Ollama(
+        model=OLLAMA_MODEL,
+        base_url=OLLAMA_BASE_URL,
+        request_timeout=OLLAMA_TIMEOUT,
+        context_window=OLLAMA_CONTEXT_WINDOW,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_router() -> Any:
+    """Returns the shared router between the local and the cloud LLM."""
+    from src.llm_router import ROUTE_POLICY, LLMRouter
+
+    policy = ROUTE_POLICY if LLM_ROUTER == "auto" else {route: LLM_ROUTER for route in ROUTE_POLICY}
+    return LLMRouter(
+        {"local": get_local_llm, "cloud": get_cloud_llm},
+        policy=policy,
+        fallback=LLM_FALLBACK,
+        cooldown=LLM_COOLDOWN,
+        latency_budget=LLM_LATENCY_BUDGET,
+        prices={"cloud": (CLOUD_PRICE_INPUT, CLOUD_PRICE_OUTPUT)},
+        models={"local": OLLAMA_MODEL, "cloud": LLM_MODEL_NAME},
+    )
+
+
+@lru_cache(maxsize=None)
+def get_llm(route: Optional[str] = None) -> Any:
+    """
+    Returns the shared LLM for ``route`` ("lookup", "reasoning", "extraction" or
+    "synthesis"). Without a route, calls are routed by the enclosing
+    ``llm_router.use_llm_route`` block, and go to the cloud model outside of one.
+    """
+    from src.llm_router import RoutedLLM
+
+    return RoutedLLM(get_router(), route=route)
+
+
+def configure_settings() -> None:
+    """Points LlamaIndex's global ``Settings`` at the shared models and counts LLM tokens."""
+    from llama_index.core import Settings
+
+    Settings.embed_model = get_embed_model()
+    Settings.llm = get_llm()
+    instrument_llm_calls()
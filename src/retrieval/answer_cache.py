@@ -0,0 +1,192 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, FrozenSet, List, Literal, Optional, Sequence, Tuple
+import numpy as np
+from pydantic import BaseModel, ConfigDict
+from src.retrieval.fact_retriever import mentioned_names
+
+CacheOutcome = Literal["miss", "exact", "semantic"]
+NUMBER = re.compile(r"\d+(?:[.,]\d+)*")
+
+
+def normalize_query(query: str) -> str:
+    """Lowercases a query, collapses whitespace and drops surrounding punctuation."""
+    return re.sub(r"\s+", " ", query.lower()).strip(" \t\n?!.,;:'\"")
+
+
+class CacheLookup(BaseModel):
+    """
+    Result of ``AnswerCache.lookup``.
+
+    Attributes:
+        outcome (CacheOutcome): "exact" or "semantic" on a hit, "miss" otherwise.
+        answer (Optional[str]): Cached answer on a hit.
+        similarity (float): Cosine similarity to the matched query (1.0 for exact hits).
+        embedding (Optional[np.ndarray]): Query embedding computed for the semantic tier,
+            to be passed back to ``AnswerCache.put`` so it is not computed twice.
+    """
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    outcome: CacheOutcome = "miss"
+    answer: Optional[str] = None
+    similarity: float = 0.0
+    embedding: Optional[np.ndarray] = None
+
+
+class _Entry(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    answer: str
+    embedding: Optional[np.ndarray] = None
+    signature: Tuple[FrozenSet[str], FrozenSet[str]] = (frozenset(), frozenset())
+    expires_at: float
+
+
+class AnswerCache:
+    """
+    Two-tier cache of generated answers.
+
+    The exact tier matches normalized query text; the semantic tier reuses the answer of
+    the most similar cached query when their embeddings' cosine similarity reaches
+    ``threshold`` and both name the same entities (from ``entities_fn``) and numbers:
+    "Oxford tuition for MSc CS" never gets the Cambridge answer. Entries expire after ``ttl`` seconds, the least recently used ones are
+    evicted beyond ``max_entries``, and everything is dropped when ``version_fn`` reports
+    a new graph version (i.e. after re-ingestion).
+    """
+
+    def __init__(
+        self,
+        embed_fn: Optional[Callable[[str], List[float]]] = None,
+        ttl: float = 3600.0,
+        max_entries: int = 1024,
+        threshold: float = 0.95,
+        version_fn: Optional[Callable[[], str]] = None,
+        clock: Callable[[], float] = time.monotonic,
+        entities_fn: Optional[Callable[[], Sequence[str]]] = None,
+    ):
+        """
+        Initializes the AnswerCache.
+
+        Args:
+            embed_fn (Optional[Callable[[str], List[float]]]): Query embedding function;
+                None disables the semantic tier.
+            ttl (float): Seconds an answer stays valid.
+            max_entries (int): Capacity before least recently used answers are evicted.
+            threshold (float): Minimum cosine similarity for a semantic hit.
+            version_fn (Optional[Callable[[], str]]): Returns the current graph version;
+                the cache is cleared whenever it changes.
+            clock (Callable[[], float]): Time source, in seconds.
+            entities_fn (Optional[Callable[[], Sequence[str]]]): Returns the known entity
+                names (e.g. universities) a semantic hit must agree on.
+        """
+        self.embed_fn = embed_fn
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.version_fn = version_fn
+        self.clock = clock
+        self.entities_fn = entities_fn
+        self.hits = {"exact": 0, "semantic": 0}
+        self.misses = 0
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._version = version_fn() if version_fn else ""
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def invalidate(self) -> None:
+        """Drops every cached answer."""
+        with self._lock:
+            self._entries.clear()
+
+    def _check_version(self) -> None:
+        if self.version_fn is None:
+            return
+        version = self.version_fn()
+        if version != self._version:
+            self._version = version
+            self._entries.clear()
+
+    def _purge_expired(self) -> None:
+        now = self.clock()
+        for key in [k for k, e in self._entries.items() if e.expires_at <= now]:
+            del self._entries[key]
+
+    def _embed(self, query: str) -> Optional[np.ndarray]:
+        if self.embed_fn is None:
+            return None
+        vector = np.asarray(self.embed_fn(query), dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def signature(self, query: str) -> Tuple[FrozenSet[str], FrozenSet[str]]:
+        """The entities and numbers named in ``query``; semantic hits must match them exactly."""
+        names = mentioned_names(query, self.entities_fn()) if self.entities_fn else []
+        numbers = NUMBER.findall(query)
+        return frozenset(n.lower() for n in names), frozenset(n.replace(",", "") for n in numbers)
+
+    def lookup(self, query: str) -> CacheLookup:
+        """
+        Looks up an answer for ``query``, trying the exact tier before the semantic one.
+
+        Args:
+            query (str): User query.
+
+        Returns:
+            CacheLookup: The hit, or a miss carrying the query embedding (if computed).
+        """
+        key = normalize_query(query)
+        with self._lock:
+            self._check_version()
+            self._purge_expired()
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits["exact"] += 1
+                return CacheLookup(outcome="exact", answer=entry.answer, similarity=1.0)
+            candidates = [(k, e.embedding, e.signature) for k, e in self._entries.items() if e.embedding is not None]
+
+        embedding = self._embed(query)
+        if embedding is not None and candidates:
+            signature = self.signature(query)
+            candidates = [(k, vector) for k, vector, other in candidates if other == signature]
+        if embedding is not None and candidates:
+            keys, vectors = zip(*candidates)
+            similarities = np.stack(vectors) @ embedding
+            best = int(np.argmax(similarities))
+            if similarities[best] >= self.threshold:
+                with self._lock:
+                    entry = self._entries.get(keys[best])
+                    if entry is not None:
+                        self._entries.move_to_end(keys[best])
+                        self.hits["semantic"] += 1
+                        return CacheLookup(outcome="semantic", answer=entry.answer,
+                                           similarity=float(similarities[best]), embedding=embedding)
+        with self._lock:
+            self.misses += 1
+        return CacheLookup(embedding=embedding)
+
+    def put(self, query: str, answer: str, embedding: Optional[np.ndarray] = None) -> None:
+        """
+        Caches ``answer`` for ``query``.
+
+        Args:
+            query (str): User query.
+            answer (str): Generated answer.
+            embedding (Optional[np.ndarray]): Normalized query embedding from ``lookup``;
+                computed here if missing and a semantic tier is configured.
+        """
+        if embedding is None:
+            embedding = self._embed(query)
+        signature = self.signature(query) if embedding is not None else (frozenset(), frozenset())
+        key = normalize_query(query)
+        with self._lock:
+            self._check_version()
+            self._entries[key] = _Entry(answer=answer, embedding=embedding, signature=signature,
+                                        expires_at=self.clock() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
@@ -0,0 +1,177 @@
+import os
+import re
+import hashlib
+import logging
+import time
+from typing import Any, Callable, List, Optional, Sequence, Set
+from llama_index.core.bridge.pydantic import Field, PrivateAttr
+from llama_index.core.postprocessor.types import BaseNodePostprocessor
+from llama_index.core.schema import MetadataMode, NodeWithScore, QueryBundle
+from src.ingestion.cleaner import LINK_LINE_RESIDUE, MARKDOWN_LINK, estimate_tokens
+from src.retrieval.sessions import content_terms
+from src.telemetry import CONTEXT_TOKENS, CONTEXT_TOKENS_SAVED, span
+
+logger = logging.getLogger(__name__)
+
+# Chunks kept after reranking, and the token budget of their compressed text.
+RERANK_TOP_N = int(os.getenv("RERANK_TOP_N", "4"))
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1200"))
+# Word-shingle Jaccard similarity above which a chunk duplicates a better-ranked one.
+CONTEXT_DUPLICATE_THRESHOLD = float(os.getenv("CONTEXT_DUPLICATE_THRESHOLD", "0.7"))
+
+# [text](url) links, replaced by their text; sentence ends within a line.
+LINK = re.compile(r'!?\[([^\]]*)\]\([^)]*\)')
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+(?=[A-Z0-9"(])')
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Splits chunk markdown into sentences, dropping navigation: lines made only of links
+    lose nothing of value, other links keep their text.
+    """
+    sentences = []
+    for line in text.splitlines():
+        if not line.strip() or (MARKDOWN_LINK.search(line) and LINK_LINE_RESIDUE.match(MARKDOWN_LINK.sub("", line))):
+            continue
+        line = " ".join(LINK.sub(r"\1", line).split())
+        sentences.extend(s for s in SENTENCE_END.split(line) if len(s) > 2)
+    return sentences
+
+
+def _stem(word: str) -> str:
+    return word[:-1] if len(word) > 3 and word.endswith("s") else word
+
+
+def _shingles(text: str, size: int = 4) -> Set[str]:
+    words = re.findall(r"\w+", text.lower())
+    return {
+        hashlib.md5(" ".join(words[i:i + size]).encode("utf-8")).hexdigest()
+        for i in range(max(len(words) - size + 1, 1))
+    }
+
+
+class ContextCompressor(BaseNodePostprocessor):
+    """
+    Shrinks the retrieved context before synthesis: reranks chunks with a local CPU
+    cross-encoder, drops near-duplicates of better-ranked chunks, keeps the best
+    ``top_n`` and, within ``token_budget``, only their sentences that share words with
+    the question (best-ranked chunks first, remaining budget filled with their lead text).
+    Graph summaries (nodes with a ``summary_level``) are already condensed and are passed
+    through whole, so list questions still see every university.
+    """
+
+    top_n: int = Field(default=RERANK_TOP_N, description="Chunks kept after reranking.")
+    token_budget: int = Field(default=CONTEXT_TOKEN_BUDGET, description="Estimated tokens of kept text.")
+    duplicate_threshold: float = Field(default=CONTEXT_DUPLICATE_THRESHOLD, description="Shingle Jaccard of duplicates.")
+    _score_fn: Optional[Callable[[str, List[str]], Sequence[float]]] = PrivateAttr(default=None)
+    _rerank_disabled: bool = PrivateAttr(default=False)
+
+    def __init__(self, score_fn: Optional[Callable[[str, List[str]], Sequence[float]]] = None, **kwargs: Any):
+        """
+        Initializes the ContextCompressor.
+
+        Args:
+            score_fn (Optional[Callable]): Scores ``(query, texts)`` pairs, higher is more
+                relevant (default: the shared FastEmbed cross-encoder, loaded on first use).
+        """
+        super().__init__(**kwargs)
+        self._score_fn = score_fn
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "ContextCompressor"
+
+    def rerank(self, query: str, nodes: List[NodeWithScore]) -> List[NodeWithScore]:
+        """
+        Orders ``nodes`` by cross-encoder relevance to ``query``. If the model cannot be
+        loaded, the retrieval order is kept (and reranking is not retried).
+        """
+        if self._rerank_disabled or len(nodes) < 2:
+            return list(nodes)
+        try:
+            if self._score_fn is None:
+                from src.models import get_reranker
+
+                self._score_fn = get_reranker().rerank
+            scores = list(self._score_fn(query, [n.node.get_content() for n in nodes]))
+        except Exception as e:
+            logger.warning(f"Reranking disabled, keeping retrieval order: {e}")
+            self._rerank_disabled = True
+            return list(nodes)
+        ranked = sorted(zip(scores, range(len(nodes))), key=lambda pair: (-pair[0], pair[1]))
+        return [NodeWithScore(node=nodes[i].node, score=float(score)) for score, i in ranked]
+
+    def dedupe(self, nodes: List[NodeWithScore]) -> List[NodeWithScore]:
+        """Drops chunks that are near-duplicates of a better-ranked one."""
+        kept: List[NodeWithScore] = []
+        seen: List[Set[str]] = []
+        for node in nodes:
+            shingles = _shingles(node.node.get_content())
+            if any(len(shingles & other) >= self.duplicate_threshold * len(shingles | other) for other in seen):
+                continue
+            kept.append(node)
+            seen.append(shingles)
+        return kept
+
+    def compress(self, query: str, nodes: List[NodeWithScore]) -> List[NodeWithScore]:
+        """
+        Keeps the sentences of ``nodes`` most relevant to ``query`` within the token budget.
+        Sentences matching more of the question's words come first, ties going to the
+        better-ranked chunk and the earlier sentence; each chunk keeps its sentence order.
+
+        Returns:
+            List[NodeWithScore]: Copies of the nodes with compressed text (chunks left
+            without any sentence are dropped); the input nodes are not modified.
+        """
+        terms = {_stem(t) for t in content_terms(query)}
+        candidates = []
+        split = [split_sentences(n.node.get_content()) for n in nodes]
+        for rank, sentences in enumerate(split):
+            for position, sentence in enumerate(sentences):
+                words = {_stem(w) for w in re.findall(r"\w+", sentence.lower())}
+                candidates.append((-len(terms & words), rank, position))
+        budget, chosen = self.token_budget, set()
+        for _, rank, position in sorted(candidates):
+            cost = estimate_tokens(split[rank][position])
+            if cost <= budget:
+                chosen.add((rank, position))
+                budget -= cost
+        if not chosen and candidates:
+            # Not even one sentence fits: keep the best one rather than no context at all.
+            chosen.add(min(candidates)[1:])
+        compressed = []
+        for rank, (node, sentences) in enumerate(zip(nodes, split)):
+            text = " ".join(s for position, s in enumerate(sentences) if (rank, position) in chosen)
+            if text:
+                copy = node.node.model_copy()
+                copy.set_content(text)
+                compressed.append(NodeWithScore(node=copy, score=node.score))
+        return compressed
+
+    def _postprocess_nodes(
+        self, nodes: List[NodeWithScore], query_bundle: Optional[QueryBundle] = None
+    ) -> List[NodeWithScore]:
+        if not nodes or query_bundle is None:
+            return nodes
+        summaries = [n for n in nodes if "summary_level" in n.node.metadata]
+        chunks = [n for n in nodes if "summary_level" not in n.node.metadata]
+        if not chunks:
+            return nodes
+        started = time.perf_counter()
+        query = query_bundle.query_str
+        before = sum(estimate_tokens(n.node.get_content(metadata_mode=MetadataMode.LLM)) for n in chunks)
+        with span("rerank"):
+            ranked = self.rerank(query, chunks)
+        with span("dedupe"):
+            unique = self.dedupe(ranked)[:self.top_n]
+        with span("extract_sentences"):
+            compressed = self.compress(query, unique)
+        after = sum(estimate_tokens(n.node.get_content(metadata_mode=MetadataMode.LLM)) for n in compressed)
+        CONTEXT_TOKENS.labels("retrieved").inc(before)
+        CONTEXT_TOKENS.labels("kept").inc(after)
+        CONTEXT_TOKENS_SAVED.observe(before - after)
+        logger.info(
+            f"Context: {len(chunks)} chunks / ~{before} tokens -> {len(compressed)} chunks / ~{after} tokens "
+            f"in {(time.perf_counter() - started) * 1000:.0f} ms"
+        )
+        return summaries + compressed
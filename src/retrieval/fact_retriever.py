@@ -0,0 +1,212 @@
+import re
+import logging
+import time
+from typing import List, Optional, Sequence
+from pydantic import BaseModel
+from src.ingestion.facts import (
+    FactQuery,
+    FactRecord,
+    FactStore,
+    cycle_day,
+    normalize_period,
+    parse_date,
+    parse_money,
+)
+
+logger = logging.getLogger(__name__)
+
+FIELD_WORDS = [
+    ("toefl", re.compile(r"\btoefl\b", re.I)),
+    ("ielts", re.compile(r"\bielts\b", re.I)),
+    ("deadline", re.compile(r"\b(deadlines?|due|apply by|closing dates?)\b", re.I)),
+    ("fee", re.compile(r"\b(tuition|fees?|costs?|expensive|cheap(?:er|est)?)\b", re.I)),
+]
+OPERATORS = [
+    ("<=", re.compile(r"\b(at most|no more than|up to|on or before)\b", re.I)),
+    (">=", re.compile(r"\b(at least|no less than|on or after|minimum of)\b", re.I)),
+    ("<", re.compile(r"\b(before|earlier than|under|below|less than|cheaper than|lower than)\b|<", re.I)),
+    (">", re.compile(r"\b(after|later than|over|above|more than|higher than|greater than)\b|>", re.I)),
+]
+AGGREGATES = [
+    ("count", re.compile(r"\bhow many\b", re.I)),
+    ("avg", re.compile(r"\b(average|mean)\b", re.I)),
+    ("min", re.compile(r"\b(cheapest|lowest|earliest|minimum|smallest|least expensive)\b", re.I)),
+    ("max", re.compile(r"\b(most expensive|highest|latest|maximum|largest)\b", re.I)),
+]
+CURRENCY_WORDS = {"pounds": "GBP", "dollars": "USD", "euros": "EUR"}
+PERIOD = re.compile(r"\b(?:per|a|each)\s+(year|annum|term|semester|quarter)\b|\b(annual|yearly)\b", re.I)
+# Questions whose subject is the universities themselves ("Which universities ...").
+UNIVERSITY_SUBJECT = re.compile(
+    r"\b(?:which|what|list|all|any)\s+(?:(?:of\s+)?the\s+|all\s+)?(?:universit(?:y|ies)|schools?|colleges?)\b", re.I
+)
+NUMBER = re.compile(r"\b(\d+(?:\.\d+)?)\b")
+
+
+class FactAnswer(BaseModel):
+    """
+    Answer produced from the fact table, with the rows it is based on.
+    """
+    answer: str
+    query: FactQuery
+    records: List[FactRecord] = []
+    elapsed_ms: float = 0.0
+
+
+def mentioned_names(text: str, names: Sequence[str]) -> List[str]:
+    """
+    Names (e.g. universities) mentioned in ``text`` as whole words, case-insensitively,
+    in order of appearance: "MIT" is found in "MIT's fees" but not in "submit".
+    """
+    found = []
+    for name in names:
+        match = name and re.search(rf"(?<!\w){re.escape(name)}(?!\w)", text, re.I)
+        if match:
+            found.append((match.start(), name))
+    return [name for _, name in sorted(found)]
+
+
+def _first(patterns, text: str) -> Optional[str]:
+    for name, pattern in patterns:
+        if pattern.search(text):
+            return name
+    return None
+
+
+def parse_fact_query(question: str, universities: List[str]) -> Optional[FactQuery]:
+    """
+    Recognizes filter/sort/aggregate questions about deadlines, fees and test minima.
+
+    Args:
+        question (str): User question.
+        universities (List[str]): Known university names, matched case-insensitively.
+
+    Returns:
+        Optional[FactQuery]: The structured request, or None if the question is not one
+            the fact table can answer on its own.
+    """
+    field = _first(FIELD_WORDS, question)
+    if field is None:
+        return None
+    op = _first(OPERATORS, question)
+    aggregate = _first(AGGREGATES, question) or "list"
+    # Only comparisons, superlatives and questions about the universities themselves are
+    # table questions; "Which scholarships cover tuition fees at Oxford?" needs the graph.
+    if op is None and aggregate == "list" and not UNIVERSITY_SUBJECT.search(question):
+        return None
+
+    lowered = question.lower()
+    query = FactQuery(
+        field=field,
+        aggregate=aggregate,
+        universities=mentioned_names(question, universities),
+        limit=3 if aggregate in ("min", "max") else 20,
+    )
+    for word, code in CURRENCY_WORDS.items():
+        if word in lowered:
+            query.currency = code
+    period = PERIOD.search(question)
+    if period and field == "fee":
+        query.period = "year" if period.group(2) else normalize_period(period.group(1))
+
+    if op is not None:
+        if field == "deadline":
+            parsed = parse_date(question)
+            if parsed:
+                year, month, day = parsed
+                query.op = op
+                if year:
+                    query.deadline_date = f"{year:04d}-{month:02d}-{day:02d}"
+                else:
+                    query.value = cycle_day(month, day)
+        elif field == "fee":
+            money = parse_money(question)
+            if money is None:
+                number = re.search(r"\b(\d[\d,]*(?:\.\d+)?)\s*(k\b)?", question, re.I)
+                if number:
+                    money = (float(number.group(1).replace(",", "")) * (1000 if number.group(2) else 1), None)
+            # A bare amount cannot be compared with fees in several currencies.
+            if money and (money[1] or query.currency):
+                query.op, query.value = op, money[0]
+                query.currency = money[1] or query.currency
+        else:
+            number = NUMBER.search(question)
+            if number:
+                query.op, query.value = op, float(number.group(1))
+    if op is not None and query.op is None:
+        return None
+    return query
+
+
+def _describe(record: FactRecord, field: str) -> str:
+    if field == "deadline":
+        value = record.deadline or f"{record.deadline_day} {_month_name(record.deadline_month)}"
+    elif field == "fee":
+        value = f"{record.fee_currency} {record.fee_amount:,.0f}" + (f" per {record.fee_period}" if record.fee_period else "")
+    elif field == "toefl":
+        value = f"TOEFL {record.toefl_min}"
+    else:
+        value = f"IELTS {record.ielts_min}"
+    program = f" ({record.program})" if record.program else ""
+    return f"- {record.university}{program}: {value} — {record.evidence} [{record.source_url}]"
+
+
+def _format_average(unit: str, value: float) -> str:
+    # Fee units read "GBP per year"; test score averages have none.
+    if not unit:
+        return f"{value:.1f}"
+    currency, _, period = unit.partition(" ")
+    return f"{currency} {value:,.0f}" + (f" {period}" if period else "")
+
+
+def _month_name(month: Optional[int]) -> str:
+    names = ["January", "February", "March", "April", "May", "June", "July", "August",
+             "September", "October", "November", "December"]
+    return names[month - 1] if month else ""
+
+
+class FactQueryEngine:
+    """
+    Answers filter/sort/aggregate questions (deadlines, tuition, TOEFL/IELTS minima)
+    directly from the ``FactStore`` in milliseconds, without retrieval or an LLM call.
+    """
+
+    def __init__(self, store: FactStore):
+        """
+        Initializes the FactQueryEngine.
+
+        Args:
+            store (FactStore): Fact table filled at ingestion.
+        """
+        self.store = store
+
+    def answer(self, question: str) -> Optional[FactAnswer]:
+        """
+        Answers ``question`` from the fact table.
+
+        Args:
+            question (str): User question.
+
+        Returns:
+            Optional[FactAnswer]: The answer, or None if the question is not a table
+                question or no facts match (callers then fall back to the graph).
+        """
+        started = time.perf_counter()
+        query = parse_fact_query(question, self.store.universities())
+        if query is None:
+            return None
+        result = self.store.query(query)
+        if not result.records and not result.values:
+            return None
+
+        if query.aggregate == "count":
+            total = int(sum(result.values.values()))
+            text = f"{total} {'university matches' if total == 1 else 'universities match'}."
+        elif query.aggregate == "avg":
+            text = "Average: " + ", ".join(
+                _format_average(unit, value) for unit, value in result.values.items()
+            )
+        else:
+            text = "\n".join(_describe(record, query.field) for record in result.records)
+        elapsed = (time.perf_counter() - started) * 1000
+        logger.info(f"Answered from the fact table ({query.field}, {query.aggregate}) in {elapsed:.1f} ms")
+        return FactAnswer(answer=text, query=query, records=result.records, elapsed_ms=elapsed)
@@ -1,11 +1,23 @@
 import os
+import re
+import asyncio
 import logging
+import time
+from typing import Any, Dict, List, Optional
 from dotenv import load_dotenv
-from llama_index.core import PropertyGraphIndex, Settings
+from llama_index.core import PropertyGraphIndex, QueryBundle, Settings
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.core.query_engine import RetrieverQueryEngine
+from llama_index.core.retrievers import BaseRetriever
+from llama_index.core.schema import NodeWithScore, TextNode
+from llama_index.core.vector_stores.types import MetadataFilter, MetadataFilters, VectorStoreQuery
 from llama_index.graph_stores.neo4j import Neo4jPropertyGraphStore
-from llama_index.embeddings.fastembed import FastEmbedEmbedding
-from llama_index.llms.gemini import Gemini
 import nest_asyncio
+from src.ingestion.manifest import graph_version
+from src.ingestion.vector_index import FILTER_FIELDS, get_vector_store
+from src.models import configure_settings
+from src.retrieval.summary_retriever import RoutingRetriever, SummaryRetriever
+from src.telemetry import span
 
 # Apply nest_asyncio to help with async event loops in scripts/notebooks
 nest_asyncio.apply()
@@ -21,10 +33,174 @@ load_dotenv()
 NEO4J_URI = os.getenv("NEO4J_URI", "bolt://localhost:7687")
 NEO4J_USERNAME = os.getenv("NEO4J_USERNAME", "neo4j")
 NEO4J_PASSWORD = os.getenv("NEO4J_PASSWORD", "password")
-GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 
-if not GOOGLE_API_KEY:
-    logger.warning("GOOGLE_API_KEY not found. Gemini LLM may fail.")
+# Chunks mentioning entities whose names match the query terms (fulltext index), ranked by
+# match score, with the triplets extracted from each chunk about those entities.
+GRAPH_EXPANSION_QUERY = """
+CALL db.index.fulltext.queryNodes('entity_name_fulltext', $search, {limit: $entity_limit})
+YIELD node AS e, score
+MATCH (c:Chunk)-[:MENTIONS]->(e)
+WHERE ($university IS NULL OR c.university = $university) AND ($type IS NULL OR c.type = $type)
+WITH c, sum(score) AS score, collect(e) AS entities
+ORDER BY score DESC LIMIT $top_k
+CALL (c, entities) {
+    UNWIND entities AS a
+    MATCH (a)-[r]->(b:`__Entity__`)
+    WHERE r.triplet_source_id = c.id
+    RETURN collect(DISTINCT a.name + ' ' + type(r) + ' ' + b.name)[..$triplet_limit] AS triplets
+}
+RETURN c.id AS id, c.text AS text, c.url AS url, c.title AS title, c.university AS university,
+       c.type AS type, score, triplets
+"""
+
+STOPWORDS = {
+    "the", "and", "for", "are", "what", "which", "who", "how", "does", "did", "about", "tell",
+    "with", "from", "that", "this", "there", "their", "into", "can", "you", "any", "all", "its",
+    "is", "in", "of", "to", "a", "an", "me", "do", "at", "on", "or", "be", "by",
+}
+
+
+def fulltext_search_terms(query: str) -> str:
+    """Turns a question into a Lucene OR-query of its content words (no special syntax)."""
+    words = [w for w in re.findall(r"\w+", query.lower()) if len(w) > 2 and w not in STOPWORDS]
+    return " OR ".join(dict.fromkeys(words))
+
+
+class HybridGraphRetriever(BaseRetriever):
+    """
+    Retrieves chunks by ANN search in Qdrant and by entity lookup plus one-hop expansion in
+    Neo4j, running both concurrently, and fuses the two rankings with reciprocal rank fusion.
+
+    Vector search cost stays flat as the corpus grows (HNSW in Qdrant, payload-indexed
+    filters), while the graph side only touches the entities named in the question.
+    """
+
+    def __init__(
+        self,
+        vector_store: Any,
+        graph_store: Any,
+        embed_model: BaseEmbedding,
+        similarity_top_k: int = 5,
+        graph_top_k: int = 5,
+        entity_limit: int = 20,
+        triplet_limit: int = 10,
+        rrf_k: int = 60,
+        filters: Optional[Dict[str, str]] = None,
+    ):
+        """
+        Initializes the HybridGraphRetriever.
+
+        Args:
+            vector_store (Any): ``QdrantVectorStore`` holding one point per graph chunk.
+            graph_store (Any): Property graph store answering ``structured_query``.
+            embed_model (BaseEmbedding): Embedding model used at ingestion.
+            similarity_top_k (int): Chunks returned after fusion (and fetched from Qdrant).
+            graph_top_k (int): Chunks fetched through graph expansion.
+            entity_limit (int): Entities matched in the fulltext index.
+            triplet_limit (int): Triplets attached to each graph-retrieved chunk.
+            rrf_k (int): Reciprocal rank fusion constant.
+            filters (Optional[Dict[str, str]]): Default metadata filters, e.g.
+                ``{"university": "Stanford"}``; only keys in ``FILTER_FIELDS`` apply.
+        """
+        super().__init__()
+        self.vector_store = vector_store
+        self.graph_store = graph_store
+        self.embed_model = embed_model
+        self.similarity_top_k = similarity_top_k
+        self.graph_top_k = graph_top_k
+        self.entity_limit = entity_limit
+        self.triplet_limit = triplet_limit
+        self.rrf_k = rrf_k
+        self.filters = filters or {}
+
+    def _filters(self, filters: Optional[Dict[str, str]]) -> Dict[str, str]:
+        merged = {**self.filters, **(filters or {})}
+        return {k: v for k, v in merged.items() if k in FILTER_FIELDS and v}
+
+    def _vector_search(self, query: str, filters: Dict[str, str]) -> List[NodeWithScore]:
+        with span("embed_query"):
+            embedding = self.embed_model.get_query_embedding(query)
+        with span("vector_search"):
+            result = self.vector_store.query(VectorStoreQuery(
+                query_embedding=embedding,
+                similarity_top_k=self.similarity_top_k,
+                filters=MetadataFilters(filters=[MetadataFilter(key=k, value=v) for k, v in filters.items()])
+                if filters else None,
+            ))
+        return [
+            NodeWithScore(node=node, score=score)
+            for node, score in zip(result.nodes or [], result.similarities or [])
+        ]
+
+    def _graph_search(self, query: str, filters: Dict[str, str]) -> List[NodeWithScore]:
+        search = fulltext_search_terms(query)
+        if not search:
+            return []
+        with span("graph_search"):
+            rows = self.graph_store.structured_query(GRAPH_EXPANSION_QUERY, param_map={
+                "search": search,
+                "university": filters.get("university"),
+                "type": filters.get("type"),
+                "entity_limit": self.entity_limit,
+                "top_k": self.graph_top_k,
+                "triplet_limit": self.triplet_limit,
+            })
+        results = []
+        for row in rows or []:
+            metadata = {k: row[k] for k in ("url", "title", "university", "type") if row.get(k) is not None}
+            if row.get("triplets"):
+                metadata["graph_facts"] = row["triplets"]
+            results.append(NodeWithScore(node=TextNode(id_=row["id"], text=row["text"] or "", metadata=metadata),
+                                         score=row["score"]))
+        return results
+
+    def fuse(self, *rankings: List[NodeWithScore]) -> List[NodeWithScore]:
+        """
+        Reciprocal rank fusion: a chunk scores ``sum(1 / (rrf_k + rank))`` over the rankings
+        it appears in. Graph facts found for a chunk are merged into its metadata.
+        """
+        fused: Dict[str, NodeWithScore] = {}
+        for ranking in rankings:
+            for rank, hit in enumerate(ranking, 1):
+                score = 1.0 / (self.rrf_k + rank)
+                if hit.node.node_id not in fused:
+                    fused[hit.node.node_id] = NodeWithScore(node=hit.node, score=score)
+                    continue
+                current = fused[hit.node.node_id]
+                current.score += score
+                for key, value in hit.node.metadata.items():
+                    current.node.metadata.setdefault(key, value)
+        return sorted(fused.values(), key=lambda hit: hit.score, reverse=True)[:self.similarity_top_k]
+
+    async def aretrieve_filtered(self, query: str, filters: Optional[Dict[str, str]] = None) -> List[NodeWithScore]:
+        """Retrieves fused results for ``query`` restricted by metadata ``filters``."""
+        filters = self._filters(filters)
+        started = time.perf_counter()
+        vector_hits, graph_hits = await asyncio.gather(
+            asyncio.to_thread(self._vector_search, query, filters),
+            asyncio.to_thread(self._graph_search, query, filters),
+            return_exceptions=True,
+        )
+        rankings = []
+        for name, hits in (("vector", vector_hits), ("graph", graph_hits)):
+            if isinstance(hits, BaseException):
+                logger.warning(f"Hybrid retrieval: {name} search failed: {hits}")
+                continue
+            rankings.append(hits)
+        if not rankings:
+            raise vector_hits
+        results = self.fuse(*rankings)
+        logger.info(
+            f"Hybrid retrieval: {len(results)} results from {[len(r) for r in rankings]} "
+            f"vector/graph hits in {(time.perf_counter() - started) * 1000:.0f} ms"
+        )
+        return results
+
+    async def _aretrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+        return await self.aretrieve_filtered(query_bundle.query_str)
+
+    def _retrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+        return asyncio.run(self._aretrieve(query_bundle))
 
 def get_query_engine():
     """
@@ -32,8 +208,7 @@ def get_query_engine():
     """
     
     # 1. Setup LLM & Embedding (Must match ingestion settings for consistency)
-    Settings.embed_model = FastEmbedEmbedding(model_name="BAAI/bge-small-en-v1.5")
-    Settings.llm = Gemini(model="models/gemini-2.5-flash", api_key=GOOGLE_API_KEY)
+    configure_settings()
 
     # 2. Connect to Neo4j Graph Store
     try:
@@ -46,24 +221,48 @@ def get_query_engine():
         logger.error(f"Failed to connect to Neo4j: {e}")
         raise e
 
-    # 3. Load Index from existing Graph Store
-    # We use PropertyGraphIndex.from_existing to load the index structure
-    # that is already present in Neo4j.
-    logger.info("Loading PropertyGraphIndex from Neo4j...")
-    
-    index = PropertyGraphIndex.from_existing(
-        property_graph_store=graph_store,
-        llm=Settings.llm,
-        embed_model=Settings.embed_model
-    )
-    
-    # 4. Create Query Engine
-    # Using the higher-level 'as_query_engine' which abstracts the retrieval
-    # and answer generation.
-    query_engine = index.as_query_engine(
-        include_text=True, # Include text from nodes in the context
-        similarity_top_k=5 # How many nodes to retrieve
-    )
-    
+    # 3. Prefer hybrid retrieval (Qdrant ANN + Neo4j expansion) when the chunk collection exists.
+    retriever = None
+    try:
+        vector_store = get_vector_store()
+        if vector_store.client.collection_exists(vector_store.collection_name):
+            retriever = HybridGraphRetriever(vector_store, graph_store, Settings.embed_model, similarity_top_k=5)
+            logger.info("Hybrid (Qdrant + Neo4j) retriever created.")
+        else:
+            logger.warning("Qdrant chunk collection not found; falling back to graph-only retrieval.")
+    except Exception as e:
+        logger.warning(f"Qdrant unavailable ({e}); falling back to graph-only retrieval.")
+
+    # 4. Otherwise load the PropertyGraphIndex already present in Neo4j and use its
+    # retriever, including the text of the retrieved nodes in the context.
+    if retriever is None:
+        logger.info("Loading PropertyGraphIndex from Neo4j...")
+        index = PropertyGraphIndex.from_existing(
+            property_graph_store=graph_store,
+            llm=Settings.llm,
+            embed_model=Settings.embed_model
+        )
+        retriever = index.as_retriever(include_text=True, similarity_top_k=5)
+
+    # 5. Create Query Engine
+    # Global questions (which universities, comparisons) are answered from the precomputed
+    # university/community summaries instead of a handful of chunks; questions chaining
+    # several facts follow graph paths within a traversal budget.
+    from src.retrieval.multihop_retriever import MultiHopRetriever, TraversalBudget
+
+    summaries = SummaryRetriever(graph_store, Settings.embed_model, version_fn=graph_version)
+    multihop = MultiHopRetriever(graph_store, TraversalBudget())
+    query_engine = RetrieverQueryEngine.from_args(RoutingRetriever(retriever, summaries, multihop), llm=Settings.llm)
+
     logger.info("Query Engine created.")
     return query_engine
+
+def get_streaming_query_engine(query_engine: RetrieverQueryEngine) -> RetrieverQueryEngine:
+    """
+    Returns a streaming counterpart of ``query_engine``: it shares the retriever, but its
+    ``aquery`` returns an ``AsyncStreamingResponse`` yielding tokens as the LLM produces them.
+
+    Args:
+        query_engine (RetrieverQueryEngine): Engine returned by ``get_query_engine``.
+    """
+    return RetrieverQueryEngine.from_args(query_engine.retriever, llm=Settings.llm, streaming=True)
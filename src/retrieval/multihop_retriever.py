@@ -0,0 +1,295 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Literal, Optional, Tuple
+import neo4j
+from llama_index.core import QueryBundle
+from llama_index.core.async_utils import asyncio_run
+from llama_index.core.retrievers import BaseRetriever
+from llama_index.core.schema import NodeWithScore, TextNode
+from pydantic import BaseModel
+from src.retrieval.graph_retriever import fulltext_search_terms
+from src.telemetry import span
+
+logger = logging.getLogger(__name__)
+
+SEED_QUERY = """
+CALL db.index.fulltext.queryNodes('entity_name_fulltext', $search, {limit: $limit})
+YIELD node, score
+RETURN node.id AS id, node.name AS name, score
+"""
+
+# One hop from every frontier entity, at most $fan_out edges each, never back into
+# already visited entities. Edges are followed in both directions.
+HOP_QUERY = """
+UNWIND $frontier AS id
+MATCH (a:`__Entity__` {id: id})
+CALL (a) {
+    MATCH (a)-[r]-(b:`__Entity__`)
+    WHERE NOT b.id IN $visited
+    RETURN r, b LIMIT $fan_out
+}
+RETURN a.id AS source, type(r) AS relation, startNode(r) = a AS outgoing,
+       b.id AS target, b.name AS name, r.triplet_source_id AS chunk_id
+"""
+
+CHUNK_QUERY = """
+MATCH (c:Chunk) WHERE c.id IN $ids
+RETURN c.id AS id, c.text AS text, c.url AS url, c.title AS title, c.university AS university, c.type AS type
+"""
+
+StopReason = Literal["complete", "hops", "nodes", "time"]
+
+
+class TraversalBudget(BaseModel):
+    """
+    Limits of one traversal.
+
+    Attributes:
+        max_hops (int): Edges per path.
+        max_nodes (int): Distinct entities visited, seeds included.
+        fan_out (int): Edges followed from each frontier entity per hop.
+        max_paths (int): Paths kept after each hop.
+        seed_limit (int): Entities matched from the question.
+        chunk_limit (int): Source chunks returned.
+        time_budget_ms (float): Wall-clock budget; on expiry the paths found so far are returned.
+    """
+    max_hops: int = 3
+    max_nodes: int = 200
+    fan_out: int = 25
+    max_paths: int = 50
+    seed_limit: int = 5
+    chunk_limit: int = 5
+    time_budget_ms: float = 1500.0
+
+
+class GraphPath(BaseModel):
+    """
+    A path from a seed entity, as triplets ("A RELATION B", in the stored edge direction).
+    """
+    entities: List[str]
+    triplets: List[str] = []
+    chunk_ids: List[str] = []
+    score: float = 0.0
+
+    @property
+    def text(self) -> str:
+        return "; ".join(self.triplets)
+
+
+class HopStats(BaseModel):
+    """
+    Cost of one hop.
+
+    Attributes:
+        hop (int): 1-based hop number.
+        frontier (int): Entities expanded.
+        edges (int): Edges returned by the hop query.
+        paths (int): Paths after the hop (capped at ``max_paths``).
+        elapsed_ms (float): Time spent on the hop.
+    """
+    hop: int
+    frontier: int
+    edges: int
+    paths: int
+    elapsed_ms: float
+
+
+class TraversalResult(BaseModel):
+    """
+    Outcome of ``MultiHopRetriever.atraverse``: the paths found, per-hop statistics and
+    why the traversal stopped ("complete" if it ran out of new entities).
+    """
+    seeds: List[str] = []
+    paths: List[GraphPath] = []
+    hops: List[HopStats] = []
+    nodes_visited: int = 0
+    stopped: StopReason = "complete"
+    elapsed_ms: float = 0.0
+
+
+class MultiHopRetriever(BaseRetriever):
+    """
+    Follows multi-hop chains in the entity graph (e.g. University -OFFERS-> Program
+    -REQUIRES-> TOEFL_Score) with one bounded Cypher query per hop, so that latency is
+    capped by the hop, node and time budgets rather than by the graph's shape. Returns the
+    chunks the paths were extracted from, with the paths in their ``graph_paths`` metadata.
+    """
+
+    def __init__(self, graph_store: Any, budget: Optional[TraversalBudget] = None):
+        """
+        Initializes the MultiHopRetriever.
+
+        Args:
+            graph_store (Any): Property graph store answering ``structured_query``.
+            budget (Optional[TraversalBudget]): Default limits; each query may override them.
+        """
+        super().__init__()
+        self.graph_store = graph_store
+        self.budget = budget or TraversalBudget()
+
+    def _query(self, query: str, params: Dict[str, Any], timeout: float) -> List[Dict[str, Any]]:
+        """
+        Runs ``query`` on the graph store. On Neo4j it runs as a transaction with a
+        ``timeout`` (seconds), so the server cancels it once the budget is spent rather
+        than finishing it for nobody.
+        """
+        driver = getattr(self.graph_store, "_driver", None)
+        if driver is None:
+            return self.graph_store.structured_query(query, param_map=params)
+        records, _, _ = driver.execute_query(
+            neo4j.Query(query, timeout=timeout),
+            parameters_=params,
+            database_=getattr(self.graph_store, "_database", None),
+        )
+        return [record.data() for record in records]
+
+    async def _run(self, query: str, params: Dict[str, Any], deadline: float) -> Optional[List[Dict[str, Any]]]:
+        """Runs ``query`` in a thread; None if it does not finish before ``deadline``."""
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            return None
+        try:
+            rows = await asyncio.wait_for(asyncio.to_thread(self._query, query, params, remaining), remaining)
+        except asyncio.TimeoutError:
+            return None
+        except neo4j.exceptions.Neo4jError as e:
+            if "TimedOut" not in (e.code or ""):
+                raise
+            return None
+        return rows or []
+
+    async def atraverse(self, query: str, budget: Optional[TraversalBudget] = None) -> TraversalResult:
+        """
+        Expands paths from the entities named in ``query`` hop by hop within ``budget``.
+
+        Args:
+            query (str): User question; its content words are matched against entity names.
+            budget (Optional[TraversalBudget]): Limits for this query (default: the retriever's).
+
+        Returns:
+            TraversalResult: Paths found (partial if a budget ran out) and per-hop statistics.
+        """
+        budget = budget or self.budget
+        started = time.perf_counter()
+        deadline = started + budget.time_budget_ms / 1000
+        result = TraversalResult()
+
+        search = fulltext_search_terms(query)
+        seeds = await self._run(SEED_QUERY, {"search": search, "limit": budget.seed_limit}, deadline) if search else []
+        if seeds is None:
+            result.stopped = "time"
+            seeds = []
+        names = {row["id"]: row["name"] for row in seeds}
+        result.seeds = list(names.values())
+        paths = [GraphPath(entities=[row["id"]], score=row["score"]) for row in seeds]
+        visited = set(names)
+
+        for hop in range(1, budget.max_hops + 1):
+            if result.stopped != "complete":
+                break
+            frontier = list(dict.fromkeys(path.entities[-1] for path in paths if len(path.entities) == hop))
+            if not frontier:
+                break
+            hop_started = time.perf_counter()
+            rows = await self._run(HOP_QUERY, {
+                "frontier": frontier, "visited": list(visited), "fan_out": budget.fan_out,
+            }, deadline)
+            if rows is None:
+                result.stopped = "time"
+                break
+
+            kept: List[GraphPath] = []
+            extended: List[GraphPath] = []
+            edges: Dict[str, List[Dict[str, Any]]] = {}
+            for row in rows:
+                edges.setdefault(row["source"], []).append(row)
+            for path in paths:
+                before = len(extended)
+                for row in edges.get(path.entities[-1], []) if len(path.entities) == hop else []:
+                    if row["target"] in path.entities:
+                        continue
+                    if row["target"] not in visited:
+                        if len(visited) >= budget.max_nodes:
+                            result.stopped = "nodes"
+                            continue
+                        visited.add(row["target"])
+                    names[row["target"]] = row["name"]
+                    source, target = names.get(row["source"], row["source"]), row["name"]
+                    triplet = f"{source} {row['relation']} {target}" if row["outgoing"] else f"{target} {row['relation']} {source}"
+                    extended.append(GraphPath(
+                        entities=path.entities + [row["target"]],
+                        triplets=path.triplets + [triplet],
+                        chunk_ids=path.chunk_ids + ([row["chunk_id"]] if row.get("chunk_id") else []),
+                        score=path.score,
+                    ))
+                # Paths that could not be extended are complete answers in their own right.
+                if len(extended) == before and path.triplets:
+                    kept.append(path)
+            paths = kept + extended
+            paths = sorted(paths, key=lambda p: (len(p.triplets), p.score), reverse=True)[:budget.max_paths]
+            result.hops.append(HopStats(
+                hop=hop, frontier=len(frontier), edges=len(rows), paths=len(paths),
+                elapsed_ms=(time.perf_counter() - hop_started) * 1000,
+            ))
+            if not extended:
+                break
+            if hop == budget.max_hops and result.stopped == "complete":
+                result.stopped = "hops"
+
+        result.paths = [p for p in paths if p.triplets]
+        result.nodes_visited = len(visited)
+        result.elapsed_ms = (time.perf_counter() - started) * 1000
+        logger.info(
+            f"Multi-hop traversal: {len(result.paths)} paths from {len(result.seeds)} seeds, "
+            f"{result.nodes_visited} entities, stopped={result.stopped}, hops="
+            + ", ".join(f"{h.hop}:{h.paths} paths/{h.elapsed_ms:.0f}ms" for h in result.hops)
+            + f", {result.elapsed_ms:.0f} ms total"
+        )
+        return result
+
+    async def aretrieve_with_budget(self, query: str, budget: Optional[TraversalBudget] = None) -> List[NodeWithScore]:
+        """
+        Retrieves the source chunks of the paths found for ``query`` within ``budget``. If
+        the budget runs out before the chunks are fetched, the paths are returned as text.
+        """
+        budget = budget or self.budget
+        started = time.perf_counter()
+        traversal = await self.atraverse(query, budget)
+        if not traversal.paths:
+            return []
+
+        # Chunks ranked by the number of (longest-first) paths they support.
+        supported: Dict[str, List[GraphPath]] = {}
+        for path in traversal.paths:
+            for chunk_id in dict.fromkeys(path.chunk_ids):
+                supported.setdefault(chunk_id, []).append(path)
+        ranked: List[Tuple[str, List[GraphPath]]] = sorted(
+            supported.items(), key=lambda item: (max(len(p.triplets) for p in item[1]), len(item[1])), reverse=True
+        )[:budget.chunk_limit]
+
+        deadline = started + budget.time_budget_ms / 1000
+        rows = await self._run(CHUNK_QUERY, {"ids": [chunk_id for chunk_id, _ in ranked]}, deadline) if ranked else None
+        if not rows:
+            return [
+                NodeWithScore(node=TextNode(text=path.text, metadata={"graph_paths": [path.text]}), score=float(len(path.triplets)))
+                for path in traversal.paths[:budget.chunk_limit]
+            ]
+        by_id = {row["id"]: row for row in rows}
+        results = []
+        for chunk_id, chunk_paths in ranked:
+            row = by_id.get(chunk_id)
+            if row is None:
+                continue
+            metadata = {k: row[k] for k in ("url", "title", "university", "type") if row.get(k) is not None}
+            metadata["graph_paths"] = list(dict.fromkeys(p.text for p in chunk_paths))[:5]
+            results.append(NodeWithScore(node=TextNode(id_=chunk_id, text=row["text"] or "", metadata=metadata),
+                                         score=float(len(chunk_paths))))
+        return results
+
+    async def _aretrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+        with span("multihop_search"):
+            return await self.aretrieve_with_budget(query_bundle.query_str)
+
+    def _retrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+        return asyncio_run(self._aretrieve(query_bundle))
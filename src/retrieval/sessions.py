@@ -0,0 +1,300 @@
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Set
+from pydantic import BaseModel, ConfigDict
+from src.retrieval.fact_retriever import mentioned_names
+
+# Follow-ups that only swap the subject of the previous question ("what about Oxford?").
+SWAP_FOLLOW_UP = re.compile(r"^\s*(?:and|what about|how about|same for|and for|what of)\b", re.I)
+# References to the university the conversation is about, with their replacement.
+REFERENCES = [
+    (re.compile(r"\b(?:its|their)\b", re.I), "{name}'s"),
+    (re.compile(r"\b(?:this|that|the same) (?:university|school|college|uni)\b", re.I), "{name}"),
+    (re.compile(r"(?<!\bis )(?<!\bare )\bthere\b", re.I), "at {name}"),
+    (re.compile(r"\b(?:it|they|them)\b", re.I), "{name}"),
+]
+STOPWORDS = {
+    "a", "about", "also", "an", "and", "are", "at", "be", "can", "do", "does", "for", "from", "how", "i", "in",
+    "is", "it", "its", "me", "much", "of", "on", "or", "s", "same", "tell", "that", "the", "their", "there",
+    "they", "this", "to", "was", "what", "when", "where", "which", "who", "why", "will", "with", "you",
+}
+
+CONDENSE_PROMPT = (
+    "Given the conversation below and a follow-up question, rewrite the follow-up as a "
+    "standalone question that names the universities it refers to. Reply with the question only.\n\n"
+    "Conversation:\n{history}\n\nFollow-up question: {query}\nStandalone question:"
+)
+
+
+def mentioned_entities(text: str, known: Sequence[str]) -> List[str]:
+    """Known entity names (e.g. universities) mentioned in ``text``, in order of appearance."""
+    return mentioned_names(text, known)
+
+
+def content_terms(text: str, exclude: Sequence[str] = ()) -> Set[str]:
+    """Lowercased content words of ``text``, without stopwords and the words of ``exclude``."""
+    excluded = {w for name in exclude for w in re.findall(r"\w+", name.lower())}
+    return {w for w in re.findall(r"\w+", text.lower()) if w not in STOPWORDS and w not in excluded and len(w) > 1}
+
+
+class Turn(BaseModel):
+    """
+    One exchange of a conversation.
+
+    Attributes:
+        query (str): The question as the user asked it.
+        standalone (str): The question rewritten to stand on its own.
+        answer (str): The answer given.
+        entities (List[str]): Universities the standalone question is about.
+    """
+    query: str
+    standalone: str
+    answer: str = ""
+    entities: List[str] = []
+
+
+class Session(BaseModel):
+    """
+    Server-side state of one conversation: recent turns and the nodes retrieved for the
+    last one, which follow-ups about the same universities reuse.
+
+    Attributes:
+        entities (List[str]): Universities the cached ``nodes`` cover.
+        size_bytes (int): Approximate memory held, for the store's cap.
+    """
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    id: str
+    turns: List[Turn] = []
+    nodes: List[Any] = []
+    entities: List[str] = []
+    last_used: float = 0.0
+    size_bytes: int = 0
+
+    @property
+    def focus(self) -> List[str]:
+        """Universities the conversation is currently about (those of the latest turn that named any)."""
+        for turn in reversed(self.turns):
+            if turn.entities:
+                return turn.entities
+        return self.entities
+
+    def history(self, turns: int = 4) -> str:
+        """The last ``turns`` exchanges as text, for an LLM condensation prompt."""
+        return "\n".join(f"User: {t.query}\nAssistant: {t.answer}" for t in self.turns[-turns:])
+
+    def record(self, turn: Turn, nodes: List[Any], max_turns: int, max_nodes: int) -> None:
+        """Appends ``turn`` and replaces the cached nodes with those it was answered from."""
+        self.turns = (self.turns + [turn])[-max_turns:]
+        self.nodes = list(nodes)[:max_nodes]
+        self.entities = sorted({n.node.metadata["university"] for n in self.nodes if n.node.metadata.get("university")})
+        self.size_bytes = sum(len(t.query) + len(t.standalone) + len(t.answer) for t in self.turns) + sum(
+            len(n.node.get_content()) + len(str(n.node.metadata)) for n in self.nodes
+        )
+
+
+def condense_query(session: Session, query: str, known: Sequence[str]) -> str:
+    """
+    Rewrites a follow-up into a standalone question without an LLM call: references
+    ("its tuition", "deadlines there") are replaced by the university in focus, and a
+    follow-up that only names another university ("what about Oxford?") reuses the
+    previous question with that university swapped in.
+
+    Args:
+        session (Session): Conversation so far.
+        query (str): Follow-up question.
+        known (Sequence[str]): Known university names.
+
+    Returns:
+        str: The standalone question (``query`` itself if it already stands alone).
+    """
+    if not session.turns:
+        return query
+    focus, mentioned = session.focus, mentioned_entities(query, known)
+    previous = session.turns[-1].standalone
+    if mentioned and SWAP_FOLLOW_UP.search(query) and len(content_terms(query, mentioned)) == 0:
+        replaced = mentioned_entities(previous, known)
+        if not replaced:
+            return query
+        return re.sub(re.escape(replaced[0]), " and ".join(mentioned), previous, count=1, flags=re.I)
+    if mentioned or not focus:
+        return query
+    name = " and ".join(focus)
+    for pattern, replacement in REFERENCES:
+        rewritten = pattern.sub(replacement.format(name=name), query, count=1)
+        if rewritten != query:
+            return SWAP_FOLLOW_UP.sub("", rewritten).strip()
+    if SWAP_FOLLOW_UP.search(query):
+        # Elliptical follow-up without a reference ("and the deadlines?"): scope it to the focus.
+        return f"{SWAP_FOLLOW_UP.sub('', query).strip().rstrip('?')} at {name}?"
+    return query
+
+
+def llm_condenser(llm: Any) -> Callable[[Session, str, Sequence[str]], Awaitable[str]]:
+    """
+    Returns an async condenser that asks ``llm`` to rewrite follow-ups, for phrasings the
+    rule-based ``condense_query`` does not resolve. Costs one LLM call per follow-up.
+    """
+    async def condense(session: Session, query: str, known: Sequence[str]) -> str:
+        if not session.turns or mentioned_entities(query, known):
+            return query
+        response = await llm.acomplete(CONDENSE_PROMPT.format(history=session.history(), query=query))
+        return str(response).strip() or query
+
+    return condense
+
+
+class RetrievalPlan(BaseModel):
+    """
+    What a turn needs from the retrievers, as decided by ``plan_retrieval``.
+
+    Attributes:
+        reuse (List[Any]): Cached nodes of the previous turn still relevant to this one.
+        lookup (bool): Run a full retrieval for the question.
+        new_entities (List[str]): Universities not in context yet, each looked up on its own.
+    """
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    reuse: List[Any] = []
+    lookup: bool = False
+    new_entities: List[str] = []
+
+
+def plan_retrieval(session: Session, standalone: str, known: Sequence[str], coverage: float = 0.5) -> RetrievalPlan:
+    """
+    Decides which lookups a turn needs. Cached nodes are reused for universities already
+    in context if they contain at least ``coverage`` of the question's content words;
+    universities new to the conversation get their own (filtered) lookup.
+
+    Args:
+        session (Session): Conversation so far.
+        standalone (str): The turn's standalone question.
+        known (Sequence[str]): Known university names.
+        coverage (float): Share of content words the cached nodes must contain to be reused.
+
+    Returns:
+        RetrievalPlan: Nodes to reuse and lookups to run.
+    """
+    mentioned = mentioned_entities(standalone, known)
+    if not session.nodes:
+        return RetrievalPlan(lookup=True)
+    in_context = [e for e in mentioned if e in session.entities] if mentioned else list(session.entities)
+    new = [e for e in mentioned if e not in session.entities]
+    reuse = [n for n in session.nodes if n.node.metadata.get("university") in in_context]
+    terms = content_terms(standalone, mentioned)
+    text = " ".join(n.node.get_content().lower() for n in reuse)
+    covered = bool(reuse) and (not terms or sum(t in text for t in terms) >= coverage * len(terms))
+    if not covered:
+        # The cached context does not answer this question: look everything up again.
+        return RetrievalPlan(lookup=True)
+    return RetrievalPlan(reuse=reuse, new_entities=new)
+
+
+async def run_plan(retriever: Any, plan: RetrievalPlan, query: str) -> List[Any]:
+    """
+    Executes a retrieval plan with ``retriever``. New universities are looked up with a
+    university filter when the retriever supports one (``aretrieve_filtered``), otherwise
+    with one unfiltered lookup.
+
+    Returns:
+        List[Any]: Reused nodes followed by newly retrieved ones, without duplicates.
+    """
+    from llama_index.core import QueryBundle
+
+    results: List[Any] = list(plan.reuse)
+    if plan.lookup:
+        results += await retriever.aretrieve(QueryBundle(query))
+    elif plan.new_entities:
+        inner = getattr(retriever, "retriever", retriever)
+        if hasattr(inner, "aretrieve_filtered"):
+            for entity in plan.new_entities:
+                results += await inner.aretrieve_filtered(query, {"university": entity})
+        else:
+            results += await retriever.aretrieve(QueryBundle(query))
+    unique: Dict[str, Any] = {}
+    for node in results:
+        unique.setdefault(node.node.node_id, node)
+    return list(unique.values())
+
+
+class SessionStore:
+    """
+    In-memory conversation sessions. Sessions idle for ``ttl`` seconds are dropped, and the
+    least recently used ones are evicted beyond ``max_sessions`` or ``max_bytes`` in total.
+    """
+
+    def __init__(
+        self,
+        ttl: float = 1800.0,
+        max_sessions: int = 1000,
+        max_bytes: int = 64 * 1024 * 1024,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initializes the SessionStore.
+
+        Args:
+            ttl (float): Idle seconds before a session expires.
+            max_sessions (int): Capacity before least recently used sessions are evicted.
+            max_bytes (int): Approximate memory cap over all sessions' turns and nodes.
+            clock (Callable[[], float]): Time source, in seconds.
+        """
+        self.ttl = ttl
+        self.max_sessions = max_sessions
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self.size_bytes = 0
+        self.evictions = 0
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._sizes: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def _evict(self) -> None:
+        now = self.clock()
+        while self._sessions:
+            session = next(iter(self._sessions.values()))
+            over = len(self._sessions) > self.max_sessions or self.size_bytes > self.max_bytes
+            if not over and now - session.last_used < self.ttl:
+                break
+            self._sessions.popitem(last=False)
+            self.size_bytes -= self._sizes.pop(session.id, 0)
+            self.evictions += 1
+
+    def create(self) -> Session:
+        """Starts a new, empty session."""
+        return self.get(uuid.uuid4().hex)
+
+    def get(self, session_id: str) -> Session:
+        """Returns the session ``session_id``, starting a new one if it is unknown or expired."""
+        with self._lock:
+            self._evict()
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = Session(id=session_id)
+                self._sessions[session_id] = session
+            self._sessions.move_to_end(session_id)
+            session.last_used = self.clock()
+            return session
+
+    def save(self, session: Session) -> None:
+        """Stores ``session`` after a turn, accounting for its new size."""
+        with self._lock:
+            self._sessions.pop(session.id, None)
+            session.last_used = self.clock()
+            self._sessions[session.id] = session
+            self.size_bytes += session.size_bytes - self._sizes.get(session.id, 0)
+            self._sizes[session.id] = session.size_bytes
+            self._evict()
+
+    def delete(self, session_id: str) -> bool:
+        """Ends a session; False if it did not exist."""
+        with self._lock:
+            session = self._sessions.pop(session_id, None)
+            self.size_bytes -= self._sizes.pop(session_id, 0)
+            return session is not None
@@ -0,0 +1,193 @@
+import re
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Callable, List, Literal, Optional
+import numpy as np
+from llama_index.core import QueryBundle
+from llama_index.core.retrievers import BaseRetriever
+from llama_index.core.schema import NodeWithScore, TextNode
+from src.llm_router import classify_query
+from src.retrieval.fact_retriever import mentioned_names
+from src.telemetry import span
+
+logger = logging.getLogger(__name__)
+
+Route = Literal["graph", "summaries", "multihop"]
+
+SUMMARY_LOAD_QUERY = """
+MATCH (s:Summary)
+RETURN s.id AS id, s.level AS level, s.name AS name, s.text AS text,
+       s.universities AS universities, s.embedding AS embedding
+ORDER BY s.level DESC, s.name
+"""
+
+# Questions about the corpus as a whole: answered from every university's summary.
+LIST_PATTERNS = [
+    re.compile(r"\b(which|what) (universities|schools|colleges)\b", re.I),
+    re.compile(r"\b(list|name|show)\b.*\b(universities|schools|colleges)\b", re.I),
+    re.compile(r"\bhow many (universities|schools|colleges)\b", re.I),
+    re.compile(r"\b(in|from) (the|your) (database|data|graph|knowledge base)\b", re.I),
+]
+# Questions spanning several universities: answered from the most similar summaries.
+GLOBAL_PATTERNS = [
+    re.compile(r"\b(compare|comparison|comparing|versus|vs\.?|differences? between|similarities)\b", re.I),
+    re.compile(r"\b(all|every|each|across|most|overall) (of the )?(universities|schools|colleges)\b", re.I),
+    re.compile(r"\b(overview|summar(y|ize|ise)|common themes?|trends?)\b", re.I),
+]
+
+
+class SummaryRetriever(BaseRetriever):
+    """
+    Retrieves the precomputed university and community summaries written by
+    ``GraphSummarizer``. The summaries are few, so they are loaded into memory (again
+    whenever ``version_fn`` changes) and ranked by cosine similarity in process.
+    """
+
+    def __init__(
+        self,
+        graph_store: Any,
+        embed_model: Any,
+        top_k: int = 8,
+        max_list: int = 50,
+        version_fn: Optional[Callable[[], str]] = None,
+    ):
+        """
+        Initializes the SummaryRetriever.
+
+        Args:
+            graph_store (Any): Property graph store answering ``structured_query``.
+            embed_model (Any): Embedding model the summaries were embedded with.
+            top_k (int): Summaries returned for comparison/overview questions.
+            max_list (int): University summaries returned for "which universities" questions.
+            version_fn (Optional[Callable[[], str]]): Returns the current graph version;
+                summaries are reloaded whenever it changes.
+        """
+        super().__init__()
+        self.graph_store = graph_store
+        self.embed_model = embed_model
+        self.top_k = top_k
+        self.max_list = max_list
+        self.version_fn = version_fn
+        self._lock = threading.Lock()
+        self._version: Optional[str] = None
+        self._rows: List[dict] = []
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+
+    def _load(self) -> List[dict]:
+        version = self.version_fn() if self.version_fn else ""
+        with self._lock:
+            if self._version is not None and version == self._version:
+                return self._rows
+            started = time.perf_counter()
+            rows = [row for row in self.graph_store.structured_query(SUMMARY_LOAD_QUERY) or [] if row.get("text")]
+            matrix = np.array([row["embedding"] or [] for row in rows], dtype=np.float32) if rows else np.zeros((0, 0))
+            if matrix.ndim == 2 and matrix.size:
+                matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+            self._rows, self._matrix, self._version = rows, matrix, version
+            logger.info(f"Loaded {len(rows)} graph summaries in {(time.perf_counter() - started) * 1000:.0f} ms")
+            return rows
+
+    @property
+    def universities(self) -> List[str]:
+        """Universities that have a summary."""
+        return [row["name"] for row in self._load() if row["level"] == "university"]
+
+    def _mentioned(self, query: str) -> List[str]:
+        return mentioned_names(query, self.universities)
+
+    def is_global(self, query: str) -> bool:
+        """
+        Whether ``query`` is a global question: about the corpus as a whole, or comparing
+        or spanning several universities. Always False before any summary exists.
+        """
+        if not self._load():
+            return False
+        if any(p.search(query) for p in LIST_PATTERNS + GLOBAL_PATTERNS):
+            return True
+        return len(self._mentioned(query)) >= 2
+
+    def _node(self, row: dict, score: float) -> NodeWithScore:
+        metadata = {"summary_level": row["level"], "name": row["name"], "universities": row["universities"] or []}
+        return NodeWithScore(node=TextNode(id_=row["id"], text=row["text"], metadata=metadata), score=score)
+
+    def _retrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+        rows = self._load()
+        if not rows:
+            return []
+        query = query_bundle.query_str
+        if any(p.search(query) for p in LIST_PATTERNS):
+            return [self._node(row, 1.0) for row in rows if row["level"] == "university"][:self.max_list]
+
+        # Summaries of universities named in the question come first, then by similarity.
+        embedding = np.asarray(self.embed_model.get_query_embedding(query), dtype=np.float32)
+        embedding /= max(float(np.linalg.norm(embedding)), 1e-12)
+        scores = self._matrix @ embedding if self._matrix.size else np.zeros(len(rows))
+        mentioned = set(self._mentioned(query))
+        order = sorted(
+            range(len(rows)),
+            key=lambda i: (not (rows[i]["level"] == "university" and rows[i]["name"] in mentioned), -scores[i]),
+        )
+        top_k = max(self.top_k, len(mentioned))
+        return [self._node(rows[i], float(scores[i])) for i in order[:top_k]]
+
+    async def _aretrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+        with span("summary_search"):
+            return await asyncio.to_thread(self._retrieve, query_bundle)
+
+
+class RoutingRetriever(BaseRetriever):
+    """
+    Sends global questions (which universities, comparisons, overviews) to the graph
+    summaries, questions that chain several facts to the budgeted multi-hop traversal and
+    everything else to per-chunk retrieval. A route that finds nothing falls back to
+    per-chunk retrieval.
+    """
+
+    def __init__(self, retriever: BaseRetriever, summaries: SummaryRetriever, multihop: Optional[BaseRetriever] = None):
+        """
+        Initializes the RoutingRetriever.
+
+        Args:
+            retriever (BaseRetriever): Per-chunk retriever, e.g. ``HybridGraphRetriever``.
+            summaries (SummaryRetriever): Retriever over the precomputed summaries.
+            multihop (Optional[BaseRetriever]): Bounded traversal for reasoning questions,
+                e.g. ``MultiHopRetriever``; None sends them to ``retriever``.
+        """
+        super().__init__()
+        self.retriever = retriever
+        self.summaries = summaries
+        self.multihop = multihop
+
+    def route(self, query: str) -> Route:
+        """Returns which retriever answers ``query``."""
+        try:
+            if self.summaries.is_global(query):
+                return "summaries"
+        except Exception as e:
+            logger.warning(f"Summary routing unavailable, using per-chunk retrieval: {e}")
+        if self.multihop is not None and classify_query(query) == "reasoning":
+            return "multihop"
+        return "graph"
+
+    def _routed(self, route: Route) -> Optional[BaseRetriever]:
+        return {"summaries": self.summaries, "multihop": self.multihop}.get(route)
+
+    async def _aretrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+        route = await asyncio.to_thread(self.route, query_bundle.query_str)
+        routed = self._routed(route)
+        if routed is not None:
+            results = await routed.aretrieve(query_bundle)
+            if results:
+                logger.info(f"Routed to {route}: {len(results)} nodes.")
+                return results
+        return await self.retriever.aretrieve(query_bundle)
+
+    def _retrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
+        routed = self._routed(self.route(query_bundle.query_str))
+        if routed is not None:
+            results = routed.retrieve(query_bundle)
+            if results:
+                return results
+        return self.retriever.retrieve(query_bundle)
@@ -0,0 +1,65 @@
+import sys
+import os
+
+# Ensure the src directory is in the python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.retrieval.answer_cache import AnswerCache, normalize_query
+
+VOCABULARY = ["stanford", "oxford", "fees", "tell", "about", "university"]
+
+
+def keyword_embedding(text):
+    text = text.lower()
+    return [float(word in text) for word in VOCABULARY]
+
+
+def test_exact_and_semantic_tiers():
+    cache = AnswerCache(embed_fn=keyword_embedding, threshold=0.85)
+    assert cache.lookup("Tell me about Stanford.").outcome == "miss"
+    lookup = cache.lookup("Tell me about Stanford.")
+    cache.put("Tell me about Stanford.", "Stanford is in California.", embedding=lookup.embedding)
+
+    assert normalize_query("  tell me   about STANFORD? ") == "tell me about stanford"
+    hit = cache.lookup("tell me about stanford")
+    assert (hit.outcome, hit.answer) == ("exact", "Stanford is in California.")
+
+    hit = cache.lookup("Tell me about Stanford University")
+    assert hit.outcome == "semantic" and 0.85 <= hit.similarity < 1.0
+    assert cache.lookup("Tell me about Oxford").outcome == "miss"
+    assert cache.hits == {"exact": 1, "semantic": 1} and cache.misses == 3
+
+
+def test_semantic_tier_requires_same_entities_and_numbers():
+    # An embedding blind to the university and the number, like a small model can be.
+    cache = AnswerCache(embed_fn=lambda text: [1.0, 0.0], entities_fn=lambda: ["Oxford", "Cambridge"])
+    cache.put("Oxford tuition for MSc CS", "£39,000.")
+    assert cache.lookup("Cambridge tuition for MSc CS").outcome == "miss"
+    assert cache.lookup("Oxford tuition for the MSc CS").outcome == "semantic"
+    cache.put("Is a 7.0 IELTS enough for Oxford?", "Yes.")
+    assert cache.lookup("Is a 6.5 IELTS enough for Oxford?").outcome == "miss"
+
+
+def test_ttl_lru_and_invalidation():
+    now = [0.0]
+    version = ["v1"]
+    cache = AnswerCache(ttl=10, max_entries=2, clock=lambda: now[0], version_fn=lambda: version[0])
+    cache.put("a", "A")
+    cache.put("b", "B")
+    cache.lookup("a")
+    cache.put("c", "C")
+    # "b" was the least recently used entry.
+    assert [cache.lookup(q).outcome for q in ("a", "b", "c")] == ["exact", "miss", "exact"]
+
+    now[0] = 11.0
+    assert cache.lookup("a").outcome == "miss"
+
+    cache.put("a", "A")
+    version[0] = "v2"  # the graph was re-ingested
+    assert cache.lookup("a").outcome == "miss" and len(cache) == 0
+
+
+if __name__ == "__main__":
+    test_exact_and_semantic_tiers()
+    test_semantic_tier_requires_same_entities_and_numbers()
+    test_ttl_lru_and_invalidation()
@@ -0,0 +1,57 @@
+import sys
+import os
+
+# Ensure the src directory is in the python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from llama_index.core.schema import NodeWithScore, QueryBundle, TextNode
+from src.retrieval.context_compressor import ContextCompressor, split_sentences
+
+NAVIGATION = "\n".join(f"* [Menu item {i}](https://example.edu/{i})" for i in range(12))
+TUITION = (
+    f"{NAVIGATION}\n# Fees\nTuition for the MSc is $62,000 per year. "
+    "Students also pay a $500 campus fee. The library opens at 8am.\n"
+)
+DEADLINES = "The application deadline is January 5. Late applications are not reviewed."
+
+
+def _nodes(*texts):
+    return [NodeWithScore(node=TextNode(text=text, id_=f"n{i}"), score=1.0) for i, text in enumerate(texts)]
+
+
+def keyword_scores(query, texts):
+    return [sum(word in text.lower() for word in query.lower().split()) for text in texts]
+
+
+def test_split_sentences_drops_navigation():
+    sentences = split_sentences("* [Home](/)\n* [About](/about)\nSee [the fees page](/fees) for details. Apply now!")
+    assert sentences == ["See the fees page for details.", "Apply now!"]
+
+
+def test_rerank_dedupe_and_compress():
+    nodes = _nodes(DEADLINES, TUITION, TUITION.replace("8am", "9am"))
+    compressor = ContextCompressor(score_fn=keyword_scores, top_n=3, token_budget=25)
+    result = compressor.postprocess_nodes(nodes, query_bundle=QueryBundle("What is the tuition fee"))
+
+    # The tuition chunk is ranked first, its near-duplicate dropped, and only the
+    # sentences about fees fit in the budget; navigation is gone.
+    assert [n.node.node_id for n in result] == ["n1"]
+    assert result[0].node.get_content() == "# Fees Tuition for the MSc is $62,000 per year. Students also pay a $500 campus fee."
+    # The retrieved nodes are left untouched (sessions reuse them).
+    assert nodes[1].node.get_content() == TUITION
+
+
+def test_keeps_retrieval_order_without_reranker():
+    def unavailable(query, texts):
+        raise RuntimeError("model not downloaded")
+
+    compressor = ContextCompressor(score_fn=unavailable, token_budget=1000)
+    result = compressor.postprocess_nodes(_nodes(DEADLINES, TUITION), query_bundle=QueryBundle("deadline"))
+    assert [n.node.node_id for n in result] == ["n0", "n1"]
+    assert "Menu item" not in result[1].node.get_content()
+
+
+if __name__ == "__main__":
+    test_split_sentences_drops_navigation()
+    test_rerank_dedupe_and_compress()
+    test_keeps_retrieval_order_without_reranker()
@@ -0,0 +1,79 @@
+import sys
+import os
+
+# Ensure the src directory is in the python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.ingestion.facts import FactRecord, FactStore
+from src.retrieval.fact_retriever import FactQueryEngine, parse_fact_query
+
+UNIVERSITIES = ["Harvard", "Oxford", "Stanford"]
+
+
+def test_parse_questions():
+    query = parse_fact_query("Which universities have a deadline before January 1?", UNIVERSITIES)
+    assert (query.field, query.op, query.value) == ("deadline", "<", 5 * 31 + 1)
+    query = parse_fact_query("Which universities have tuition under £30k?", UNIVERSITIES)
+    assert (query.field, query.op, query.value, query.currency) == ("fee", "<", 30000.0, "GBP")
+    query = parse_fact_query("What is the cheapest tuition at Oxford?", UNIVERSITIES)
+    assert (query.aggregate, query.universities) == ("min", ["Oxford"])
+    # Names match whole words only: "limit" does not name MIT.
+    query = parse_fact_query("Which universities let you apply by the deadline limit before December 1?", ["MIT", "Oxford"])
+    assert query.universities == []
+    assert parse_fact_query("Which is cheapest, MIT's or Oxford's tuition?", ["MIT", "Oxford"]).universities == ["MIT", "Oxford"]
+    # Open questions stay with the graph.
+    assert parse_fact_query("Tell me about Stanford.", UNIVERSITIES) is None
+    assert parse_fact_query("What are Oxford's fees like?", UNIVERSITIES) is None
+    assert parse_fact_query("Which scholarships cover tuition fees at Oxford?", UNIVERSITIES) is None
+    assert parse_fact_query("List the documents needed before the deadline at Harvard.", UNIVERSITIES) is None
+    # A bare amount says nothing about the currency of the fees it is compared with.
+    assert parse_fact_query("Which universities have tuition under 30,000?", UNIVERSITIES) is None
+    query = parse_fact_query("Which universities have tuition under 12,000 pounds per term?", UNIVERSITIES)
+    assert (query.op, query.value, query.currency, query.period) == ("<", 12000.0, "GBP", "term")
+
+
+def test_answers_from_table():
+    store = FactStore()
+    store.replace(["Harvard", "Oxford"], [
+        FactRecord(university="Harvard", deadline_month=11, deadline_day=1, source_url="https://harvard.edu/rea",
+                   evidence="Restrictive Early Action candidates apply by November 1."),
+        FactRecord(university="Harvard", deadline_month=1, deadline_day=1, source_url="https://harvard.edu/rd",
+                   evidence="Regular Decision candidates apply by January 1."),
+        FactRecord(university="Oxford", deadline="2025-10-15", deadline_month=10, deadline_day=15,
+                   fee_amount=39000, fee_currency="GBP", source_url="https://ox.ac.uk", evidence="..."),
+    ])
+    engine = FactQueryEngine(store)
+    answer = engine.answer("Which universities have a deadline before January 1?")
+    assert [r.university for r in answer.records] == ["Oxford", "Harvard"]
+    assert "https://harvard.edu/rea" in answer.answer and answer.elapsed_ms < 50
+    assert engine.answer("How many universities have a deadline before January 1?").answer == "2 universities match."
+    assert engine.answer("Which universities have tuition under $10k?") is None
+
+
+
+def test_fees_are_compared_per_currency_and_period():
+    store = FactStore()
+    fee = lambda university, amount, currency, period: FactRecord(
+        university=university, fee_amount=amount, fee_currency=currency, fee_period=period,
+        source_url=f"https://{university.lower()}.edu", evidence="...")
+    store.replace(UNIVERSITIES, [
+        fee("Harvard", 59000, "USD", "year"),
+        fee("Oxford", 9000, "GBP", "term"),
+        fee("Oxford", 30000, "GBP", "year"),
+        fee("Stanford", 62000, "USD", "year"),
+    ])
+    engine = FactQueryEngine(store)
+    # The cheapest fee in each unit, not 9,000 (GBP per term) against 59,000 (USD per year).
+    cheapest = engine.answer("What is the cheapest tuition?")
+    assert [(r.university, r.fee_period) for r in cheapest.records] == [
+        ("Oxford", "term"), ("Oxford", "year"), ("Harvard", "year"), ("Stanford", "year")]
+    assert [r.university for r in engine.answer("What is the cheapest tuition per year?").records] == [
+        "Oxford", "Harvard", "Stanford"]
+    average = engine.answer("What is the average tuition per year?").answer
+    assert average == "Average: GBP 30,000 per year, USD 60,500 per year"
+
+
+if __name__ == "__main__":
+    test_parse_questions()
+    test_answers_from_table()
+    test_fees_are_compared_per_currency_and_period()
@@ -0,0 +1,116 @@
+import sys
+import os
+import asyncio
+import time
+import uuid
+from typing import List
+
+# Ensure the src directory is in the python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from qdrant_client import QdrantClient
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.core.schema import NodeRelationship, RelatedNodeInfo, TextNode
+from src.ingestion.vector_index import delete_chunks, get_vector_store, index_chunks
+from src.retrieval.graph_retriever import HybridGraphRetriever, fulltext_search_terms
+
+VOCABULARY = ["stanford", "oxford", "fees", "deadline", "engineering"]
+
+
+class KeywordEmbedding(BaseEmbedding):
+    """Fake embedding model: one dimension per vocabulary word."""
+
+    def _vector(self, text: str) -> List[float]:
+        text = text.lower()
+        return [float(word in text) for word in VOCABULARY] + [0.1]
+
+    def _get_text_embedding(self, text: str) -> List[float]:
+        return self._vector(text)
+
+    def _get_query_embedding(self, query: str) -> List[float]:
+        return self._vector(query)
+
+    async def _aget_query_embedding(self, query: str) -> List[float]:
+        return self._vector(query)
+
+
+class SlowKeywordEmbedding(KeywordEmbedding):
+    """Keyword embedding whose query encoding takes 0.3s."""
+
+    def _get_query_embedding(self, query: str) -> List[float]:
+        time.sleep(0.3)
+        return self._vector(query)
+
+
+class FakeGraphStore:
+    """Stands in for Neo4j: returns fixed expansion rows after a delay."""
+
+    def __init__(self, rows, delay=0.0):
+        self.rows = rows
+        self.delay = delay
+        self.params = None
+
+    def structured_query(self, query, param_map=None):
+        time.sleep(self.delay)
+        self.params = param_map
+        return self.rows
+
+
+def _chunk(text, university, doc_id):
+    node = TextNode(id_=str(uuid.uuid4()), text=text, metadata={"university": university, "type": "sub_page"})
+    node.relationships[NodeRelationship.SOURCE] = RelatedNodeInfo(node_id=doc_id)
+    return node
+
+
+def _store():
+    vector_store = get_vector_store(QdrantClient(location=":memory:"), collection_name="test_chunks")
+    chunks = [
+        _chunk("Stanford tuition fees are $62,000.", "Stanford", "stanford-fees"),
+        _chunk("Stanford engineering deadline is 1 December.", "Stanford", "stanford-eng"),
+        _chunk("Oxford fees for overseas students.", "Oxford", "oxford-fees"),
+    ]
+    index_chunks(vector_store, chunks, KeywordEmbedding())
+    return vector_store, chunks
+
+
+def test_filtered_fusion():
+    vector_store, chunks = _store()
+    graph_row = {"id": chunks[1].node_id, "text": chunks[1].text, "url": None, "title": None,
+                 "university": "Stanford", "type": "sub_page", "score": 3.0,
+                 "triplets": ["Stanford OFFERS Engineering"]}
+    graph_store = FakeGraphStore([graph_row])
+    retriever = HybridGraphRetriever(vector_store, graph_store, KeywordEmbedding(), similarity_top_k=2)
+
+    results = asyncio.run(retriever.aretrieve_filtered("What are the fees?", {"university": "Stanford"}))
+    assert graph_store.params["university"] == "Stanford" and graph_store.params["search"] == "fees"
+    assert {r.node.metadata["university"] for r in results} == {"Stanford"}
+    # The engineering chunk is found by both searches and wins the fusion.
+    assert results[0].node.node_id == chunks[1].node_id
+    assert results[0].node.metadata["graph_facts"] == ["Stanford OFFERS Engineering"]
+
+
+def test_concurrent_and_resilient():
+    vector_store, chunks = _store()
+    retriever = HybridGraphRetriever(vector_store, FakeGraphStore([], delay=0.3), SlowKeywordEmbedding())
+    started = time.perf_counter()
+    asyncio.run(retriever.aretrieve_filtered("oxford fees"))
+    assert time.perf_counter() - started < 0.55
+
+    # A failing graph store degrades to vector-only results.
+    retriever.graph_store = None
+    results = retriever.retrieve("oxford fees")
+    assert results[0].node.node_id == chunks[2].node_id
+
+    delete_chunks(vector_store, ["oxford-fees"])
+    assert all(r.node.node_id != chunks[2].node_id for r in retriever.retrieve("oxford fees"))
+
+
+def test_search_terms():
+    assert fulltext_search_terms("Tell me about Stanford's fees?") == "stanford OR fees"
+    assert fulltext_search_terms("What is it?") == ""
+
+
+if __name__ == "__main__":
+    test_filtered_fusion()
+    test_concurrent_and_resilient()
+    test_search_terms()
@@ -0,0 +1,130 @@
+import sys
+import os
+import asyncio
+import time
+import neo4j
+
+# Ensure the src directory is in the python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.retrieval.multihop_retriever import (
+    CHUNK_QUERY,
+    HOP_QUERY,
+    SEED_QUERY,
+    MultiHopRetriever,
+    TraversalBudget,
+)
+
+# (source, relation, target, chunk)
+EDGES = [
+    ("Stanford", "OFFERS", "MS Computer Science", "c1"),
+    ("MS Computer Science", "REQUIRES", "TOEFL 100", "c2"),
+    ("TOEFL 100", "MEASURED_BY", "ETS", "c3"),
+    ("Stanford", "LOCATED_IN", "California", "c1"),
+] + [("Stanford", "OFFERS", f"Program {i}", "c4") for i in range(20)]
+
+
+class TraversalGraphStore:
+    """Evaluates the retriever's seed, hop and chunk queries over ``EDGES`` in Python."""
+
+    def __init__(self, hop_delay=0.0):
+        self.hop_delay = hop_delay
+        self.hops = 0
+
+    def structured_query(self, query, param_map=None):
+        params = param_map or {}
+        if query == SEED_QUERY:
+            words = params["search"].lower().split(" or ")
+            names = {n for edge in EDGES for n in (edge[0], edge[2])}
+            return [{"id": n, "name": n, "score": 1.0} for n in sorted(names) if n.lower() in words]
+        if query == HOP_QUERY:
+            self.hops += 1
+            time.sleep(self.hop_delay)
+            rows = []
+            for entity in params["frontier"]:
+                found = [
+                    {"source": entity, "relation": rel, "outgoing": src == entity,
+                     "target": dst if src == entity else src, "name": dst if src == entity else src, "chunk_id": chunk}
+                    for src, rel, dst, chunk in EDGES if entity in (src, dst)
+                ]
+                rows += [r for r in found if r["target"] not in params["visited"]][:params["fan_out"]]
+            return rows
+        if query == CHUNK_QUERY:
+            return [{"id": i, "text": f"Text of {i}.", "university": "Stanford"} for i in params["ids"]]
+        raise AssertionError(query)
+
+
+def test_multi_hop_paths():
+    retriever = MultiHopRetriever(TraversalGraphStore(), TraversalBudget(max_hops=2, fan_out=3))
+    result = asyncio.run(retriever.atraverse("What TOEFL score does Stanford require?"))
+    assert result.seeds == ["Stanford"]
+    assert result.stopped == "hops" and [h.hop for h in result.hops] == [1, 2]
+    assert result.paths[0].text == "Stanford OFFERS MS Computer Science; MS Computer Science REQUIRES TOEFL 100"
+    assert all(h.paths > 0 and h.elapsed_ms >= 0 for h in result.hops)
+
+    results = retriever.retrieve("What TOEFL score does Stanford require?")
+    assert results[0].node.node_id in ("c1", "c2")
+    assert results[0].node.metadata["graph_paths"][0].startswith("Stanford OFFERS MS Computer Science")
+
+
+def test_budgets_return_partial_results():
+    store = TraversalGraphStore()
+    retriever = MultiHopRetriever(store)
+    result = asyncio.run(retriever.atraverse("Stanford", TraversalBudget(max_nodes=5)))
+    assert result.stopped == "nodes" and result.nodes_visited == 5 and len(result.hops) == 1
+
+    # The second hop overruns the time budget: the first hop's paths are still returned.
+    store.hop_delay = 0.15
+    started = time.perf_counter()
+    result = asyncio.run(retriever.atraverse("Stanford", TraversalBudget(fan_out=3, time_budget_ms=250)))
+    assert time.perf_counter() - started < 0.35
+    assert result.stopped == "time" and len(result.hops) == 1 and result.paths
+
+
+class TransactionTimedOut(neo4j.exceptions.ClientError):
+    code = "Neo.ClientError.Transaction.TransactionTimedOut"
+
+
+class FakeDriver:
+    """Answers ``execute_query`` from a ``TraversalGraphStore``; queries slower than their timeout are cancelled."""
+
+    def __init__(self, store, hop_seconds):
+        self.store = store
+        self.hop_seconds = hop_seconds
+        self.timeouts = []
+
+    def execute_query(self, query, parameters_=None, database_=None):
+        self.timeouts.append(query.timeout)
+        if query.text == HOP_QUERY and self.hop_seconds > query.timeout:
+            raise TransactionTimedOut("The transaction has been terminated.")
+        return [FakeRecord(row) for row in self.store.structured_query(query.text, parameters_)], None, None
+
+
+class FakeRecord:
+    def __init__(self, row):
+        self.row = row
+
+    def data(self):
+        return self.row
+
+
+def test_neo4j_cancels_queries_over_budget():
+    store = TraversalGraphStore()
+    store._driver, store._database = FakeDriver(TraversalGraphStore(), hop_seconds=5.0), "neo4j"
+    retriever = MultiHopRetriever(store, TraversalBudget(time_budget_ms=500))
+    result = asyncio.run(retriever.atraverse("Stanford"))
+    # The hop query ran with the remaining budget as its transaction timeout.
+    assert result.stopped == "time" and result.seeds == ["Stanford"]
+    assert all(0 < timeout <= 0.5 for timeout in store._driver.timeouts)
+
+    # Sync retrieval works from inside a running event loop.
+    async def retrieve():
+        return MultiHopRetriever(TraversalGraphStore()).retrieve("What TOEFL score does Stanford require?")
+
+    assert asyncio.run(retrieve())
+
+
+if __name__ == "__main__":
+    test_multi_hop_paths()
+    test_budgets_return_partial_results()
+    test_neo4j_cancels_queries_over_budget()
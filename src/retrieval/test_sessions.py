@@ -0,0 +1,93 @@
+import sys
+import os
+import asyncio
+
+# Ensure the src directory is in the python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from llama_index.core.schema import NodeWithScore, TextNode
+from src.retrieval.sessions import (
+    Session, SessionStore, Turn, condense_query, plan_retrieval, run_plan,
+)
+
+KNOWN = ["Stanford", "Oxford", "MIT"]
+
+
+def _node(university, text, node_id=None):
+    node = TextNode(text=text, metadata={"university": university}, id_=node_id or f"{university}-{len(text)}")
+    return NodeWithScore(node=node, score=1.0)
+
+
+def _session(query="What is the tuition at Stanford?"):
+    session = Session(id="s")
+    nodes = [_node("Stanford", "Stanford tuition is $62,000 and the application deadline is January 5.")]
+    session.record(Turn(query=query, standalone=query, entities=["Stanford"]), nodes, max_turns=6, max_nodes=20)
+    return session
+
+
+class FilteredRetriever:
+    """Records which lookups ran."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def aretrieve(self, bundle):
+        self.calls.append(("all", None))
+        return [_node("Stanford", "Stanford facts.")]
+
+    async def aretrieve_filtered(self, query, filters):
+        self.calls.append(("filtered", filters["university"]))
+        return [_node(filters["university"], f"{filters['university']} tuition is £30,000.")]
+
+
+def test_condense_follow_ups():
+    session = _session()
+    assert condense_query(session, "And its deadlines?", KNOWN) == "Stanford's deadlines?"
+    assert condense_query(session, "Is housing guaranteed there?", KNOWN) == "Is housing guaranteed at Stanford?"
+    assert condense_query(session, "and the application deadline?", KNOWN) == "the application deadline at Stanford?"
+    assert condense_query(session, "What about Oxford?", KNOWN) == "What is the tuition at Oxford?"
+    # Standalone questions are left alone.
+    assert condense_query(session, "Which universities are in the UK?", KNOWN) == "Which universities are in the UK?"
+    assert condense_query(Session(id="new"), "And its deadlines?", KNOWN) == "And its deadlines?"
+    # "admitted" and "submit" do not name MIT.
+    assert condense_query(session, "How many students are admitted there?", KNOWN) == \
+        "How many students are admitted at Stanford?"
+    assert plan_retrieval(session, "When do I submit the application to Stanford?", KNOWN).new_entities == []
+
+
+def test_plan_reuses_context_and_looks_up_new_entities():
+    session = _session()
+    plan = plan_retrieval(session, "What is the application deadline at Stanford?", KNOWN)
+    assert not plan.lookup and len(plan.reuse) == 1 and plan.new_entities == []
+    # Cached nodes do not mention housing: look up again.
+    assert plan_retrieval(session, "Does Stanford guarantee student housing?", KNOWN).lookup
+
+    plan = plan_retrieval(session, "What is the tuition at Stanford and Oxford?", KNOWN)
+    assert plan.new_entities == ["Oxford"]
+    retriever = FilteredRetriever()
+    nodes = asyncio.run(run_plan(retriever, plan, "What is the tuition at Stanford and Oxford?"))
+    assert retriever.calls == [("filtered", "Oxford")]
+    assert [n.node.metadata["university"] for n in nodes] == ["Stanford", "Oxford"]
+
+
+def test_store_evicts_idle_and_oversized_sessions():
+    now = [0.0]
+    store = SessionStore(ttl=60, max_sessions=10, max_bytes=150, clock=lambda: now[0])
+    first = store.get("a")
+    first.record(Turn(query="q", standalone="q", answer="x" * 100), [], 6, 20)
+    store.save(first)
+    second = store.get("b")
+    second.record(Turn(query="q", standalone="q", answer="y" * 100), [], 6, 20)
+    store.save(second)
+    # Over the byte cap: the least recently used session went.
+    assert len(store) == 1 and store.get("b").turns and store.evictions == 1
+
+    now[0] = 61.0
+    assert store.get("b").turns == [] and store.evictions == 2
+    assert store.delete("b") and not store.delete("b")
+
+
+if __name__ == "__main__":
+    test_condense_follow_ups()
+    test_plan_reuses_context_and_looks_up_new_entities()
+    test_store_evicts_idle_and_oversized_sessions()
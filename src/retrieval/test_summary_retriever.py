@@ -0,0 +1,69 @@
+import sys
+import os
+
+# Ensure the src directory is in the python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from llama_index.core.retrievers import BaseRetriever
+from llama_index.core.schema import NodeWithScore, TextNode
+from src.retrieval.summary_retriever import SUMMARY_LOAD_QUERY, RoutingRetriever, SummaryRetriever
+from src.retrieval.test_hybrid_retriever import KeywordEmbedding
+
+SUMMARIES = [
+    ("university:Oxford", "university", "Oxford", "Oxford offers engineering; fees for overseas students vary."),
+    ("university:Stanford", "university", "Stanford", "Stanford engineering deadline is in December."),
+    ("community:ab12", "community", "Tuition", "Tuition fees are charged per year."),
+]
+
+
+class SummaryGraphStore:
+    def __init__(self, rows):
+        self.rows = rows
+        self.loads = 0
+
+    def structured_query(self, query, param_map=None):
+        assert query == SUMMARY_LOAD_QUERY
+        self.loads += 1
+        return self.rows
+
+
+class ChunkRetriever(BaseRetriever):
+    def _retrieve(self, query_bundle):
+        return [NodeWithScore(node=TextNode(id_="chunk", text="A chunk."), score=1.0)]
+
+
+def _rows():
+    embed = KeywordEmbedding()
+    return [{"id": i, "level": level, "name": name, "text": text, "universities": [name],
+             "embedding": embed.get_text_embedding(text)} for i, level, name, text in SUMMARIES]
+
+
+def test_routing():
+    version = ["1"]
+    store = SummaryGraphStore(_rows())
+    summaries = SummaryRetriever(store, KeywordEmbedding(), top_k=2, version_fn=lambda: version[0])
+    router = RoutingRetriever(ChunkRetriever(), summaries)
+
+    assert router.route("Tell me about Stanford's deadline.") == "graph"
+    assert [r.node.node_id for r in router.retrieve("Tell me about Stanford's deadline.")] == ["chunk"]
+
+    # Corpus-wide questions get every university summary.
+    results = router.retrieve("Which universities are in the database?")
+    assert [r.node.node_id for r in results] == ["university:Oxford", "university:Stanford"]
+
+    # Comparisons: the named universities first, then the most similar summaries.
+    assert router.route("Oxford or Stanford for engineering?") == "summaries"
+    # "Oxfordshire" is not Oxford: a single university, answered per chunk.
+    assert router.route("Can I live in Oxfordshire while studying at Stanford?") == "graph"
+    results = router.retrieve("Compare tuition fees at Oxford and Stanford")
+    assert [r.node.node_id for r in results] == ["university:Oxford", "university:Stanford"]
+    assert summaries.retrieve("Compare tuition fees")[0].node.node_id == "community:ab12"
+    assert store.loads == 1
+
+    # A new graph version reloads; without summaries everything goes to the chunks.
+    store.rows, version[0] = [], "2"
+    assert router.route("Which universities are in the database?") == "graph"
+
+
+if __name__ == "__main__":
+    test_routing()
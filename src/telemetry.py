@@ -0,0 +1,196 @@
+import contextvars
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator, List, Optional, Tuple
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+
+logger = logging.getLogger(__name__)
+
+# Hot-path instrumentation shared by the API, retrieval, ingestion and crawler. A span
+# costs two perf_counter calls and one histogram observation (a few microseconds), so it
+# stays on in production. Prometheus scrapes the API's /metrics; batch jobs log the
+# per-stage breakdown of their trace instead.
+
+STAGE_SECONDS = Histogram(
+    "unigraph_stage_seconds",
+    "Time spent in each pipeline stage.",
+    ["stage"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300),
+)
+STAGE_ERRORS = Counter("unigraph_stage_errors_total", "Pipeline stages that raised.", ["stage"])
+LLM_TOKENS = Counter("unigraph_llm_tokens_total", "LLM tokens processed, by kind (prompt or completion).", ["kind"])
+LLM_CALLS = Counter("unigraph_llm_calls_total", "LLM completion and chat calls.")
+CACHE_REQUESTS = Counter(
+    "unigraph_cache_requests_total",
+    "Cache lookups by cache (answer, extraction, embedding, crawl) and outcome.",
+    ["cache", "outcome"],
+)
+QUERY_ROUTES = Counter("unigraph_query_routes_total", "Answered queries by route.", ["route"])
+CRAWL_PAGES = Counter("unigraph_crawl_pages_total", "Crawled pages by outcome.", ["status"])
+LLM_ROUTE_CALLS = Counter(
+    "unigraph_llm_route_calls_total",
+    "Routed LLM calls by route, backend (local or cloud) and outcome (ok, error, fallback).",
+    ["route", "backend", "outcome"],
+)
+LLM_ROUTE_SECONDS = Histogram(
+    "unigraph_llm_route_seconds",
+    "Latency of successful routed LLM calls.",
+    ["route", "backend"],
+    buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120),
+)
+CONTEXT_TOKENS = Counter(
+    "unigraph_context_tokens_total",
+    "Synthesis context tokens before (retrieved) and after (kept) reranking and compression.",
+    ["stage"],
+)
+CONTEXT_TOKENS_SAVED = Histogram(
+    "unigraph_context_tokens_saved",
+    "Context tokens removed per query by reranking and compression.",
+    buckets=(0, 100, 250, 500, 1000, 2000, 4000, 8000, 16000),
+)
+LLM_COST = Counter("unigraph_llm_cost_usd_total", "Estimated LLM spend in USD, by route and backend.", ["route", "backend"])
+
+
+class Trace:
+    """
+    Spans recorded while handling one request or batch job, in completion order.
+    Spans from worker threads started with ``asyncio.to_thread`` are included.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.spans: List[Tuple[str, float]] = []
+        self._lock = threading.Lock()
+
+    def add(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self.spans.append((stage, seconds))
+
+    def totals(self) -> List[Tuple[str, float]]:
+        """Seconds per stage, summed over repeated spans, in first-seen order."""
+        totals = {}
+        with self._lock:
+            for stage, seconds in self.spans:
+                totals[stage] = totals.get(stage, 0.0) + seconds
+        return list(totals.items())
+
+    def summary(self) -> str:
+        """One-line breakdown, e.g. "embed 12ms, vector_search 30ms, synthesize 7.81s"."""
+        return ", ".join(
+            f"{stage} {seconds:.2f}s" if seconds >= 1 else f"{stage} {seconds * 1000:.0f}ms"
+            for stage, seconds in self.totals()
+        )
+
+    def server_timing(self) -> str:
+        """The breakdown as an HTTP ``Server-Timing`` header value."""
+        return ", ".join(f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in self.totals())
+
+
+_current_trace: contextvars.ContextVar[Optional[Trace]] = contextvars.ContextVar("unigraph_trace", default=None)
+
+
+@contextmanager
+def trace(name: str) -> Iterator[Trace]:
+    """Collects the spans of the enclosed work (and of threads it starts) into a ``Trace``."""
+    current = Trace(name)
+    token = _current_trace.set(current)
+    try:
+        yield current
+    finally:
+        _current_trace.reset(token)
+
+
+@contextmanager
+def span(stage: str) -> Iterator[None]:
+    """
+    Times the enclosed block as ``stage``: observed in ``unigraph_stage_seconds``, counted
+    in ``unigraph_stage_errors_total`` if it raises, and added to the current trace.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STAGE_ERRORS.labels(stage).inc()
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        STAGE_SECONDS.labels(stage).observe(elapsed)
+        current = _current_trace.get()
+        if current is not None:
+            current.add(stage, elapsed)
+
+
+def record_cache(cache: str, hits: int, misses: int) -> None:
+    """Adds a batch of cache hits and misses (e.g. from a cache's stats after a run)."""
+    if hits:
+        CACHE_REQUESTS.labels(cache, "hit").inc(hits)
+    if misses:
+        CACHE_REQUESTS.labels(cache, "miss").inc(misses)
+
+
+def _usage(raw: Any) -> Tuple[Optional[int], Optional[int]]:
+    """Reads (prompt, completion) token counts from a provider's raw response, if present."""
+    if not isinstance(raw, dict):
+        raw = getattr(raw, "__dict__", {}) or {}
+    usage = raw.get("usage_metadata") or {}  # Gemini
+    if usage:
+        return usage.get("prompt_token_count"), usage.get("candidates_token_count")
+    usage = raw.get("usage") or {}  # OpenAI-compatible
+    if not isinstance(usage, dict):
+        usage = getattr(usage, "__dict__", {}) or {}
+    if usage:
+        return usage.get("prompt_tokens"), usage.get("completion_tokens")
+    if "prompt_eval_count" in raw:  # Ollama
+        return raw.get("prompt_eval_count"), raw.get("eval_count")
+    return None, None
+
+
+def token_counts(prompt: str, completion: str, raw: Any = None) -> Tuple[int, int]:
+    """
+    Returns one LLM call's (prompt, completion) tokens, from the provider's usage metadata
+    when available and estimated at four characters per token otherwise.
+    """
+    prompt_tokens, completion_tokens = _usage(raw) if raw is not None else (None, None)
+    return (
+        prompt_tokens if prompt_tokens is not None else len(prompt) // 4,
+        completion_tokens if completion_tokens is not None else len(completion) // 4,
+    )
+
+
+def count_llm_tokens(prompt: str, completion: str, raw: Any = None) -> None:
+    """Counts one LLM call and its tokens (see ``token_counts``)."""
+    prompt_tokens, completion_tokens = token_counts(prompt, completion, raw)
+    LLM_CALLS.inc()
+    LLM_TOKENS.labels("prompt").inc(prompt_tokens)
+    LLM_TOKENS.labels("completion").inc(completion_tokens)
+
+
+_llm_instrumented = False
+
+
+def instrument_llm_calls() -> None:
+    """Counts the tokens of every LlamaIndex LLM call (completion and chat). Idempotent."""
+    global _llm_instrumented
+    if _llm_instrumented:
+        return
+    from llama_index.core.instrumentation import get_dispatcher
+    from llama_index.core.instrumentation.event_handlers import BaseEventHandler
+    from llama_index.core.instrumentation.events.llm import LLMChatEndEvent, LLMCompletionEndEvent
+
+    class TokenCountingHandler(BaseEventHandler):
+        def handle(self, event: Any, **kwargs: Any) -> None:
+            if isinstance(event, LLMCompletionEndEvent):
+                count_llm_tokens(event.prompt, event.response.text or "", event.response.raw)
+            elif isinstance(event, LLMChatEndEvent) and event.response is not None:
+                prompt = "".join(str(m.content or "") for m in event.messages)
+                count_llm_tokens(prompt, str(event.response.message.content or ""), event.response.raw)
+
+    get_dispatcher().add_event_handler(TokenCountingHandler())
+    _llm_instrumented = True
+
+
+def metrics_payload() -> Tuple[bytes, str]:
+    """Returns the Prometheus exposition of all metrics and its content type."""
+    return generate_latest(), CONTENT_TYPE_LATEST
@@ -0,0 +1,143 @@
+import sys
+import os
+import asyncio
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Ensure the src directory is in the python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from llama_index.core.indices.property_graph import SimpleLLMPathExtractor
+from llama_index.core.llms import ChatMessage, MockLLM
+from llama_index.llms.ollama import Ollama
+from src.ingestion.extraction_cache import extractor_fingerprint
+from src.llm_router import LLMRouter, RoutedLLM, classify_query, record_llm_models, use_llm_route
+
+
+class FakeOllama(BaseHTTPRequestHandler):
+    """Answers Ollama's /api/chat like a local model server would; ``failing`` makes it return 500."""
+
+    protocol_version = "HTTP/1.1"
+    failing = False
+    requests = 0
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        FakeOllama.requests += 1
+        if FakeOllama.failing:
+            self._send(500, {"error": "model crashed"})
+            return
+        self._send(200, {
+            "model": body["model"], "created_at": "2026-01-01T00:00:00Z", "done": True,
+            "message": {"role": "assistant", "content": "local answer"},
+            "prompt_eval_count": 12, "eval_count": 3,
+        })
+
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+def _serve():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeOllama)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def _router(server, clock=lambda: 0.0):
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    return LLMRouter(
+        {"local": lambda: Ollama(model="fake", base_url=url, context_window=4096, request_timeout=5),
+         "cloud": lambda: MockLLM(max_tokens=5)},
+        cooldown=30, prices={"cloud": (1.0, 2.0)}, clock=clock,
+    )
+
+
+def test_classify_query():
+    assert classify_query("What is the tuition at Stanford?") == "lookup"
+    assert classify_query("Compare tuition at Stanford and Oxford") == "reasoning"
+    assert classify_query("Is MIT harder to get into than Oxford?") == "reasoning"
+    assert classify_query("Which universities offer data science?", "summaries") == "synthesis"
+
+
+def test_routes_to_local_and_cloud():
+    server = _serve()
+    try:
+        router = _router(server)
+        llm = RoutedLLM(router)
+        with use_llm_route("lookup"):
+            assert str(asyncio.run(llm.acomplete("Tuition at Stanford?"))) == "local answer"
+        with use_llm_route("reasoning"):
+            assert llm.metadata.context_window <= 4096
+            assert asyncio.run(llm.acomplete("Compare Stanford and Oxford")).text
+        assert RoutedLLM(router, route="extraction").chat([ChatMessage(content="Extract triples")]).message.content == "local answer"
+
+        stats = {(s.route, s.backend): s for s in router.stats()}
+        assert set(stats) == {("lookup", "local"), ("reasoning", "cloud"), ("extraction", "local")}
+        # Token counts come from Ollama's usage; only the cloud model costs money.
+        assert (stats["lookup", "local"].prompt_tokens, stats["lookup", "local"].completion_tokens) == (12, 3)
+        assert stats["lookup", "local"].cost_usd == 0.0 and stats["reasoning", "cloud"].cost_usd > 0.0
+    finally:
+        server.shutdown()
+
+
+def test_fallback_and_cooldown():
+    server = _serve()
+    now = [0.0]
+    router = _router(server, clock=lambda: now[0])
+    llm = RoutedLLM(router, route="lookup")
+
+    async def scenario():
+        FakeOllama.failing = True
+        assert (await llm.acomplete("Tuition at Stanford?")).text
+        requests = FakeOllama.requests
+        # The failed local model is skipped until the cooldown has passed.
+        chunks = [chunk async for chunk in await llm.astream_complete("Deadline at Stanford?")]
+        assert chunks and FakeOllama.requests == requests
+        stats = {(s.route, s.backend): s for s in router.stats()}
+        assert stats["lookup", "local"].errors == 1
+        assert (stats["lookup", "cloud"].calls, stats["lookup", "cloud"].fallbacks) == (2, 2)
+
+        FakeOllama.failing = False
+        now[0] = 31.0
+        assert (await llm.acomplete("Tuition at Stanford?")).text == "local answer"
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        FakeOllama.failing = False
+        server.shutdown()
+
+
+def test_unavailable_backend_keeps_model_name():
+    def no_server():
+        raise ConnectionError("no Ollama server")
+
+    router = LLMRouter({"local": no_server, "cloud": lambda: MockLLM(max_tokens=5)},
+                       models={"local": "llama3", "cloud": "gemini"})
+    llm = RoutedLLM(router, route="extraction")
+    fingerprint = extractor_fingerprint(SimpleLLMPathExtractor(llm=llm))
+    # The local backend cannot be created: metadata comes from the cloud one.
+    assert llm.metadata.model_name == "llama3" and llm.metadata.context_window > 0
+
+    with record_llm_models() as served:
+        assert llm.complete("Extract triples").text
+    assert served == ["gemini"]
+    # The local backend is cooling down; the fingerprint still names the configured model.
+    assert router.plan("extraction") == ["cloud"]
+    assert extractor_fingerprint(SimpleLLMPathExtractor(llm=llm)) == fingerprint
+
+
+if __name__ == "__main__":
+    test_classify_query()
+    test_routes_to_local_and_cloud()
+    test_fallback_and_cooldown()
+    test_unavailable_backend_keeps_model_name()
@@ -0,0 +1,51 @@
+import sys
+import os
+import asyncio
+
+# Ensure the src directory is in the python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.telemetry import LLM_TOKENS, STAGE_ERRORS, count_llm_tokens, span, trace
+
+
+def _value(counter, *labels):
+    return counter.labels(*labels)._value.get()
+
+
+def test_trace_collects_spans_from_threads():
+    with trace("query") as t:
+        with span("retrieve"):
+            with span("embed_query"):
+                pass
+            def search():
+                with span("vector_search"):
+                    pass
+            asyncio.run(asyncio.to_thread(search))
+    stages = [stage for stage, _ in t.totals()]
+    assert stages == ["embed_query", "vector_search", "retrieve"]
+    assert "retrieve;dur=" in t.server_timing() and "retrieve" in t.summary()
+
+
+def test_span_counts_errors():
+    before = _value(STAGE_ERRORS, "test_failing")
+    try:
+        with span("test_failing"):
+            raise ValueError("boom")
+    except ValueError:
+        pass
+    assert _value(STAGE_ERRORS, "test_failing") == before + 1
+
+
+def test_count_llm_tokens():
+    prompt, completion = _value(LLM_TOKENS, "prompt"), _value(LLM_TOKENS, "completion")
+    # Gemini reports usage; without it, tokens are estimated at four characters each.
+    count_llm_tokens("x" * 400, "y" * 40, {"usage_metadata": {"prompt_token_count": 90, "candidates_token_count": 12}})
+    count_llm_tokens("x" * 400, "y" * 40)
+    assert _value(LLM_TOKENS, "prompt") == prompt + 190
+    assert _value(LLM_TOKENS, "completion") == completion + 22
+
+
+if __name__ == "__main__":
+    test_trace_collects_spans_from_threads()
+    test_span_counts_errors()
+    test_count_llm_tokens()